@@ -0,0 +1,17 @@
+"""
+Shared request dependencies for API routes.
+"""
+from fastapi import HTTPException, Query
+
+from ..config import ACCOUNT_CONFIG
+from ..services.portfolio_service import PortfolioService, portfolio_accounts
+
+
+def get_account(
+    account_id: str = Query(ACCOUNT_CONFIG["default_account"], description="Paper trading account"),
+) -> PortfolioService:
+    """Resolve the `account_id` query parameter to that account's portfolio."""
+    try:
+        return portfolio_accounts.get(account_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
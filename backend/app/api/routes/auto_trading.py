@@ -0,0 +1,33 @@
+"""
+Automated strategy execution API endpoints.
+"""
+from fastapi import APIRouter
+
+from ...services.auto_trader import auto_trader
+
+router = APIRouter(prefix="/auto-trader", tags=["auto-trader"])
+
+
+@router.get("")
+async def get_auto_trader_status():
+    """
+    Get the auto-trader's state, activity and cycle latency.
+
+    The auto-trader trades the strategy's signals for the watchlist in its
+    own paper trading account (see AUTO_TRADER_CONFIG).
+    """
+    return auto_trader.get_status()
+
+
+@router.post("/start")
+async def start_auto_trader():
+    """Start trading signals automatically (no-op if already running)."""
+    auto_trader.start()
+    return auto_trader.get_status()
+
+
+@router.post("/stop")
+async def stop_auto_trader():
+    """Stop trading signals automatically. Open positions keep their stops."""
+    await auto_trader.stop()
+    return auto_trader.get_status()
@@ -1,13 +1,32 @@
 """
 Backtesting API endpoints.
 """
+import asyncio
+import json
 import logging
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Union
 from datetime import datetime
 
-from ...services.backtest_service import run_backtest, BacktestResult
+from ...config import JOB_CONFIG
+from ...core.strategy import STRATEGIES, get_strategy
+from ...services.backtest_service import (
+    run_backtest,
+    run_backtest_summary,
+    history_days_needed,
+    result_to_dict,
+)
+from ...services.data_service import data_service
+from ...services.monte_carlo_service import run_monte_carlo, trade_returns, MONTE_CARLO_METHODS
+from ...services.job_service import (
+    backtest_job_service,
+    BacktestJob,
+    JobQueueFullError,
+    FINISHED_STATUSES,
+)
+from ...services.timeseries_service import SERIES_FORMATS, MIN_CHART_POINTS, MAX_CHART_POINTS
 from ...services.watchlist_service import watchlist_service
 
 logger = logging.getLogger(__name__)
@@ -21,6 +40,10 @@ class BacktestRequest(BaseModel):
     start_date: Optional[str] = None  # YYYY-MM-DD
     end_date: Optional[str] = None    # YYYY-MM-DD
     initial_capital: Optional[float] = None
+    strategy: Optional[str] = None    # Strategy name (default: ma_crossover)
+    benchmark: Optional[str] = None   # Compare against buy-and-hold (e.g. "SPY")
+    max_points: Optional[int] = None  # Downsample equity curve to this many points
+    equity_format: str = "records"    # "records" or "columnar"
 
 
 class BacktestResponse(BaseModel):
@@ -38,20 +61,175 @@ class BacktestResponse(BaseModel):
     win_rate: float
     max_drawdown: float
     max_drawdown_percent: float
-    equity_curve: list[dict]
+    max_drawdown_duration: int = 0
+    max_drawdown_duration_days: Optional[int] = None
+    cagr_percent: Optional[float] = None
+    annual_volatility_percent: Optional[float] = None
+    sharpe_ratio: Optional[float] = None
+    sortino_ratio: Optional[float] = None
+    calmar_ratio: Optional[float] = None
+    exposure_percent: Optional[float] = None
+    turnover: Optional[float] = None
+    # Records: [{"date", "value"}, ...]  Columnar: {"dates": [...], "values": [...]}
+    equity_curve: Union[list[dict], dict]
+    # Buy-and-hold comparison on the same dates (when requested)
+    benchmark: Optional[dict] = None
     trades: list[dict]
 
 
+class MonteCarloRequest(BacktestRequest):
+    """Request model for Monte Carlo analysis of a backtest."""
+    n_paths: int = 10000
+    method: str = "bootstrap"  # "bootstrap" or "permute"
+    seed: Optional[int] = None
+
+
+class MonteCarloResponse(BaseModel):
+    """Distributions of outcomes across simulated trade orderings."""
+    symbol: str
+    initial_capital: float
+    backtest_final_value: float
+    backtest_max_drawdown_percent: float
+    method: str
+    n_paths: int
+    n_trades: int
+    final_value: dict
+    max_drawdown_percent: dict
+    time_to_recovery_trades: dict
+    recovered_fraction: float
+    probability_of_loss: float
+
+
+class BatchBacktestRequest(BaseModel):
+    """Request model for backtesting many symbols at once."""
+    symbols: Optional[list[str]] = None
+    use_watchlist: bool = False        # Backtest every watchlist symbol
+    start_date: Optional[str] = None   # YYYY-MM-DD
+    end_date: Optional[str] = None     # YYYY-MM-DD
+    initial_capital: Optional[float] = None
+    strategy: Optional[str] = None
+
+
+class BatchBacktestRow(BaseModel):
+    """Summary of one symbol's backtest in a batch."""
+    symbol: str
+    final_value: Optional[float] = None
+    total_return_percent: Optional[float] = None
+    total_trades: Optional[int] = None
+    win_rate: Optional[float] = None
+    max_drawdown_percent: Optional[float] = None
+    cagr_percent: Optional[float] = None
+    sharpe_ratio: Optional[float] = None
+    exposure_percent: Optional[float] = None
+    error: Optional[str] = None
+
+
+class BatchBacktestResponse(BaseModel):
+    """Per-symbol summary table, best total return first."""
+    results: list[BatchBacktestRow]
+    symbol_count: int
+    failed_count: int
+
+
+class BacktestJobRequest(BaseModel):
+    """Request model for a background backtest job."""
+    symbols: list[str]
+    start_date: Optional[str] = None  # YYYY-MM-DD
+    end_date: Optional[str] = None    # YYYY-MM-DD
+    initial_capital: Optional[float] = None
+    strategy: Optional[str] = None
+    benchmark: Optional[str] = None
+
+
+class BacktestJobResponse(BaseModel):
+    """Status (and, once completed, results) of a backtest job."""
+    id: str
+    status: str
+    symbols: list[str]
+    progress: float
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: Optional[dict] = None  # symbol -> backtest result
+
+
+def _validate_backtest_params(
+    start_date: Optional[str],
+    end_date: Optional[str],
+    initial_capital: Optional[float],
+) -> None:
+    """
+    Validate the date range and capital shared by all backtest requests.
+
+    Raises:
+        HTTPException: 400 with a user-facing message if anything is invalid
+    """
+    # Input validation: Check date format and logic
+    if start_date:
+        try:
+            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="start_date must be in YYYY-MM-DD format"
+            )
+
+    if end_date:
+        try:
+            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="end_date must be in YYYY-MM-DD format"
+            )
+        # Check end date is not in the future
+        if end_dt > datetime.now():
+            raise HTTPException(
+                status_code=400,
+                detail="end_date cannot be in the future"
+            )
+
+    if start_date and end_date:
+        if start_dt >= end_dt:
+            raise HTTPException(
+                status_code=400,
+                detail="start_date must be before end_date"
+            )
+
+    # Input validation: Check initial capital bounds
+    if initial_capital is not None:
+        if initial_capital < 100 or initial_capital > 10000000:
+            raise HTTPException(
+                status_code=400,
+                detail="initial_capital must be between $100 and $10,000,000"
+            )
+
+
+def _validate_series_params(max_points: Optional[int], series_format: str) -> None:
+    """Validate equity curve downsampling and encoding options."""
+    if max_points is not None and (max_points < MIN_CHART_POINTS or max_points > MAX_CHART_POINTS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"max_points must be between {MIN_CHART_POINTS} and {MAX_CHART_POINTS}"
+        )
+    if series_format not in SERIES_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"equity_format must be one of: {', '.join(SERIES_FORMATS)}"
+        )
+
+
 @router.post("", response_model=BacktestResponse)
 async def backtest(request: BacktestRequest):
     """
-    Run a backtest of the MA crossover strategy.
+    Run a backtest of a strategy (default: MA crossover).
 
     This simulates how the strategy would have performed
     on historical data. Results do NOT guarantee future performance.
 
     Args:
-        request: Backtest parameters (symbol, date range, capital)
+        request: Backtest parameters (symbol, date range, capital, strategy)
 
     Returns:
         Performance metrics, equity curve, and trade list
@@ -66,96 +244,324 @@ async def backtest(request: BacktestRequest):
                 detail=f"{symbol} is not a valid stock symbol"
             )
 
-        # Input validation: Check date format and logic
-        if request.start_date:
-            try:
-                start_dt = datetime.strptime(request.start_date, "%Y-%m-%d")
-            except ValueError:
-                raise HTTPException(
-                    status_code=400,
-                    detail="start_date must be in YYYY-MM-DD format"
-                )
+        _validate_backtest_params(request.start_date, request.end_date, request.initial_capital)
+        _validate_series_params(request.max_points, request.equity_format)
 
-        if request.end_date:
-            try:
-                end_dt = datetime.strptime(request.end_date, "%Y-%m-%d")
-            except ValueError:
-                raise HTTPException(
-                    status_code=400,
-                    detail="end_date must be in YYYY-MM-DD format"
-                )
-            # Check end date is not in the future
-            if end_dt > datetime.now():
-                raise HTTPException(
-                    status_code=400,
-                    detail="end_date cannot be in the future"
-                )
+        result = run_backtest(
+            symbol=symbol,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            initial_capital=request.initial_capital,
+            strategy=get_strategy(request.strategy),
+            benchmark=request.benchmark,
+        )
 
-        if request.start_date and request.end_date:
-            if start_dt >= end_dt:
-                raise HTTPException(
-                    status_code=400,
-                    detail="start_date must be before end_date"
-                )
+        return BacktestResponse(**result_to_dict(
+            result,
+            max_points=request.max_points,
+            series_format=request.equity_format,
+        ))
 
-        # Input validation: Check initial capital bounds
-        if request.initial_capital is not None:
-            if request.initial_capital < 100 or request.initial_capital > 10000000:
-                raise HTTPException(
-                    status_code=400,
-                    detail="initial_capital must be between $100 and $10,000,000"
-                )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        # ValueError is raised for known issues like insufficient data
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Backtest error for {request.symbol}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to run backtest. Please try again.")
 
-        result = run_backtest(
+
+@router.post("/monte-carlo", response_model=MonteCarloResponse)
+async def monte_carlo(request: MonteCarloRequest):
+    """
+    Stress-test a backtest by reshuffling its trades many times.
+
+    Runs the normal backtest, then simulates n_paths alternative orderings
+    of its trade returns ("permute") or resamples them with replacement
+    ("bootstrap"). Each distribution is reported as mean and 5th/25th/
+    50th/75th/95th percentiles.
+
+    Args:
+        request: Backtest parameters plus n_paths, method and seed
+
+    Returns:
+        Distributions of final value, max drawdown and time-to-recovery
+    """
+    try:
+        symbol = request.symbol.upper()
+
+        if request.n_paths < 100 or request.n_paths > 100000:
+            raise HTTPException(
+                status_code=400,
+                detail="n_paths must be between 100 and 100,000"
+            )
+        if request.method not in MONTE_CARLO_METHODS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"method must be one of: {', '.join(MONTE_CARLO_METHODS)}"
+            )
+
+        _validate_backtest_params(request.start_date, request.end_date, request.initial_capital)
+
+        # Symbol lookup, data download and simulation all run off the event loop
+        if not await asyncio.to_thread(watchlist_service.validate_symbol, symbol):
+            raise HTTPException(
+                status_code=400,
+                detail=f"{symbol} is not a valid stock symbol"
+            )
+
+        result = await asyncio.to_thread(
+            run_backtest,
             symbol=symbol,
             start_date=request.start_date,
             end_date=request.end_date,
             initial_capital=request.initial_capital,
+            strategy=get_strategy(request.strategy),
         )
 
-        # Convert to response format
-        equity_curve = [
-            {"date": dt.isoformat(), "value": val}
-            for dt, val in result.equity_curve
-        ]
-
-        trades = [
-            {
-                "entry_date": t.entry_date.isoformat(),
-                "entry_price": t.entry_price,
-                "exit_date": t.exit_date.isoformat() if t.exit_date else None,
-                "exit_price": t.exit_price,
-                "shares": t.shares,
-                "pnl": t.pnl,
-                "pnl_percent": t.pnl_percent,
-                "exit_reason": t.exit_reason,
-            }
-            for t in result.trades
-        ]
-
-        return BacktestResponse(
+        simulation = await asyncio.to_thread(
+            run_monte_carlo,
+            trade_returns(result),
+            initial_capital=result.initial_capital,
+            n_paths=request.n_paths,
+            method=request.method,
+            seed=request.seed,
+        )
+
+        return MonteCarloResponse(
             symbol=result.symbol,
-            start_date=result.start_date,
-            end_date=result.end_date,
             initial_capital=result.initial_capital,
-            final_value=result.final_value,
-            total_return=result.total_return,
-            total_return_percent=result.total_return_percent,
-            total_trades=result.total_trades,
-            winning_trades=result.winning_trades,
-            losing_trades=result.losing_trades,
-            win_rate=result.win_rate,
-            max_drawdown=result.max_drawdown,
-            max_drawdown_percent=result.max_drawdown_percent,
-            equity_curve=equity_curve,
-            trades=trades,
+            backtest_final_value=result.final_value,
+            backtest_max_drawdown_percent=result.max_drawdown_percent,
+            **simulation,
         )
 
     except HTTPException:
         raise
     except ValueError as e:
-        # ValueError is raised for known issues like insufficient data
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Backtest error for {request.symbol}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to run backtest. Please try again.")
+        logger.error(f"Monte Carlo error for {request.symbol}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to run Monte Carlo analysis. Please try again.")
+
+
+@router.post("/batch", response_model=BatchBacktestResponse)
+async def batch_backtest(request: BatchBacktestRequest):
+    """
+    Backtest a list of symbols (or the whole watchlist) in one request.
+
+    Price history for every symbol is downloaded in a single bulk request,
+    then the simulations run in parallel across worker processes. Symbols
+    without data are reported with an error instead of failing the batch.
+    A batch takes a slot in the job queue, so it gets 429 while the queue
+    is full.
+
+    Args:
+        request: Symbols (or use_watchlist) plus the usual backtest parameters
+
+    Returns:
+        One summary row per symbol, sorted by total return
+    """
+    symbols = list(request.symbols or [])
+    if request.use_watchlist:
+        symbols += watchlist_service.get_watchlist()
+    symbols = list(dict.fromkeys(s.upper().strip() for s in symbols if s.strip()))
+
+    if not symbols:
+        raise HTTPException(status_code=400, detail="Provide symbols or set use_watchlist")
+    if len(symbols) > JOB_CONFIG["max_symbols_per_job"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can include at most {JOB_CONFIG['max_symbols_per_job']} symbols"
+        )
+
+    _validate_backtest_params(request.start_date, request.end_date, request.initial_capital)
+    if request.strategy is not None and request.strategy not in STRATEGIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown strategy. Available: {', '.join(STRATEGIES)}"
+        )
+
+    try:
+        # One bulk download instead of a validation call and fetch per symbol
+        data = await asyncio.to_thread(
+            data_service.get_bulk_stock_data,
+            symbols,
+            history_days_needed(request.start_date),
+        )
+
+        # Simulations share the job pool, admitted like a submitted job
+        rows = await backtest_job_service.run_batch(
+            run_backtest_summary,
+            [
+                (
+                    symbol,
+                    data[symbol],
+                    request.start_date,
+                    request.end_date,
+                    request.initial_capital,
+                    request.strategy,
+                )
+                for symbol in symbols
+                if symbol in data
+            ],
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch backtest error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to run batch backtest. Please try again.")
+
+    rows += [
+        {"symbol": symbol, "error": f"No data found for symbol: {symbol}"}
+        for symbol in symbols
+        if symbol not in data
+    ]
+    rows.sort(key=lambda row: row.get("total_return_percent", float("-inf")), reverse=True)
+
+    return BatchBacktestResponse(
+        results=[BatchBacktestRow(**row) for row in rows],
+        symbol_count=len(symbols),
+        failed_count=sum(1 for row in rows if row.get("error")),
+    )
+
+
+@router.get("/strategies")
+async def list_strategies():
+    """List the strategies available for backtesting."""
+    return [
+        {"name": name, "description": strategy_class.description}
+        for name, strategy_class in STRATEGIES.items()
+    ]
+
+
+def _job_to_response(job: BacktestJob, include_result: bool = True) -> BacktestJobResponse:
+    """Convert a job record into its API response."""
+    return BacktestJobResponse(
+        id=job.id,
+        status=job.status.value,
+        symbols=job.params["symbols"],
+        progress=job.progress,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        result=job.result if include_result else None,
+    )
+
+
+@router.post("/jobs", response_model=BacktestJobResponse, status_code=202)
+async def submit_backtest_job(request: BacktestJobRequest):
+    """
+    Submit a backtest job to run in the background.
+
+    The job runs in a separate worker process, so long multi-symbol
+    backtests never block other API requests. Poll
+    GET /backtest/jobs/{job_id} or stream /backtest/jobs/{job_id}/events
+    to follow its progress.
+
+    Args:
+        request: Symbols plus the usual backtest parameters
+
+    Returns:
+        The queued job (HTTP 202)
+    """
+    symbols = list(dict.fromkeys(s.upper().strip() for s in request.symbols if s.strip()))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(symbols) > JOB_CONFIG["max_symbols_per_job"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A job can include at most {JOB_CONFIG['max_symbols_per_job']} symbols"
+        )
+
+    _validate_backtest_params(request.start_date, request.end_date, request.initial_capital)
+    if request.strategy is not None and request.strategy not in STRATEGIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown strategy. Available: {', '.join(STRATEGIES)}"
+        )
+
+    try:
+        # Off the event loop: the first submission may start the worker pool
+        job = await asyncio.to_thread(backtest_job_service.submit, {
+            "symbols": symbols,
+            "start_date": request.start_date,
+            "end_date": request.end_date,
+            "initial_capital": request.initial_capital,
+            "strategy": request.strategy,
+            "benchmark": request.benchmark,
+        })
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error submitting backtest job: {e}")
+        raise HTTPException(status_code=500, detail="Failed to submit backtest job. Please try again.")
+
+    return _job_to_response(job)
+
+
+@router.get("/jobs", response_model=list[BacktestJobResponse])
+async def list_backtest_jobs():
+    """
+    List retained backtest jobs, oldest first.
+
+    Results are omitted here; fetch a single job to get its result.
+    """
+    return [_job_to_response(job, include_result=False) for job in backtest_job_service.list_jobs()]
+
+
+@router.get("/jobs/{job_id}", response_model=BacktestJobResponse)
+async def get_backtest_job(job_id: str):
+    """
+    Get the status of a backtest job, including its result once completed.
+
+    Args:
+        job_id: Id returned when the job was submitted
+    """
+    job = backtest_job_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_to_response(job)
+
+
+@router.delete("/jobs/{job_id}", response_model=BacktestJobResponse)
+async def cancel_backtest_job(job_id: str):
+    """
+    Cancel a queued or running backtest job.
+
+    Running jobs stop at their next progress report, so the status may
+    stay "running" briefly after this call.
+    """
+    job = backtest_job_service.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_to_response(job, include_result=False)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_backtest_job(job_id: str):
+    """
+    Stream a job's progress as Server-Sent Events.
+
+    Each event is a JSON object with a "type" of started, progress
+    (with the new equity points), symbol_completed, symbol_failed,
+    and finally completed, failed or cancelled.
+    """
+    if backtest_job_service.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        sent = 0
+        while True:
+            events, status = backtest_job_service.get_events(job_id, since=sent)
+            for event in events:
+                yield f"data: {json.dumps(event)}\n\n"
+            sent += len(events)
+
+            if status is None or status in FINISHED_STATUSES:
+                break
+            await asyncio.sleep(JOB_CONFIG["stream_poll_seconds"])
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
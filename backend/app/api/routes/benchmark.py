@@ -4,40 +4,87 @@ Benchmark API endpoint for comparing strategy vs buy-and-hold.
 import logging
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from datetime import datetime, timedelta
+from datetime import date
+from typing import Optional
 
-from ...services.data_service import data_service
+from ...config import BENCHMARK_CONFIG
+from ...services.return_index_service import return_index_service, HORIZONS, WindowReturn
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/benchmark", tags=["benchmark"])
 
 
+class HorizonReturn(BaseModel):
+    """Buy-and-hold return over one window."""
+    start_date: str
+    end_date: str
+    start_price: float
+    end_price: float
+    return_percent: float
+    bars: int
+
+
 class BenchmarkResponse(BaseModel):
     """Response model for benchmark comparison."""
+    # Kept under their original names for existing clients; they describe
+    # the requested symbol (SPY by default)
     spy_start_price: float
     spy_current_price: float
     spy_return_percent: float
     period_days: int
     start_date: str
     end_date: str
+    symbol: str = BENCHMARK_CONFIG["default_symbol"]
+    # Requested standard horizons (None when history is too short)
+    horizons: dict[str, Optional[HorizonReturn]] = {}
+
+
+def _to_horizon_return(window: Optional[WindowReturn]) -> Optional[HorizonReturn]:
+    """Convert a service window return into the response model."""
+    if window is None:
+        return None
+    return HorizonReturn(
+        start_date=window.start_date.strftime("%Y-%m-%d"),
+        end_date=window.end_date.strftime("%Y-%m-%d"),
+        start_price=window.start_price,
+        end_price=window.end_price,
+        return_percent=window.return_percent,
+        bars=window.bars,
+    )
 
 
 @router.get("", response_model=BenchmarkResponse)
-async def get_benchmark(days: int = 365):
+async def get_benchmark(
+    days: int = 365,
+    symbol: str = BENCHMARK_CONFIG["default_symbol"],
+    horizons: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+):
     """
-    Get SPY benchmark performance for comparison.
+    Get benchmark performance for comparison.
 
-    This returns the buy-and-hold return for SPY over the specified period,
-    which can be compared to your strategy's performance.
+    This returns the buy-and-hold return for SPY (or any symbol) over the
+    specified period, which can be compared to your strategy's performance.
+    Returns are looked up from a cumulative return index, so asking for
+    many horizons costs no extra downloads.
 
     Args:
         days: Number of days to look back (default: 365)
+        symbol: Benchmark symbol (default: SPY)
+        horizons: Comma-separated standard horizons, e.g. "1M,3M,YTD,1Y"
+            (available: 1M, 3M, 6M, YTD, 1Y, 3Y, 5Y)
+        start_date: Optional explicit window start (overrides days)
+        end_date: Optional explicit window end (default: latest bar)
 
     Returns:
-        SPY start price, current price, and return percentage
+        Start price, current price, and return percentage for the window,
+        plus any requested horizons
     """
     try:
+        symbol = symbol.upper()
+
         # Input validation
         if days < 30 or days > 1825:
             raise HTTPException(
@@ -45,29 +92,42 @@ async def get_benchmark(days: int = 365):
                 detail="Days must be between 30 and 1825 (5 years)"
             )
 
-        # Fetch SPY data
-        df = data_service.get_stock_data("SPY", days=days)
-
-        if len(df) < 2:
+        requested = [h.strip().upper() for h in horizons.split(",") if h.strip()] if horizons else []
+        unknown = [h for h in requested if h not in HORIZONS]
+        if unknown:
             raise HTTPException(
                 status_code=400,
-                detail="Insufficient data for benchmark calculation"
+                detail=f"Unknown horizon(s): {', '.join(unknown)}. Available: {', '.join(HORIZONS)}"
             )
 
-        start_price = float(df["Close"].iloc[0])
-        current_price = float(df["Close"].iloc[-1])
-        return_percent = ((current_price - start_price) / start_price) * 100
+        if start_date and end_date and start_date >= end_date:
+            raise HTTPException(status_code=400, detail="start_date must be before end_date")
 
-        start_date = df.index[0].strftime("%Y-%m-%d")
-        end_date = df.index[-1].strftime("%Y-%m-%d")
+        try:
+            index = return_index_service.get_index(symbol)
+        except ValueError:
+            raise HTTPException(status_code=404, detail=f"No data found for {symbol}")
+
+        try:
+            if start_date or end_date:
+                window = index.window_return(start_date, end_date)
+            else:
+                window = index.trailing_return(days)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Insufficient data for benchmark calculation"
+            )
 
         return BenchmarkResponse(
-            spy_start_price=start_price,
-            spy_current_price=current_price,
-            spy_return_percent=return_percent,
-            period_days=len(df),
-            start_date=start_date,
-            end_date=end_date,
+            spy_start_price=window.start_price,
+            spy_current_price=window.end_price,
+            spy_return_percent=window.return_percent,
+            period_days=window.bars,
+            start_date=window.start_date.strftime("%Y-%m-%d"),
+            end_date=window.end_date.strftime("%Y-%m-%d"),
+            symbol=symbol,
+            horizons={h: _to_horizon_return(index.horizon_return(h)) for h in requested},
         )
 
     except HTTPException:
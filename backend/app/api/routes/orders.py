@@ -0,0 +1,117 @@
+"""
+Resting order API endpoints (limit, stop and stop-limit orders).
+"""
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from ..deps import get_account
+from ...services.portfolio_service import PortfolioService
+from ...services.subscription_manager import subscription_manager
+from ...services.watchlist_service import watchlist_service
+from ...models.order import Order, OrderList, OrderRequest, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/orders", tags=["orders"])
+
+
+@router.post("", response_model=Order)
+async def place_order(
+    request: OrderRequest,
+    account: PortfolioService = Depends(get_account),
+):
+    """
+    Place a resting order, filled when a real-time price tick reaches it.
+
+    Order types:
+        - limit: buy at or below / sell at or above limit_price
+        - stop: buy once the price rises to / sell once it falls to
+          stop_price, at the market
+        - stop_limit: once stop_price is reached, rest as a limit order
+          at limit_price
+
+    Buys open a position (shares auto-calculated with the 2% risk rule if
+    not specified); sells close the whole position. "day" orders expire
+    at the market close, "gtc" orders stay open until cancelled.
+
+    Returns:
+        The open order
+    """
+    try:
+        symbol = request.symbol.upper()
+
+        # Validation may call Yahoo and placing waits on the account lock,
+        # so both run off the event loop (validated via watchlist service
+        # which uses yfinance)
+        if not await asyncio.to_thread(watchlist_service.validate_symbol, symbol):
+            raise HTTPException(
+                status_code=400,
+                detail=f"{symbol} is not a valid stock symbol"
+            )
+
+        order = await asyncio.to_thread(
+            account.place_order,
+            symbol=symbol,
+            action=request.action,
+            order_type=request.order_type,
+            shares=request.shares,
+            limit_price=request.limit_price,
+            stop_price=request.stop_price,
+            time_in_force=request.time_in_force,
+        )
+
+        # Orders are matched on ticks, so make sure the symbol streams
+        subscription_manager.refresh()
+
+        return order
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error placing order for {request.symbol}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to place order. Please try again.")
+
+
+@router.get("", response_model=OrderList)
+async def get_orders(
+    status: Optional[OrderStatus] = None,
+    symbol: Optional[str] = None,
+    account: PortfolioService = Depends(get_account),
+):
+    """
+    Get orders, oldest first.
+
+    Args:
+        status: Only orders in this state (e.g. "open")
+        symbol: Only orders for this symbol
+    """
+    try:
+        return account.get_orders(status=status, symbol=symbol.upper() if symbol else None)
+    except Exception as e:
+        logger.error(f"Error getting orders: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve orders. Please try again.")
+
+
+@router.get("/{order_id}", response_model=Order)
+async def get_order(order_id: str, account: PortfolioService = Depends(get_account)):
+    """Get a single order."""
+    order = account.get_order(order_id)
+    if order is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
+
+
+@router.delete("/{order_id}", response_model=Order)
+async def cancel_order(order_id: str, account: PortfolioService = Depends(get_account)):
+    """Cancel an open order."""
+    try:
+        order = account.cancel_order(order_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if order is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
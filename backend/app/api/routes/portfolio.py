@@ -1,16 +1,20 @@
 """
 Portfolio API endpoints for paper trading.
 """
-from fastapi import APIRouter, HTTPException
+from datetime import date, datetime, time, timedelta
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from ...services.portfolio_service import portfolio_service
+from ..deps import get_account
+from ...services.portfolio_service import PortfolioService
+from ...services.timeseries_service import downsample, MIN_CHART_POINTS, MAX_CHART_POINTS
 from ...models.portfolio import Portfolio, PortfolioHistory, PortfolioStats
 
 router = APIRouter(prefix="/portfolio", tags=["portfolio"])
 
 
 @router.get("", response_model=Portfolio)
-async def get_portfolio():
+async def get_portfolio(account: PortfolioService = Depends(get_account)):
     """
     Get current portfolio state.
 
@@ -18,59 +22,89 @@ async def get_portfolio():
         Cash balance, open positions, total value, and P&L
     """
     try:
-        return portfolio_service.get_portfolio()
+        return account.get_portfolio()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting portfolio: {str(e)}")
 
 
 @router.post("/reset")
-async def reset_portfolio():
+async def reset_portfolio(account: PortfolioService = Depends(get_account)):
     """
     Reset portfolio to initial state ($10,000 cash, no positions).
 
     This clears all positions and trade history.
     """
     try:
-        portfolio_service.reset()
+        account.reset()
         return {"message": "Portfolio reset to $10,000", "success": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error resetting portfolio: {str(e)}")
 
 
 @router.get("/history", response_model=PortfolioHistory)
-async def get_portfolio_history():
+async def get_portfolio_history(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    resolution: Literal["raw", "minute", "hour", "day"] = "raw",
+    max_points: Optional[int] = Query(None, ge=MIN_CHART_POINTS, le=MAX_CHART_POINTS),
+    account: PortfolioService = Depends(get_account),
+):
     """
     Get historical portfolio values.
 
+    Recent values are kept as recorded; older ones are rolled up to one
+    per minute, hour and then day, so very old history always comes back
+    at a coarser resolution.
+
+    Args:
+        start_date: Only values on or after this date
+        end_date: Only values on or before this date
+        resolution: Thin the values to at most one per minute, hour or day
+            (default "raw": every value still kept)
+        max_points: Optional cap on returned points. Longer histories are
+            downsampled with LTTB, which keeps peaks and troughs.
+
     Returns:
         List of dates and corresponding portfolio values
     """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
     try:
-        history = portfolio_service.value_history
-        return PortfolioHistory(
-            dates=[h[0] for h in history],
-            values=[h[1] for h in history],
+        dates, values = account.get_value_history(
+            start=datetime.combine(start_date, time.min) if start_date else None,
+            end=datetime.combine(end_date + timedelta(days=1), time.min) if end_date else None,
+            resolution=resolution,
         )
+        dates, values = downsample(dates, values, max_points=max_points)
+        return PortfolioHistory(dates=dates, values=values)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting history: {str(e)}")
 
 
 @router.get("/stats", response_model=PortfolioStats)
-async def get_portfolio_stats():
+async def get_portfolio_stats(
+    verify: bool = False,
+    account: PortfolioService = Depends(get_account),
+):
     """
     Get portfolio performance statistics.
 
+    Args:
+        verify: Also recompute everything from the full history and log
+            any difference from the running stats (slower)
+
     Returns:
         Win rate, average win/loss, max drawdown, etc.
     """
     try:
-        return portfolio_service.get_stats()
+        return account.get_stats(verify=verify)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting stats: {str(e)}")
 
 
 @router.post("/check-stops")
-async def check_stop_losses():
+async def check_stop_losses(account: PortfolioService = Depends(get_account)):
     """
     Check all positions for stop loss triggers.
 
@@ -80,7 +114,7 @@ async def check_stop_losses():
         List of trades executed due to stop loss triggers
     """
     try:
-        trades = portfolio_service.check_stops()
+        trades = account.check_stops()
         return {
             "triggered_count": len(trades),
             "trades": [t.model_dump() for t in trades],
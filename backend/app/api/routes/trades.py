@@ -1,20 +1,39 @@
 """
 Trade execution API endpoints.
 """
+import asyncio
 import logging
-from fastapi import APIRouter, HTTPException
-
-from ...services.portfolio_service import portfolio_service
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal, Optional
+
+from ..deps import get_account
+from ...config import PAPER_TRADING_CONFIG
+from ...services.data_service import data_service
+from ...services.portfolio_service import PortfolioService
+from ...services.subscription_manager import subscription_manager
 from ...services.watchlist_service import watchlist_service
-from ...models.trade import Trade, TradeRequest, TradeHistory
+from ...models.trade import (
+    Trade, TradeAction, TradeRequest, TradeHistory, TradeBatchRequest, TradeBatchResult,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/trades", tags=["trades"])
 
+# Enough threads to validate every leg of a batch (and price them) at once
+_batch_executor = ThreadPoolExecutor(
+    max_workers=PAPER_TRADING_CONFIG["max_batch_trades"] + 1,
+    thread_name_prefix="trade-batch",
+)
+
 
 @router.post("", response_model=Trade)
-async def execute_trade(request: TradeRequest):
+async def execute_trade(
+    request: TradeRequest,
+    account: PortfolioService = Depends(get_account),
+):
     """
     Execute a buy or sell trade.
 
@@ -36,24 +55,29 @@ async def execute_trade(request: TradeRequest):
     try:
         symbol = request.symbol.upper()
 
-        # Validate symbol exists (via watchlist service which uses yfinance)
-        if not watchlist_service.validate_symbol(symbol):
+        # Validation and pricing may call Yahoo, so they run off the event
+        # loop (validate via watchlist service which uses yfinance)
+        if not await asyncio.to_thread(watchlist_service.validate_symbol, symbol):
             raise HTTPException(
                 status_code=400,
                 detail=f"{symbol} is not a valid stock symbol"
             )
 
         if request.action.value == "buy":
-            trade = portfolio_service.buy(
+            trade = await asyncio.to_thread(
+                account.buy,
                 symbol=symbol,
                 shares=request.shares,
             )
         else:
-            trade = portfolio_service.sell(
+            trade = await asyncio.to_thread(
+                account.sell,
                 symbol=symbol,
                 exit_reason="manual",
             )
 
+        # Stream new positions right away (their stops fire on ticks)
+        subscription_manager.refresh()
         return trade
 
     except HTTPException:
@@ -66,23 +90,128 @@ async def execute_trade(request: TradeRequest):
         raise HTTPException(status_code=500, detail="Failed to execute trade. Please try again.")
 
 
+@router.post("/batch", response_model=TradeBatchResult)
+async def execute_trade_batch(
+    request: TradeBatchRequest,
+    account: PortfolioService = Depends(get_account),
+):
+    """
+    Execute several buy/sell trades all-or-nothing (e.g. a rebalance).
+
+    All symbols are validated and priced concurrently, then every leg is
+    checked and executed together: if any leg fails, no trade is made.
+    Sells run first, so their proceeds can fund the buys.
+
+    Args:
+        request: The trades (same fields as POST /api/trades, at most one
+            per symbol)
+
+    Returns:
+        Executed trades, sells first
+    """
+    max_trades = PAPER_TRADING_CONFIG["max_batch_trades"]
+    if not request.trades or len(request.trades) > max_trades:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch must have between 1 and {max_trades} trades"
+        )
+
+    try:
+        symbols = [leg.symbol.upper() for leg in request.trades]
+
+        # Validate every symbol and price them all in one bulk download, concurrently
+        loop = asyncio.get_running_loop()
+        *valid, latest = await asyncio.gather(
+            *(
+                loop.run_in_executor(_batch_executor, watchlist_service.validate_symbol, symbol)
+                for symbol in symbols
+            ),
+            loop.run_in_executor(_batch_executor, data_service.get_latest_prices, symbols),
+        )
+        invalid = [symbol for symbol, ok in zip(symbols, valid) if not ok]
+        if invalid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Not valid stock symbol(s): {', '.join(invalid)}"
+            )
+
+        prices = {symbol: info["price"] for symbol, info in latest.items()}
+        trades = await asyncio.to_thread(account.execute_batch, request.trades, prices)
+        subscription_manager.refresh()
+        return TradeBatchResult(trades=trades)
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        # Nothing was executed
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error executing trade batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to execute trades. Please try again.")
+
+
 @router.get("", response_model=TradeHistory)
-async def get_trades():
+async def get_trades(
+    symbol: Optional[str] = None,
+    action: Optional[TradeAction] = None,
+    exit_reason: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    order: Literal["asc", "desc"] = "asc",
+    account: PortfolioService = Depends(get_account),
+):
     """
     Get trade history.
 
+    Without a limit every matching trade is returned. With one, results
+    come a page at a time: pass the returned next_cursor as `cursor` to
+    continue. Each page costs about its own size, however long the
+    history is.
+
+    Args:
+        symbol: Only trades in this symbol
+        action: Only "buy" or only "sell" trades
+        exit_reason: Only sells with this exit reason (e.g. "trailing_stop")
+        start_date: Only trades on or after this date
+        end_date: Only trades on or before this date
+        cursor: next_cursor from the previous page
+        limit: Page size
+        order: "asc" (oldest first, default) or "desc" (newest first)
+
     Returns:
-        List of all executed trades with P&L for closed positions
+        Matching trades with P&L for closed positions
     """
+    max_page_size = PAPER_TRADING_CONFIG["max_trades_page_size"]
+    if limit is not None and (limit < 1 or limit > max_page_size):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Limit must be between 1 and {max_page_size}"
+        )
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
     try:
-        return portfolio_service.get_trades()
+        return account.get_trades(
+            symbol=symbol.upper() if symbol else None,
+            action=action,
+            exit_reason=exit_reason,
+            start=datetime.combine(start_date, time.min) if start_date else None,
+            end=datetime.combine(end_date + timedelta(days=1), time.min) if end_date else None,
+            cursor=cursor,
+            limit=limit,
+            newest_first=order == "desc",
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting trades: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve trades. Please try again.")
 
 
 @router.get("/{trade_id}", response_model=Trade)
-async def get_trade(trade_id: str):
+async def get_trade(trade_id: str, account: PortfolioService = Depends(get_account)):
     """
     Get details of a specific trade.
 
@@ -93,11 +222,10 @@ async def get_trade(trade_id: str):
         Trade details
     """
     try:
-        trades = portfolio_service.get_trades()
-        for trade in trades.trades:
-            if trade.id == trade_id:
-                return trade
-        raise HTTPException(status_code=404, detail="Trade not found")
+        trade = account.get_trade(trade_id)
+        if trade is None:
+            raise HTTPException(status_code=404, detail="Trade not found")
+        return trade
     except HTTPException:
         raise
     except Exception as e:
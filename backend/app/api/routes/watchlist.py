@@ -4,6 +4,7 @@ API routes for managing the stock watchlist.
 from fastapi import APIRouter, HTTPException, Query, Path
 from pydantic import BaseModel
 
+from ...services.symbol_service import symbol_service
 from ...services.watchlist_service import watchlist_service
 
 MAX_SYMBOL_LENGTH = 10
@@ -26,6 +27,8 @@ class SymbolActionResponse(BaseModel):
 class SearchResult(BaseModel):
     symbol: str
     name: str
+    exchange: str | None = None
+    asset_type: str | None = None   # equity, etf or crypto
     price: float | None
     in_watchlist: bool
 
@@ -75,12 +78,23 @@ async def remove_from_watchlist(
     )
 
 
+# Plain def: an unlisted exact ticker may be looked up on Yahoo, so this
+# runs in the threadpool rather than on the event loop
 @router.get("/search", response_model=list[SearchResult])
-async def search_symbols(
-    q: str = Query(..., min_length=1, description="Search query for stock symbol")
+def search_symbols(
+    q: str = Query(..., min_length=1, max_length=50, description="Ticker prefix or company name"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum results"),
 ):
-    """Search for stock symbols."""
-    results = watchlist_service.search_symbols(q)
+    """
+    Search for symbols (type-ahead).
+
+    Matches ticker prefixes ("APP" -> APP, APPN), words of the company
+    name ("bank of am") and near-miss tickers ("APPL" -> AAPL), ranked in
+    that order. Served from a local directory of equities, ETFs and
+    crypto pairs; an exact ticker the directory doesn't list is checked
+    against the cached symbol metadata.
+    """
+    results = watchlist_service.search_symbols(q, limit=limit)
     return [SearchResult(**r) for r in results]
 
 
@@ -88,10 +102,13 @@ async def search_symbols(
 async def validate_symbol(
     symbol: str = Path(..., min_length=1, max_length=MAX_SYMBOL_LENGTH)
 ):
-    """Check if a symbol is valid."""
-    is_valid = watchlist_service.validate_symbol(symbol)
+    """Check if a symbol is valid, with its name, exchange and asset type."""
+    info = symbol_service.get_info(symbol)
     return {
         "symbol": symbol.upper(),
-        "valid": is_valid,
+        "valid": info is not None and info.valid,
+        "name": info.name if info else None,
+        "exchange": info.exchange if info else None,
+        "asset_type": info.asset_type if info else None,
         "in_watchlist": watchlist_service.is_in_watchlist(symbol)
     }
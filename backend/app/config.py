@@ -18,6 +18,16 @@ STRATEGY_CONFIG = {
 PAPER_TRADING_CONFIG = {
     "initial_balance": 10000.0,  # Starting with $10,000
     "currency": "USD",
+    "mark_max_age_seconds": 60,  # Re-fetch prices for positions without recent ticks
+    "max_trades_page_size": 1000,  # Largest page /api/trades returns at once
+    "max_batch_trades": 20,        # Legs in one /api/trades/batch request
+}
+
+# Paper Trading Accounts
+ACCOUNT_CONFIG = {
+    "default_account": "default",
+    "max_loaded_accounts": 1000,     # Idle accounts beyond this are unloaded (they stay on disk)
+    "idle_unload_seconds": 600,      # Only accounts idle this long (with no positions) are unloaded
 }
 
 # Default Stock Watchlist - Initial symbols for new users
@@ -30,6 +40,88 @@ DATA_CONFIG = {
     "data_source": "yfinance",
 }
 
+# Background Job Settings (long-running backtests)
+JOB_CONFIG = {
+    "max_workers": 2,                # Worker processes for backtest jobs
+    "max_queued_jobs": 8,            # Jobs allowed to wait for a free worker
+    "max_symbols_per_job": 50,       # Symbols in one multi-symbol job
+    "max_retained_jobs": 100,        # Finished jobs kept for result lookup
+    "stream_poll_seconds": 0.25,     # How often SSE streams check for progress
+}
+
+# Benchmark Settings (cumulative return indexes)
+BENCHMARK_CONFIG = {
+    "default_symbol": "SPY",
+    "history_days": 1900,            # Enough history for the 5Y horizon
+    "refresh_minutes": 5,            # How often an index picks up new bars
+    "max_indexed_symbols": 50,       # Least recently used indexes are dropped
+}
+
+# Storage Settings (paper trading persistence)
+STORAGE_CONFIG = {
+    "persist_portfolio": True,       # Journal paper trades to backend/data
+    "journal_flush_ms": 20,          # Batch window before journal writes are fsync'd
+    "snapshot_every_records": 500,   # Compact the journal after this many records
+    "settings_flush_ms": 500,        # Batch window for watchlist and symbol cache writes
+}
+
+# Portfolio Value History (older points are rolled up into coarser tiers)
+VALUE_HISTORY_CONFIG = {
+    "raw_retention_hours": 24,       # Every recorded point for the last day
+    "minute_retention_days": 7,      # Then one point per minute for a week
+    "hour_retention_days": 90,       # Then one per hour; older history keeps one per day
+}
+
+# Regular Market Session (Monday to Friday, exchange local time)
+MARKET_CONFIG = {
+    "timezone": "America/New_York",
+    "session_open": "09:30",
+    "session_close": "16:00",
+}
+
+# Portfolio Value Snapshots (feed value history and drawdown stats)
+SNAPSHOT_CONFIG = {
+    "enabled": True,
+    "interval_minutes": 15,          # Snapshot cadence, counted from the session open
+    "session_only": True,            # Only snapshot during market hours (plus one at the close)
+    "slow_snapshot_ms": 1000,        # Log a warning when a snapshot run takes longer
+}
+
+# Symbol Metadata Cache (names and validity from Yahoo, persisted in backend/data)
+SYMBOL_CONFIG = {
+    "metadata_ttl_hours": 168,       # Known symbols are re-checked after a week
+    "invalid_ttl_minutes": 60,       # Unknown symbols are re-checked after an hour
+}
+
+# Real-time Subscriptions (Finnhub streams at most 50 symbols at once)
+SUBSCRIPTION_CONFIG = {
+    "rotation_seconds": 15,          # How long each group of rotated watchlist symbols streams
+}
+
+# WebSocket Fan-out (/ws/prices and /ws/portfolio)
+BROADCAST_CONFIG = {
+    "max_backlog": 256,              # Unsent portfolio updates a client may fall behind by
+    "send_timeout_seconds": 5,       # A client that takes longer to accept a message is dropped
+    "max_lag_seconds": 10,           # So is one whose oldest unsent message is this old
+}
+
+# Resting Orders (limit, stop and stop-limit)
+ORDER_CONFIG = {
+    "max_open_orders": 100,          # Per account
+    "max_retained_orders": 500,      # Filled, cancelled and expired orders kept per account (oldest dropped)
+}
+
+# Automated Strategy Execution (trades signals for the watchlist hands-free)
+AUTO_TRADER_CONFIG = {
+    "enabled": False,                # Opt-in: start with the app (it can also be started via the API)
+    "account_id": "auto",            # Paper trading account the auto-trader trades in
+    "strategy": "ma_crossover",
+    "min_cycle_seconds": 1.0,        # Ticks arriving faster than this are handled together
+    "max_cycle_ms": 250,             # Symbols not evaluated in time are carried to the next cycle
+    "bars_refresh_minutes": 5,       # How often new daily bars are picked up
+    "session_only": True,            # Only trade during market hours
+}
+
 # API Settings
 API_CONFIG = {
     "title": "Stock Trading Platform API",
@@ -0,0 +1,52 @@
+"""
+Regular market session times.
+
+Educational Note:
+US stocks trade in a regular session from 9:30 to 16:00 New York time,
+Monday to Friday. Anything scheduled "per session" (value snapshots,
+day orders) is aligned to these times in the exchange's timezone, so it
+stays correct for users in any timezone and across daylight saving.
+
+Exchange holidays are not modelled; a holiday looks like a normal
+session with no price movement.
+"""
+from datetime import date, datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from ..config import MARKET_CONFIG
+
+MARKET_TIMEZONE = ZoneInfo(MARKET_CONFIG["timezone"])
+
+
+def _parse_time(value: str) -> timedelta:
+    """"HH:MM" as an offset from midnight."""
+    hours, minutes = value.split(":")
+    return timedelta(hours=int(hours), minutes=int(minutes))
+
+
+SESSION_OPEN = _parse_time(MARKET_CONFIG["session_open"])
+SESSION_CLOSE = _parse_time(MARKET_CONFIG["session_close"])
+
+
+def market_now() -> datetime:
+    """The current time in the market timezone."""
+    return datetime.now(MARKET_TIMEZONE)
+
+
+def session_bounds(day: date) -> Optional[tuple[datetime, datetime]]:
+    """The (open, close) of the session on `day`, or None on weekends."""
+    if day.weekday() >= 5:
+        return None
+    midnight = datetime.combine(day, datetime.min.time(), tzinfo=MARKET_TIMEZONE)
+    return midnight + SESSION_OPEN, midnight + SESSION_CLOSE
+
+
+def next_session_close(now: Optional[datetime] = None) -> datetime:
+    """The first session close strictly after `now` (timezone-aware)."""
+    now = (now or market_now()).astimezone(MARKET_TIMEZONE)
+    for days_ahead in range(8):
+        bounds = session_bounds(now.date() + timedelta(days=days_ahead))
+        if bounds is not None and now < bounds[1]:
+            return bounds[1]
+    raise RuntimeError("No market session within a week")  # Unreachable with weekdays
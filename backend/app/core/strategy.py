@@ -1,29 +1,123 @@
 """
 Core trading strategy logic.
 
-This module contains the main MA crossover strategy implementation.
+A strategy is described as a set of vectorized rules over a price
+DataFrame instead of a per-bar loop:
+- The indicators it needs (added as columns)
+- Entry events (e.g. golden cross) plus an entry filter (e.g. price above MA)
+- Exit events (e.g. death cross)
+- Its stop-loss percentages
+
+The backtester, the live signal service and the signal scanner all run the
+same definition, so a new strategy only needs to be written once and gets
+the fast array-based backtest automatically.
 """
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Optional
 
 from ..config import STRATEGY_CONFIG
-from ..services.indicator_service import add_indicators
+from ..services.indicator_service import calculate_sma
 
 
-class MACrossoverStrategy:
+@dataclass
+class StrategyArrays:
+    """A strategy's rules evaluated over every bar, as NumPy arrays."""
+    close: np.ndarray
+    ready: np.ndarray     # Indicators (and their previous values) are available
+    entries: np.ndarray   # Open a position on this bar's close
+    exits: np.ndarray     # Close an open position on this bar's close
+
+
+class Strategy:
     """
-    10/50 Moving Average Crossover Strategy.
+    Base class for trading strategies expressed as vectorized rules.
 
-    Educational Summary:
-    - Buy when 10-day MA crosses above 50-day MA (golden cross)
-    - Sell when 10-day MA crosses below 50-day MA (death cross)
-    - Use 7% initial stop-loss to limit downside
-    - Use 10% trailing stop to protect profits
+    Subclasses add their indicator columns in add_indicators() and return
+    boolean Series (aligned to the DataFrame index) from entry_events(),
+    exit_events() and optionally entry_filter().
     """
 
-    def __init__(self):
-        self.short_period = STRATEGY_CONFIG["short_ma_period"]
-        self.long_period = STRATEGY_CONFIG["long_ma_period"]
+    name = "base"
+    description = ""
+
+    def __init__(
+        self,
+        initial_stop_pct: Optional[float] = None,
+        trailing_stop_pct: Optional[float] = None,
+    ):
+        if initial_stop_pct is None:
+            initial_stop_pct = STRATEGY_CONFIG["initial_stop_loss_pct"]
+        if trailing_stop_pct is None:
+            trailing_stop_pct = STRATEGY_CONFIG["trailing_stop_pct"]
+
+        self.initial_stop_pct = initial_stop_pct
+        self.trailing_stop_pct = trailing_stop_pct
+
+    @property
+    def indicator_columns(self) -> list[str]:
+        """Names of the indicator columns this strategy adds."""
+        return []
+
+    @property
+    def warmup_bars(self) -> int:
+        """Bars needed before the indicators produce values."""
+        return 0
+
+    def add_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return a copy of df with this strategy's indicator columns added."""
+        return df.copy()
+
+    def with_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add indicators only if they are missing."""
+        if all(column in df.columns for column in self.indicator_columns):
+            return df
+        return self.add_indicators(df)
+
+    def entry_events(self, df: pd.DataFrame) -> pd.Series:
+        """Bars where an entry is triggered (before filtering)."""
+        raise NotImplementedError
+
+    def exit_events(self, df: pd.DataFrame) -> pd.Series:
+        """Bars where an open position should be closed."""
+        raise NotImplementedError
+
+    def entry_filter(self, df: pd.DataFrame) -> pd.Series:
+        """Conditions that must also hold on the bar we buy (default: none)."""
+        return pd.Series(True, index=df.index)
+
+    def entry_strength(self, df: pd.DataFrame) -> float:
+        """How strong the entry on the last bar is, to rank competing entries (higher first)."""
+        return 0.0
+
+    def entry_rule(self, df: pd.DataFrame) -> pd.Series:
+        """Bars where a new position should be opened."""
+        df = self.with_indicators(df)
+        return self.entry_events(df) & self.entry_filter(df)
+
+    def exit_rule(self, df: pd.DataFrame) -> pd.Series:
+        """Bars where an open position should be closed."""
+        return self.exit_events(self.with_indicators(df))
+
+    def ready(self, df: pd.DataFrame) -> pd.Series:
+        """Bars where every indicator and its previous value is available."""
+        df = self.with_indicators(df)
+        ready = pd.Series(True, index=df.index)
+        for column in self.indicator_columns:
+            ready &= df[column].notna() & df[column].shift(1).notna()
+        return ready
+
+    def evaluate(self, df: pd.DataFrame) -> StrategyArrays:
+        """Evaluate every rule over the whole DataFrame at once."""
+        df = self.with_indicators(df)
+        ready = self.ready(df).to_numpy(dtype=bool)
+        return StrategyArrays(
+            close=df["Close"].to_numpy(dtype=float),
+            ready=ready,
+            entries=self.entry_rule(df).to_numpy(dtype=bool) & ready,
+            exits=self.exit_rule(df).to_numpy(dtype=bool) & ready,
+        )
 
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -31,48 +125,108 @@ class MACrossoverStrategy:
 
         Adds columns:
         - Signal: 1 for buy, -1 for sell, 0 for hold
-
-        Used primarily for backtesting.
         """
-        df = add_indicators(df.copy())
-
-        sma_short = df[f"SMA_{self.short_period}"]
-        sma_long = df[f"SMA_{self.long_period}"]
+        df = self.add_indicators(df)
+        arrays = self.evaluate(df)
+        df["Signal"] = np.where(arrays.entries, 1, np.where(arrays.exits, -1, 0))
+        return df
 
-        df["Signal"] = 0
+    def should_buy(self, df: pd.DataFrame) -> bool:
+        """Check if current bar has a buy signal."""
+        return bool(self.evaluate(df).entries[-1])
 
-        # Detect crossovers
-        for i in range(1, len(df)):
-            prev_short = sma_short.iloc[i - 1]
-            prev_long = sma_long.iloc[i - 1]
-            curr_short = sma_short.iloc[i]
-            curr_long = sma_long.iloc[i]
+    def should_sell(self, df: pd.DataFrame) -> bool:
+        """Check if current bar has a sell signal."""
+        return bool(self.evaluate(df).exits[-1])
 
-            # Skip if NaN
-            if pd.isna(prev_short) or pd.isna(prev_long) or pd.isna(curr_short) or pd.isna(curr_long):
-                continue
 
-            # Golden cross - buy
-            if prev_short <= prev_long and curr_short > curr_long:
-                # Additional confirmation: price above long MA
-                if df["Close"].iloc[i] > curr_long:
-                    df.iloc[i, df.columns.get_loc("Signal")] = 1
+class MACrossoverStrategy(Strategy):
+    """
+    10/50 Moving Average Crossover Strategy.
 
-            # Death cross - sell
-            elif prev_short >= prev_long and curr_short < curr_long:
-                df.iloc[i, df.columns.get_loc("Signal")] = -1
+    Educational Summary:
+    - Buy when 10-day MA crosses above 50-day MA (golden cross)
+    - Sell when 10-day MA crosses below 50-day MA (death cross)
+    - Use 7% initial stop-loss to limit downside
+    - Use 10% trailing stop to protect profits
+    """
 
+    name = "ma_crossover"
+    description = "Buy on golden cross above the long MA, sell on death cross"
+
+    def __init__(
+        self,
+        short_period: Optional[int] = None,
+        long_period: Optional[int] = None,
+        **stop_kwargs,
+    ):
+        super().__init__(**stop_kwargs)
+        self.short_period = short_period or STRATEGY_CONFIG["short_ma_period"]
+        self.long_period = long_period or STRATEGY_CONFIG["long_ma_period"]
+
+    @property
+    def short_column(self) -> str:
+        return f"SMA_{self.short_period}"
+
+    @property
+    def long_column(self) -> str:
+        return f"SMA_{self.long_period}"
+
+    @property
+    def indicator_columns(self) -> list[str]:
+        return [self.short_column, self.long_column]
+
+    @property
+    def warmup_bars(self) -> int:
+        return self.long_period
+
+    def add_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        df[self.short_column] = calculate_sma(df["Close"], self.short_period)
+        df[self.long_column] = calculate_sma(df["Close"], self.long_period)
         return df
 
-    def should_buy(self, df: pd.DataFrame) -> bool:
-        """Check if current bar has a buy signal."""
-        signals = self.generate_signals(df)
-        return signals["Signal"].iloc[-1] == 1
+    def entry_events(self, df: pd.DataFrame) -> pd.Series:
+        """Golden cross: short MA crosses above long MA."""
+        short, long = df[self.short_column], df[self.long_column]
+        return (short.shift(1) <= long.shift(1)) & (short > long)
 
-    def should_sell(self, df: pd.DataFrame) -> bool:
-        """Check if current bar has a sell signal."""
-        signals = self.generate_signals(df)
-        return signals["Signal"].iloc[-1] == -1
+    def exit_events(self, df: pd.DataFrame) -> pd.Series:
+        """Death cross: short MA crosses below long MA."""
+        short, long = df[self.short_column], df[self.long_column]
+        return (short.shift(1) >= long.shift(1)) & (short < long)
+
+    def entry_filter(self, df: pd.DataFrame) -> pd.Series:
+        """Confirmation: price must be above the long MA."""
+        return df["Close"] > df[self.long_column]
+
+    def entry_strength(self, df: pd.DataFrame) -> float:
+        """How far the short MA has pulled above the long MA (fraction of the long MA)."""
+        df = self.with_indicators(df)
+        short, long = df[self.short_column].iloc[-1], df[self.long_column].iloc[-1]
+        if pd.isna(short) or pd.isna(long) or long == 0:
+            return 0.0
+        return float((short - long) / long)
+
+
+# Available strategies by name
+STRATEGIES: dict[str, type[Strategy]] = {
+    MACrossoverStrategy.name: MACrossoverStrategy,
+}
+
+
+def get_strategy(name: Optional[str] = None) -> Strategy:
+    """
+    Create a strategy by name (default: MA crossover).
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name is None:
+        return MACrossoverStrategy()
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{name}'. Available: {', '.join(STRATEGIES)}")
+    return STRATEGIES[name]()
 
 
 # Singleton instance
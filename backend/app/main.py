@@ -8,9 +8,18 @@ import json
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
-from .config import API_CONFIG
-from .api.routes import stocks, signals, portfolio, trades, backtest, benchmark, watchlist
+from .config import API_CONFIG, ACCOUNT_CONFIG, AUTO_TRADER_CONFIG
+from .api.routes import stocks, signals, portfolio, trades, orders, auto_trading, backtest, benchmark, watchlist
+from .services.auto_trader import auto_trader
+from .services.broadcast_hub import BroadcastHub
 from .services.finnhub_service import finnhub_service
+from .services.job_service import backtest_job_service
+from .services.order_engine import order_engine
+from .services.portfolio_service import portfolio_accounts
+from .services.snapshot_scheduler import snapshot_scheduler
+from .services.stop_engine import stop_engine
+from .services.subscription_manager import Priority, client_owner, subscription_manager
+from .services.symbol_service import symbol_service
 from .services.watchlist_service import watchlist_service
 
 # Create FastAPI app
@@ -35,6 +44,8 @@ app.include_router(stocks.router, prefix="/api")
 app.include_router(signals.router, prefix="/api")
 app.include_router(portfolio.router, prefix="/api")
 app.include_router(trades.router, prefix="/api")
+app.include_router(orders.router, prefix="/api")
+app.include_router(auto_trading.router, prefix="/api")
 app.include_router(backtest.router, prefix="/api")
 app.include_router(benchmark.router, prefix="/api")
 app.include_router(watchlist.router)
@@ -53,6 +64,8 @@ async def root():
             "signals": "/api/signals",
             "portfolio": "/api/portfolio",
             "trades": "/api/trades",
+            "orders": "/api/orders",
+            "auto_trader": "/api/auto-trader",
             "backtest": "/api/backtest",
             "benchmark": "/api/benchmark",
             "watchlist": "/api/watchlist",
@@ -66,63 +79,97 @@ async def health_check():
     return {"status": "healthy"}
 
 
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
+# WebSocket fan-out: every client has its own sender, so a slow one never delays the rest
+price_hub = BroadcastHub("prices")
+portfolio_hubs: dict[str, BroadcastHub] = {}   # account id -> connections
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
 
-    def disconnect(self, websocket: WebSocket):
-        try:
-            self.active_connections.remove(websocket)
-        except ValueError:
-            pass  # Already removed
+@app.on_event("startup")
+async def startup_event():
+    """Start Finnhub WebSocket connection and portfolio streaming on app startup."""
+    loop = asyncio.get_running_loop()
 
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                pass
+    # Load saved accounts so their open positions are valued and stop-protected
+    portfolio_accounts.load_persisted()
 
+    # Push portfolio changes to /ws/portfolio clients (changes can come
+    # from request threads, so hand them to the event loop)
+    def on_portfolio_update(account_id: str, update: dict):
+        hub = portfolio_hubs.get(account_id)
+        if hub is not None:
+            loop.call_soon_threadsafe(hub.publish, update)
 
-ws_manager = ConnectionManager()
+    portfolio_accounts.add_listener(on_portfolio_update)
 
+    # Start the backtest worker pool in the background (spawning the
+    # manager process takes seconds, so never on the event loop)
+    asyncio.create_task(asyncio.to_thread(backtest_job_service.start))
+
+    # Record portfolio values during market sessions (value history and stats)
+    snapshot_scheduler.start()
+
+    # Trade strategy signals hands-free (opt-in)
+    if AUTO_TRADER_CONFIG["enabled"]:
+        auto_trader.start()
 
-@app.on_event("startup")
-async def startup_event():
-    """Start Finnhub WebSocket connection on app startup."""
     if finnhub_service.is_configured:
-        # Subscribe to all symbols in watchlist
-        for symbol in watchlist_service.get_watchlist():
-            await finnhub_service.subscribe(symbol)
+        # Stream open positions and orders, viewed symbols and the watchlist
+        # (rotating through the watchlist if it doesn't fit the symbol cap)
+        subscription_manager.sync_app_interest()
+        await subscription_manager.reconcile()
+        subscription_manager.start()
+        finnhub_service.add_callback(subscription_manager.on_tick)
 
         # Start WebSocket connection in background
         asyncio.create_task(finnhub_service.connect())
 
-        # Add callback to broadcast price updates
+        # Add callback to broadcast price updates (a client that falls
+        # behind only gets the latest price of each symbol)
         def on_price_update(symbol: str, price_data: dict):
-            asyncio.create_task(ws_manager.broadcast({
+            price_hub.publish({
                 "type": "price_update",
                 "data": price_data
-            }))
+            }, key=symbol)
 
         finnhub_service.add_callback(on_price_update)
 
+        # Revalue open positions on every tick (moving trailing stops),
+        # then fire any stops and fill any resting orders the tick crossed,
+        # and let the auto-trader re-evaluate the symbol
+        def on_position_tick(symbol: str, price_data: dict):
+            portfolio_accounts.on_price(symbol, price_data["price"])
+            stop_engine.on_tick(symbol, price_data["price"])
+            order_engine.on_tick(symbol, price_data["price"])
+            auto_trader.on_tick(symbol, price_data["price"])
+
+        finnhub_service.add_callback(on_position_tick)
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Disconnect from Finnhub on shutdown."""
+    """Disconnect from Finnhub, stop background workers and save pending state on shutdown."""
+    await subscription_manager.stop()
     await finnhub_service.disconnect()
+    await snapshot_scheduler.stop()
+    await auto_trader.stop()
+    backtest_job_service.shutdown()
+    portfolio_accounts.flush()
+    watchlist_service.flush()
+    symbol_service.flush()
 
 
 @app.websocket("/ws/prices")
 async def websocket_prices(websocket: WebSocket):
-    """WebSocket endpoint for real-time price updates."""
-    await ws_manager.connect(websocket)
+    """
+    WebSocket endpoint for real-time price updates.
+
+    Clients can send {"action": "subscribe" | "unsubscribe", "symbol": ...};
+    their symbols stream while they are connected and are released when
+    they disconnect.
+    """
+    await websocket.accept()
+    client = price_hub.register(websocket)
+    owner = client_owner(client.id)
 
     try:
         # Send current prices on connect
@@ -132,6 +179,7 @@ async def websocket_prices(websocket: WebSocket):
                 "type": "initial_prices",
                 "data": prices
             })
+        price_hub.start(client)
 
         # Keep connection alive and handle client messages
         while True:
@@ -142,16 +190,58 @@ async def websocket_prices(websocket: WebSocket):
                 if message.get("action") == "subscribe":
                     symbol = message.get("symbol", "").upper()
                     if symbol:
-                        await finnhub_service.subscribe(symbol)
+                        subscription_manager.acquire(owner, symbol, Priority.VIEWER)
                 elif message.get("action") == "unsubscribe":
                     symbol = message.get("symbol", "").upper()
                     if symbol:
-                        await finnhub_service.unsubscribe(symbol)
+                        subscription_manager.release(owner, symbol)
             except json.JSONDecodeError:
                 pass
 
-    except WebSocketDisconnect:
-        ws_manager.disconnect(websocket)
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # Disconnected (RuntimeError: closed by the hub as too slow)
+    finally:
+        price_hub.unregister(client)
+        subscription_manager.release_owner(owner)
+
+
+@app.websocket("/ws/portfolio")
+async def websocket_portfolio(websocket: WebSocket, account_id: str = ACCOUNT_CONFIG["default_account"]):
+    """
+    WebSocket endpoint for live portfolio valuation.
+
+    Sends the full portfolio of `account_id` on connect, then only the
+    fields that change ("portfolio_update" messages) as prices tick and
+    trades execute.
+    """
+    try:
+        account = portfolio_accounts.get(account_id)
+    except ValueError:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    hub = portfolio_hubs.setdefault(account_id, BroadcastHub(f"portfolio {account_id}"))
+    client = hub.register(websocket)
+
+    try:
+        portfolio = await asyncio.to_thread(account.get_portfolio)
+        await websocket.send_json({
+            "type": "portfolio",
+            "data": portfolio.model_dump(mode="json"),
+        })
+        hub.start(client)
+
+        # Keep connection alive
+        while True:
+            await websocket.receive_text()
+
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # Disconnected (RuntimeError: closed by the hub as too slow)
+    finally:
+        hub.unregister(client)
+        if not hub.clients:
+            portfolio_hubs.pop(account_id, None)
 
 
 @app.get("/api/realtime/status")
@@ -161,7 +251,13 @@ async def realtime_status():
         "configured": finnhub_service.is_configured,
         "subscribed_symbols": finnhub_service.subscribed_symbols,
         "symbol_count": len(finnhub_service.subscribed_symbols),
-        "max_symbols": 50,
+        "max_symbols": subscription_manager.max_symbols,
+        "subscriptions": subscription_manager.get_status(),
+        "price_stream": price_hub.get_status(),
+        "stop_engine": stop_engine.get_status(),
+        "order_engine": order_engine.get_status(),
+        "snapshots": snapshot_scheduler.get_status(),
+        "auto_trader": auto_trader.get_status(),
     }
 
 
@@ -0,0 +1,80 @@
+"""
+Resting order models for paper trading.
+"""
+from pydantic import BaseModel
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from .trade import TradeAction
+
+
+class OrderType(str, Enum):
+    """
+    How a resting order is filled.
+
+    - limit: buy at or below / sell at or above limit_price
+    - stop: once the price reaches stop_price (rising for buys, falling
+      for sells), fill at the market
+    - stop_limit: once the price reaches stop_price, rest as a limit
+      order at limit_price
+    """
+    LIMIT = "limit"
+    STOP = "stop"
+    STOP_LIMIT = "stop_limit"
+
+
+class TimeInForce(str, Enum):
+    """How long an unfilled order stays open."""
+    DAY = "day"  # Until the end of the current (or next) market session
+    GTC = "gtc"  # Good 'til cancelled
+
+
+class OrderStatus(str, Enum):
+    """Lifecycle state of an order."""
+    OPEN = "open"
+    FILLED = "filled"
+    CANCELLED = "cancelled"
+    EXPIRED = "expired"
+    REJECTED = "rejected"  # Could not be executed when triggered
+
+
+class OrderRequest(BaseModel):
+    """Request to place a resting order."""
+    symbol: str
+    action: TradeAction
+    order_type: OrderType
+    shares: Optional[int] = None  # Buys: if None, sized with the 2% risk rule. Sells close the position.
+    limit_price: Optional[float] = None
+    stop_price: Optional[float] = None
+    time_in_force: TimeInForce = TimeInForce.GTC
+
+
+class Order(BaseModel):
+    """A resting order and its outcome."""
+    id: str
+    symbol: str
+    action: TradeAction
+    order_type: OrderType
+    shares: Optional[int] = None  # None for sells (the whole position)
+    limit_price: Optional[float] = None
+    stop_price: Optional[float] = None
+    time_in_force: TimeInForce
+    status: OrderStatus = OrderStatus.OPEN
+    created_at: datetime
+    expires_at: Optional[datetime] = None
+
+    # Stop-limit orders rest as limit orders once the stop is reached
+    triggered_at: Optional[datetime] = None
+
+    # Outcome
+    closed_at: Optional[datetime] = None
+    fill_price: Optional[float] = None
+    trade_id: Optional[str] = None
+    reason: Optional[str] = None  # Why it was rejected or cancelled
+
+
+class OrderList(BaseModel):
+    """List of orders."""
+    orders: list[Order]
+    open_orders: int
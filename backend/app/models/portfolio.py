@@ -52,3 +52,11 @@ class PortfolioStats(BaseModel):
     largest_loss: float
     max_drawdown: float
     max_drawdown_percent: float
+    max_drawdown_duration: int = 0                   # Snapshots spent below a prior peak
+    max_drawdown_duration_days: Optional[int] = None
+    cagr_percent: Optional[float] = None
+    annual_volatility_percent: Optional[float] = None
+    sharpe_ratio: Optional[float] = None
+    sortino_ratio: Optional[float] = None
+    calmar_ratio: Optional[float] = None
+    turnover: Optional[float] = None                 # Traded value / average value
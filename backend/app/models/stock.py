@@ -34,3 +34,14 @@ class StockLatest(BaseModel):
     change_percent: float
     volume: int
     timestamp: datetime
+
+
+class SymbolInfo(BaseModel):
+    """Cached metadata about a ticker symbol."""
+    symbol: str
+    valid: bool                        # Yahoo knows the symbol and quotes it
+    name: Optional[str] = None
+    exchange: Optional[str] = None
+    asset_type: Optional[str] = None   # Yahoo quote type, e.g. EQUITY, ETF, CRYPTOCURRENCY
+    currency: Optional[str] = None
+    fetched_at: datetime
@@ -39,7 +39,18 @@ class Trade(BaseModel):
     exit_reason: Optional[str] = None  # "signal", "initial_stop", "trailing_stop", "manual"
 
 
+class TradeBatchRequest(BaseModel):
+    """Several trades to execute all-or-nothing."""
+    trades: list[TradeRequest]
+
+
+class TradeBatchResult(BaseModel):
+    """Trades executed by a batch (sells first)."""
+    trades: list[Trade]
+
+
 class TradeHistory(BaseModel):
-    """List of all trades."""
+    """A page of trades."""
     trades: list[Trade]
-    total_trades: int
+    total_trades: int  # All recorded trades, not just this page
+    next_cursor: Optional[str] = None  # Pass as `cursor` for the next page
@@ -0,0 +1,324 @@
+"""
+Automated strategy execution.
+
+The auto-trader runs the strategy for every watchlist symbol (and every
+symbol it holds) and trades the signals in one paper trading account,
+without anyone polling /api/signals:
+
+    new daily bars ─┐
+                    ├─> mark symbol dirty ─> cycle: evaluate dirty symbols
+    price ticks ────┘                               sell exits, then buy the
+                                                    best-ranked entries
+
+Educational Note:
+A crossover signal only looks back a few bars, and the moving averages
+behind it only need their own period of closes. So each symbol keeps just
+that window of recent bars; a tick replaces the close of today's bar and
+only that symbol is re-evaluated, over ~55 bars rather than a year. The
+result is identical to evaluating the full history.
+
+Each cycle has a time budget. Symbols it could not get to stay queued,
+oldest first, for the next cycle - so a burst of ticks on 50 symbols
+delays a few evaluations instead of stalling the event loop. When more
+entries fire than there are free position slots, the strongest signals
+(freshest crossover, then widest MA spread) are bought first.
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import pandas as pd
+
+from ..config import AUTO_TRADER_CONFIG, DATA_CONFIG, STRATEGY_CONFIG
+from ..core.market_hours import MARKET_TIMEZONE, market_now, session_bounds
+from ..core.strategy import Strategy, get_strategy
+from .data_service import data_service
+from .portfolio_service import portfolio_accounts
+from .signal_service import MAX_SIGNAL_AGE_BARS, detect_crossover, is_buy_signal, is_sell_signal
+from .watchlist_service import watchlist_service
+
+logger = logging.getLogger(__name__)
+
+
+def in_session(now: Optional[datetime] = None) -> bool:
+    """True during a regular market session."""
+    now = (now or market_now()).astimezone(MARKET_TIMEZONE)
+    bounds = session_bounds(now.date())
+    return bounds is not None and bounds[0] <= now < bounds[1]
+
+
+class AutoTrader:
+    """
+    Event-driven strategy loop for one paper trading account.
+
+    Ticks (on_tick) and bar refreshes mark symbols dirty and wake the loop;
+    nothing is evaluated while nothing changes. Evaluation and trading run
+    in a worker thread so the event loop keeps serving requests.
+    """
+
+    def __init__(self, strategy: Optional[Strategy] = None):
+        self.strategy = strategy or get_strategy(AUTO_TRADER_CONFIG["strategy"])
+        self.account_id = AUTO_TRADER_CONFIG["account_id"]
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._budget = AUTO_TRADER_CONFIG["max_cycle_ms"] / 1000
+        self._bars_refresh = timedelta(minutes=AUTO_TRADER_CONFIG["bars_refresh_minutes"])
+
+        # Bars one evaluation needs: the indicator warmup, the bar before it
+        # and the bars a signal stays valid for
+        self.window = self.strategy.warmup_bars + MAX_SIGNAL_AGE_BARS + 1
+
+        self._lock = threading.Lock()                  # Guards the symbol state below
+        self._bars: dict[str, pd.DataFrame] = {}       # symbol -> last `window` daily bars
+        self._live: dict[str, float] = {}              # symbol -> latest tick
+        self._dirty: dict[str, None] = {}              # Symbols to evaluate, oldest first
+        self._entered: dict[str, date] = {}            # symbol -> crossover date already bought
+        self._bars_at: Optional[datetime] = None
+
+        # Counters and timing, for get_status()
+        self.cycles = 0
+        self.evaluations = 0
+        self.overruns = 0
+        self.errors = 0
+        self.trades = 0
+        self.ranked_out = 0
+        self.last_cycle_at: Optional[datetime] = None
+        self.last_cycle_ms: Optional[float] = None
+        self.max_cycle_ms = 0.0
+        self._total_cycle_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # --- Lifecycle -----------------------------------------------------
+
+    def start(self) -> None:
+        """Start the trading loop on the running event loop."""
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._bars_at = None
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the trading loop (open positions stay stop-protected)."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            now = datetime.now()
+            if self._bars_at is None or now - self._bars_at >= self._bars_refresh:
+                try:
+                    if await asyncio.to_thread(self.refresh_bars):
+                        self._wake.set()
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"Auto-trader could not refresh bars: {e}")
+                self._bars_at = now
+
+            # Sleep until something changes or new bars are due
+            timeout = (self._bars_at + self._bars_refresh - datetime.now()).total_seconds()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(timeout, 0))
+            except asyncio.TimeoutError:
+                continue
+            self._wake.clear()
+
+            if AUTO_TRADER_CONFIG["session_only"] and not in_session():
+                continue  # Symbols stay dirty until the session opens
+            await self.run_cycle()
+
+            # Let a burst of ticks accumulate into the next cycle
+            await asyncio.sleep(AUTO_TRADER_CONFIG["min_cycle_seconds"])
+
+    # --- Inputs --------------------------------------------------------
+
+    def symbols(self) -> list[str]:
+        """Symbols traded: the watchlist plus anything the account holds."""
+        account = portfolio_accounts.get(self.account_id)
+        return sorted(set(watchlist_service.get_watchlist()) | set(account.positions))
+
+    def refresh_bars(self) -> int:
+        """
+        Load recent daily bars for every traded symbol in one batch, marking
+        symbols whose bars changed (worker thread).
+
+        Returns:
+            Number of symbols marked dirty
+        """
+        symbols = self.symbols()
+        data = data_service.get_bulk_stock_data(symbols, days=DATA_CONFIG["lookback_days"])
+
+        changed = 0
+        with self._lock:
+            for symbol in set(self._bars) - set(symbols):
+                del self._bars[symbol]
+                self._live.pop(symbol, None)
+                self._dirty.pop(symbol, None)
+
+            for symbol, df in data.items():
+                bars = df[["Close"]].tail(self.window)
+                previous = self._bars.get(symbol)
+                if previous is not None and previous.index[-1] == bars.index[-1] \
+                        and previous["Close"].iloc[-1] == bars["Close"].iloc[-1]:
+                    continue
+                self._bars[symbol] = bars
+                self._dirty[symbol] = None
+                changed += 1
+        return changed
+
+    def on_tick(self, symbol: str, price: float) -> None:
+        """Record a price tick and wake the loop (called on the event loop)."""
+        if symbol not in self._bars:
+            return
+        with self._lock:
+            self._live[symbol] = price
+            self._dirty[symbol] = None
+        if self._wake is not None:
+            self._wake.set()
+
+    def _frame(self, symbol: str) -> Optional[pd.DataFrame]:
+        """The evaluation window, with the latest tick as today's close (caller holds the lock)."""
+        bars = self._bars.get(symbol)
+        if bars is None:
+            return None
+        price = self._live.get(symbol)
+        if price is None:
+            return bars
+
+        today = pd.Timestamp(market_now().date(), tz=bars.index.tz)
+        if bars.index[-1].normalize() == today:
+            bars = bars.copy()
+            bars.iloc[-1, bars.columns.get_loc("Close")] = price
+            return bars
+        provisional = pd.DataFrame({"Close": [price]}, index=pd.DatetimeIndex([today]))
+        return pd.concat([bars, provisional]).tail(self.window)
+
+    # --- Trading cycle -------------------------------------------------
+
+    async def run_cycle(self) -> dict:
+        """Evaluate the dirty symbols and trade their signals."""
+        started = time.perf_counter()
+        try:
+            result = await asyncio.to_thread(self._cycle)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Auto-trader cycle failed: {e}")
+            return {}
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        self.cycles += 1
+        self.last_cycle_at = datetime.now()
+        self.last_cycle_ms = round(duration_ms, 1)
+        self.max_cycle_ms = max(self.max_cycle_ms, self.last_cycle_ms)
+        self._total_cycle_ms += duration_ms
+
+        # Symbols left over from the time budget go first next cycle
+        if result["deferred"]:
+            self.overruns += 1
+            self._wake.set()
+        return result
+
+    def _cycle(self) -> dict:
+        """Evaluate dirty symbols within the time budget, then trade (worker thread)."""
+        deadline = time.perf_counter() + self._budget
+        account = portfolio_accounts.get(self.account_id)
+        with self._lock:
+            pending = list(self._dirty)
+
+        exits: list[tuple[str, float]] = []
+        entries: list[tuple[int, float, str, float, date]] = []
+        evaluated = 0
+        for symbol in pending:
+            if evaluated and time.perf_counter() >= deadline:
+                break
+            with self._lock:
+                self._dirty.pop(symbol, None)
+                frame = self._frame(symbol)
+            if frame is None:
+                continue
+            evaluated += 1
+            try:
+                frame = self.strategy.with_indicators(frame)   # Once for every check below
+                price = float(frame["Close"].iloc[-1])
+                if symbol in account.positions:
+                    if is_sell_signal(frame, self.strategy):
+                        exits.append((symbol, price))
+                elif is_buy_signal(frame, self.strategy):
+                    _, days_since = detect_crossover(frame, self.strategy)
+                    crossed_on = frame.index[-1 - days_since].date()
+                    if self._entered.get(symbol) != crossed_on:
+                        strength = self.strategy.entry_strength(frame)
+                        entries.append((days_since, -strength, symbol, price, crossed_on))
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Auto-trader could not evaluate {symbol}: {e}")
+        self.evaluations += evaluated
+
+        # Exits first, so their slots and cash are free for new entries
+        traded = 0
+        for symbol, price in exits:
+            try:
+                account.sell(symbol, price=price, exit_reason="signal")
+                traded += 1
+            except ValueError as e:
+                logger.info(f"Auto-trader skipped exit of {symbol}: {e}")
+
+        entries.sort()
+        free = STRATEGY_CONFIG["max_positions"] - len(account.positions)
+        for days_since, _, symbol, price, crossed_on in entries:
+            if free <= 0:
+                self.ranked_out += 1
+                continue
+            try:
+                account.buy(symbol, price=price)
+            except ValueError as e:
+                logger.info(f"Auto-trader skipped entry into {symbol}: {e}")
+                continue
+            self._entered[symbol] = crossed_on
+            traded += 1
+            free -= 1
+        self.trades += traded
+
+        with self._lock:
+            deferred = len(self._dirty)
+        return {"evaluated": evaluated, "deferred": deferred, "trades": traded}
+
+    def get_status(self) -> dict:
+        """Activity and cycle latency, for monitoring."""
+        with self._lock:
+            tracked, dirty = len(self._bars), len(self._dirty)
+        return {
+            "running": self.running,
+            "account_id": self.account_id,
+            "strategy": self.strategy.name,
+            "symbols": tracked,
+            "pending_symbols": dirty,
+            "cycles": self.cycles,
+            "evaluations": self.evaluations,
+            "trades": self.trades,
+            "ranked_out_entries": self.ranked_out,
+            "errors": self.errors,
+            "budget_ms": AUTO_TRADER_CONFIG["max_cycle_ms"],
+            "overruns": self.overruns,
+            "last_cycle_at": self.last_cycle_at.isoformat() if self.last_cycle_at else None,
+            "last_cycle_ms": self.last_cycle_ms,
+            "avg_cycle_ms": round(self._total_cycle_ms / self.cycles, 1) if self.cycles else None,
+            "max_cycle_ms": self.max_cycle_ms,
+            "bars_refreshed_at": self._bars_at.isoformat() if self._bars_at else None,
+        }
+
+
+# Singleton instance
+auto_trader = AutoTrader()
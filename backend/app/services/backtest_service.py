@@ -6,17 +6,18 @@ Backtesting shows how a strategy WOULD have performed in the past.
 It does NOT guarantee future performance. Markets change, and
 strategies that worked before may not work in the future.
 """
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional
 from dataclasses import dataclass
 
-from ..config import STRATEGY_CONFIG, PAPER_TRADING_CONFIG
-from ..core.strategy import MACrossoverStrategy
-from ..core.stop_loss import StopLossManager
+from ..config import PAPER_TRADING_CONFIG
+from ..core.strategy import MACrossoverStrategy, Strategy, get_strategy
 from ..core.position_sizer import calculate_position_size, calculate_stop_loss_price
 from .data_service import data_service
-from .indicator_service import add_indicators
+from .metrics_service import compute_metrics, relative_metrics, TRADING_DAYS_PER_YEAR
+from .timeseries_service import encode_series, downsample_indices
 
 
 @dataclass
@@ -32,6 +33,20 @@ class BacktestTrade:
     exit_reason: str = ""
 
 
+@dataclass
+class BenchmarkComparison:
+    """Buy-and-hold benchmark on the backtest's dates, with relative stats."""
+    symbol: str
+    final_value: float
+    total_return_percent: float
+    equity_curve: list[tuple[datetime, float]]
+    alpha_percent: Optional[float] = None          # Annualized, vs beta-adjusted benchmark
+    beta: Optional[float] = None
+    tracking_error_percent: Optional[float] = None  # Annualized
+    correlation: Optional[float] = None
+    information_ratio: Optional[float] = None
+
+
 @dataclass
 class BacktestResult:
     """Results from a backtest run."""
@@ -50,6 +65,101 @@ class BacktestResult:
     max_drawdown_percent: float
     equity_curve: list[tuple[datetime, float]]
     trades: list[BacktestTrade]
+    # Extended metrics (see metrics_service.compute_metrics)
+    max_drawdown_duration: int = 0             # Bars spent below a prior peak
+    max_drawdown_duration_days: Optional[int] = None
+    cagr_percent: Optional[float] = None
+    annual_volatility_percent: Optional[float] = None
+    sharpe_ratio: Optional[float] = None
+    sortino_ratio: Optional[float] = None
+    calmar_ratio: Optional[float] = None
+    exposure_percent: Optional[float] = None   # % of bars holding a position
+    turnover: Optional[float] = None           # Traded value / average equity
+    benchmark: Optional[BenchmarkComparison] = None
+
+
+# Called as progress_callback(bars_done, total_bars, new_equity_points)
+ProgressCallback = Callable[[int, int, list[tuple[datetime, float]]], None]
+
+
+def _stop_levels(
+    close: np.ndarray,
+    ready: np.ndarray,
+    entry_price: float,
+    initial_stop_pct: float,
+    trailing_stop_pct: float,
+) -> tuple[np.ndarray, np.ndarray, float]:
+    """
+    Stop levels for every bar after an entry, mirroring StopLossManager.
+
+    The trailing stop follows the highest close seen on bars where the
+    strategy was evaluated, and never moves down.
+
+    Returns:
+        (active_stop, trailing_stop, initial_stop) - arrays align with close
+    """
+    initial_stop = round(entry_price * (1 - initial_stop_pct), 2)
+    highest = np.maximum.accumulate(np.where(ready, close, -np.inf))
+    highest = np.maximum(highest, entry_price)
+    trailing_stop = np.round(highest * (1 - trailing_stop_pct), 2)
+    return np.maximum(trailing_stop, initial_stop), trailing_stop, initial_stop
+
+
+def history_days_needed(start_date: Optional[str] = None) -> int:
+    """
+    Days of history to fetch for a backtest starting at start_date.
+
+    Includes an extra buffer so indicators are warmed up by the start date.
+    """
+    if start_date:
+        start_dt = pd.to_datetime(start_date)
+        days_from_start = (datetime.now() - start_dt).days
+        days_needed = days_from_start + 100  # Extra buffer for MA warmup
+        return max(days_needed, 500)  # At least ~2 years
+    return 500  # Default to ~2 years
+
+
+def _compare_to_benchmark(
+    benchmark: str,
+    index: pd.DatetimeIndex,
+    values: np.ndarray,
+    initial_capital: float,
+    days: int,
+) -> BenchmarkComparison:
+    """
+    Buy-and-hold a benchmark over the backtest's dates and compare.
+
+    The benchmark's closes come from the data cache and are aligned to the
+    backtest's date index (carrying the last close over any missing day),
+    so both curves share one date axis.
+
+    Args:
+        benchmark: Benchmark symbol (e.g. SPY)
+        index: Backtest date index (timezone-naive)
+        values: Strategy equity for every bar of index
+        initial_capital: Capital invested in the benchmark on the first bar
+        days: Days of history to load
+
+    Raises:
+        ValueError: If the benchmark has no data at the start of the backtest
+    """
+    closes = data_service.get_stock_data(benchmark, days=days)["Close"]
+    closes = pd.Series(closes.to_numpy(dtype=float), index=closes.index.tz_localize(None))
+    aligned = closes.reindex(index, method="ffill").to_numpy(dtype=float)
+
+    if np.isnan(aligned).any():
+        raise ValueError(f"Benchmark {benchmark} has no data for the start of the backtest period.")
+
+    curve = initial_capital * aligned / aligned[0]
+    final_value = float(curve[-1])
+
+    return BenchmarkComparison(
+        symbol=benchmark,
+        final_value=round(final_value, 2),
+        total_return_percent=round((final_value / initial_capital - 1) * 100, 2),
+        equity_curve=list(zip(index[1:].to_pydatetime(), curve[1:].tolist())),
+        **relative_metrics(values, curve),
+    )
 
 
 def run_backtest(
@@ -57,35 +167,45 @@ def run_backtest(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     initial_capital: float = None,
+    progress_callback: Optional[ProgressCallback] = None,
+    strategy: Optional[Strategy] = None,
+    data: Optional[pd.DataFrame] = None,
+    benchmark: Optional[str] = None,
 ) -> BacktestResult:
     """
-    Run a backtest of the MA crossover strategy.
+    Run a backtest of a strategy (default: MA crossover).
+
+    The strategy's rules are evaluated for every bar at once as arrays.
+    The simulation then jumps from one entry to the next exit, so Python
+    only loops once per trade rather than once per bar.
 
     Args:
         symbol: Stock symbol to backtest
         start_date: Start date (YYYY-MM-DD format, default 1 year ago)
         end_date: End date (YYYY-MM-DD format, default today)
         initial_capital: Starting capital (default from config)
+        progress_callback: Optional hook called after each simulated trade
+            with the equity points recorded since the previous call.
+            Raising from the callback aborts the backtest (used for job
+            cancellation).
+        strategy: Strategy to test (default: MACrossoverStrategy)
+        data: Pre-loaded daily bars (default: fetched via data_service).
+            Should cover history_days_needed(start_date) days.
+        benchmark: Optional symbol to compare against with buy-and-hold
+            on the same dates (alpha, beta, tracking error, correlation)
 
     Returns:
         BacktestResult with performance metrics
     """
     if initial_capital is None:
         initial_capital = PAPER_TRADING_CONFIG["initial_balance"]
+    if strategy is None:
+        strategy = MACrossoverStrategy()
 
-    # Calculate how many days of data we need
-    # Need extra buffer for MA calculation (50 days) before the start date
-    if start_date:
-        start_dt = pd.to_datetime(start_date)
-        days_from_start = (datetime.now() - start_dt).days
-        days_needed = days_from_start + 100  # Extra buffer for MA warmup
-        days_needed = max(days_needed, 500)  # At least ~2 years
-    else:
-        days_needed = 500  # Default to ~2 years
-
-    # Fetch data with enough history
-    df = data_service.get_stock_data(symbol, days=days_needed)
-    df = add_indicators(df)
+    # Fetch data with enough history for indicator warmup
+    if data is None:
+        data = data_service.get_stock_data(symbol, days=history_days_needed(start_date))
+    df = strategy.add_indicators(data)
 
     # Convert index to timezone-naive for comparison
     # yfinance returns timezone-aware timestamps (America/New_York)
@@ -97,122 +217,129 @@ def run_backtest(
     if end_date:
         df = df[df.index <= pd.to_datetime(end_date)]
 
-    if len(df) < STRATEGY_CONFIG["long_ma_period"] + 1:
-        raise ValueError(f"Insufficient data for backtest. Need at least {STRATEGY_CONFIG['long_ma_period'] + 1} trading days. Try a wider date range or check that the dates are valid.")
+    min_bars = strategy.warmup_bars + 1
+    if len(df) < min_bars:
+        raise ValueError(f"Insufficient data for backtest. Need at least {min_bars} trading days. Try a wider date range or check that the dates are valid.")
+
+    # Evaluate entry/exit rules for every bar in one pass
+    arrays = strategy.evaluate(df)
+    close = arrays.close
+    dates = df.index.to_pydatetime()
+    n = len(df)
+
+    # Candidate entry bars (the first bar only seeds the previous values)
+    entry_bars = np.flatnonzero(arrays.entries)
+    entry_bars = entry_bars[entry_bars >= 1]
 
-    # Initialize backtest state
     cash = initial_capital
-    position: Optional[dict] = None
     trades: list[BacktestTrade] = []
-    equity_curve: list[tuple[datetime, float]] = []
-
-    short_ma = f"SMA_{STRATEGY_CONFIG['short_ma_period']}"
-    long_ma = f"SMA_{STRATEGY_CONFIG['long_ma_period']}"
-
-    # Run through each day
-    for i in range(1, len(df)):
-        date = df.index[i].to_pydatetime()
-        close = df["Close"].iloc[i]
-        prev_close = df["Close"].iloc[i - 1]
-
-        sma_short = df[short_ma].iloc[i]
-        sma_long = df[long_ma].iloc[i]
-        prev_sma_short = df[short_ma].iloc[i - 1]
-        prev_sma_long = df[long_ma].iloc[i - 1]
-
-        # Skip if indicators not ready
-        if pd.isna(sma_short) or pd.isna(sma_long) or pd.isna(prev_sma_short) or pd.isna(prev_sma_long):
-            portfolio_value = cash + (position["shares"] * close if position else 0)
-            equity_curve.append((date, portfolio_value))
-            continue
-
-        # Check for signals and stops
-        if position:
-            # Update stop loss
-            stop_manager: StopLossManager = position["stop_manager"]
-            stop_manager.update(close)
-
-            # Check stop loss
-            is_stopped, stop_reason = stop_manager.is_stopped_out(close)
-
-            # Check death cross
-            death_cross = prev_sma_short >= prev_sma_long and sma_short < sma_long
-
-            if is_stopped or death_cross:
-                # Sell
-                exit_reason = stop_reason if is_stopped else "signal"
-                exit_price = close
-
-                pnl = (exit_price - position["entry_price"]) * position["shares"]
-                pnl_pct = (exit_price / position["entry_price"] - 1) * 100
-
-                trade = BacktestTrade(
-                    entry_date=position["entry_date"],
-                    entry_price=position["entry_price"],
-                    exit_date=date,
-                    exit_price=exit_price,
-                    shares=position["shares"],
-                    pnl=round(pnl, 2),
-                    pnl_percent=round(pnl_pct, 2),
-                    exit_reason=exit_reason,
-                )
-                trades.append(trade)
-
-                cash += position["shares"] * exit_price
-                position = None
-
+    equity = np.empty(n)
+    in_market = np.zeros(n, dtype=bool)
+    traded_value = 0.0
+
+    next_bar = 1      # First bar not yet simulated
+    reported_bar = 1  # First bar not yet sent to progress_callback
+
+    while next_bar < n:
+        # Find the next affordable entry signal
+        entry = None
+        for candidate in entry_bars[np.searchsorted(entry_bars, next_bar):]:
+            price = close[candidate]
+            sizing = calculate_position_size(
+                account_value=cash,
+                entry_price=price,
+                stop_loss_price=calculate_stop_loss_price(price),
+            )
+            shares = sizing["shares"]
+            if shares > 0 and shares * price <= cash:
+                entry = candidate
+                break
+
+        if entry is None:
+            equity[next_bar:] = cash
+            next_bar = n
+            break
+
+        # Flat until the entry bar, then buy on its close
+        equity[next_bar:entry] = cash
+        entry_price = close[entry]
+        cash -= shares * entry_price
+        traded_value += shares * entry_price
+
+        # Exit on the first later bar that hits a stop or an exit signal
+        after = slice(entry + 1, n)
+        active_stop, trailing_stop, initial_stop = _stop_levels(
+            close[after],
+            arrays.ready[after],
+            entry_price,
+            strategy.initial_stop_pct,
+            strategy.trailing_stop_pct,
+        )
+        stopped = arrays.ready[after] & (close[after] < active_stop)
+        exit_hits = np.flatnonzero(stopped | arrays.exits[after])
+
+        if len(exit_hits):
+            offset = exit_hits[0]
+            exit_bar = entry + 1 + offset
+            if stopped[offset]:
+                exit_reason = "trailing_stop" if trailing_stop[offset] >= initial_stop else "initial_stop"
+            else:
+                exit_reason = "signal"
         else:
-            # Check for golden cross
-            golden_cross = prev_sma_short <= prev_sma_long and sma_short > sma_long
-            price_above_ma = close > sma_long
-
-            if golden_cross and price_above_ma:
-                # Calculate position size
-                portfolio_value = cash
-                stop_price = calculate_stop_loss_price(close)
-
-                sizing = calculate_position_size(
-                    account_value=portfolio_value,
-                    entry_price=close,
-                    stop_loss_price=stop_price,
-                )
-
-                shares = sizing["shares"]
-
-                if shares > 0 and shares * close <= cash:
-                    # Buy
-                    cost = shares * close
-                    cash -= cost
-
-                    position = {
-                        "shares": shares,
-                        "entry_price": close,
-                        "entry_date": date,
-                        "stop_manager": StopLossManager(entry_price=close),
-                    }
-
-        # Record equity
-        portfolio_value = cash + (position["shares"] * close if position else 0)
-        equity_curve.append((date, portfolio_value))
-
-    # Close any open position at end
-    if position:
-        final_price = df["Close"].iloc[-1]
-        pnl = (final_price - position["entry_price"]) * position["shares"]
-        pnl_pct = (final_price / position["entry_price"] - 1) * 100
-
-        trade = BacktestTrade(
-            entry_date=position["entry_date"],
-            entry_price=position["entry_price"],
-            exit_date=df.index[-1].to_pydatetime(),
-            exit_price=final_price,
-            shares=position["shares"],
+            exit_bar = n - 1
+            exit_reason = "end_of_period"
+
+        held = slice(entry, exit_bar if exit_reason != "end_of_period" else n)
+        equity[held] = cash + shares * close[held]
+        in_market[held] = True
+
+        exit_price = close[exit_bar]
+        cash += shares * exit_price
+        traded_value += shares * exit_price
+        if exit_reason != "end_of_period":
+            equity[exit_bar] = cash
+
+        pnl = (exit_price - entry_price) * shares
+        pnl_pct = (exit_price / entry_price - 1) * 100
+        trades.append(BacktestTrade(
+            entry_date=dates[entry],
+            entry_price=float(entry_price),
+            exit_date=dates[exit_bar],
+            exit_price=float(exit_price),
+            shares=shares,
             pnl=round(pnl, 2),
             pnl_percent=round(pnl_pct, 2),
-            exit_reason="end_of_period",
+            exit_reason=exit_reason,
+        ))
+
+        next_bar = exit_bar + 1
+        if progress_callback:
+            done = min(next_bar, n)
+            progress_callback(
+                done - 1, n - 1,
+                list(zip(dates[reported_bar:done], equity[reported_bar:done].tolist())),
+            )
+            reported_bar = done
+
+    if progress_callback and reported_bar < n:
+        progress_callback(
+            n - 1, n - 1,
+            list(zip(dates[reported_bar:], equity[reported_bar:].tolist())),
+        )
+
+    equity_curve = list(zip(dates[1:], equity[1:].tolist()))
+
+    comparison = None
+    if benchmark:
+        # The strategy holds initial_capital as cash on the first bar
+        equity[0] = initial_capital
+        comparison = _compare_to_benchmark(
+            benchmark.upper(),
+            df.index,
+            equity,
+            initial_capital,
+            history_days_needed(start_date),
         )
-        trades.append(trade)
-        cash += position["shares"] * final_price
 
     # Calculate stats
     final_value = cash
@@ -223,24 +350,20 @@ def run_backtest(
     losers = [t for t in trades if t.pnl < 0]
     win_rate = len(winners) / len(trades) * 100 if trades else 0
 
-    # Max drawdown
-    max_dd = 0.0
-    max_dd_pct = 0.0
-    peak = initial_capital
-
-    for _, value in equity_curve:
-        if value > peak:
-            peak = value
-        dd = peak - value
-        dd_pct = (dd / peak) * 100 if peak > 0 else 0
-        if dd > max_dd:
-            max_dd = dd
-            max_dd_pct = dd_pct
+    # Drawdown, risk and activity metrics in one vectorized pass
+    metrics = compute_metrics(
+        equity[1:],
+        timestamps=df.index[1:],
+        initial_capital=initial_capital,
+        in_market=in_market[1:],
+        traded_value=traded_value,
+        periods_per_year=TRADING_DAYS_PER_YEAR,
+    )
 
     return BacktestResult(
         symbol=symbol,
-        start_date=df.index[0].to_pydatetime(),
-        end_date=df.index[-1].to_pydatetime(),
+        start_date=dates[0],
+        end_date=dates[-1],
         initial_capital=initial_capital,
         final_value=round(final_value, 2),
         total_return=round(total_return, 2),
@@ -249,8 +372,133 @@ def run_backtest(
         winning_trades=len(winners),
         losing_trades=len(losers),
         win_rate=round(win_rate, 1),
-        max_drawdown=round(max_dd, 2),
-        max_drawdown_percent=round(max_dd_pct, 2),
         equity_curve=equity_curve,
         trades=trades,
+        benchmark=comparison,
+        **metrics,
     )
+
+
+def run_backtest_summary(
+    symbol: str,
+    data: pd.DataFrame,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    initial_capital: Optional[float] = None,
+    strategy_name: Optional[str] = None,
+) -> dict:
+    """
+    Backtest pre-loaded data and return only the headline numbers.
+
+    Used to fan batch backtests out to worker processes: it takes and
+    returns plain picklable values and leaves out the equity curve and
+    trade list, so little data crosses the process boundary.
+
+    Returns:
+        Summary dict, or {"symbol", "error"} if the backtest failed
+    """
+    try:
+        result = run_backtest(
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            initial_capital=initial_capital,
+            strategy=get_strategy(strategy_name),
+            data=data,
+        )
+    except Exception as e:
+        return {"symbol": symbol, "error": str(e)}
+
+    return {
+        "symbol": symbol,
+        "final_value": result.final_value,
+        "total_return_percent": result.total_return_percent,
+        "total_trades": result.total_trades,
+        "win_rate": result.win_rate,
+        "max_drawdown_percent": result.max_drawdown_percent,
+        "cagr_percent": result.cagr_percent,
+        "sharpe_ratio": result.sharpe_ratio,
+        "exposure_percent": result.exposure_percent,
+    }
+
+
+def result_to_dict(
+    result: BacktestResult,
+    max_points: Optional[int] = None,
+    series_format: str = "records",
+) -> dict:
+    """
+    Convert a BacktestResult into a JSON-friendly dict.
+
+    Dates become ISO strings and the equity curve is encoded with
+    timeseries_service.encode_series, matching the /api/backtest response.
+    A benchmark curve is downsampled to the same dates as the strategy.
+
+    Args:
+        result: Backtest result to convert
+        max_points: Optional cap on equity curve points (LTTB downsampling)
+        series_format: "records" or "columnar" equity curve encoding
+    """
+    dates = [dt for dt, _ in result.equity_curve]
+    values = [val for _, val in result.equity_curve]
+    keep = downsample_indices(dates, values, max_points)
+
+    benchmark = None
+    if result.benchmark is not None:
+        comparison = result.benchmark
+        benchmark = {
+            "symbol": comparison.symbol,
+            "final_value": comparison.final_value,
+            "total_return_percent": comparison.total_return_percent,
+            "alpha_percent": comparison.alpha_percent,
+            "beta": comparison.beta,
+            "tracking_error_percent": comparison.tracking_error_percent,
+            "correlation": comparison.correlation,
+            "information_ratio": comparison.information_ratio,
+            "equity_curve": encode_series(
+                [dt for dt, _ in comparison.equity_curve],
+                [val for _, val in comparison.equity_curve],
+                series_format=series_format,
+                indices=keep,
+            ),
+        }
+
+    return {
+        "symbol": result.symbol,
+        "start_date": result.start_date.isoformat(),
+        "end_date": result.end_date.isoformat(),
+        "initial_capital": result.initial_capital,
+        "final_value": result.final_value,
+        "total_return": result.total_return,
+        "total_return_percent": result.total_return_percent,
+        "total_trades": result.total_trades,
+        "winning_trades": result.winning_trades,
+        "losing_trades": result.losing_trades,
+        "win_rate": result.win_rate,
+        "max_drawdown": result.max_drawdown,
+        "max_drawdown_percent": result.max_drawdown_percent,
+        "max_drawdown_duration": result.max_drawdown_duration,
+        "max_drawdown_duration_days": result.max_drawdown_duration_days,
+        "cagr_percent": result.cagr_percent,
+        "annual_volatility_percent": result.annual_volatility_percent,
+        "sharpe_ratio": result.sharpe_ratio,
+        "sortino_ratio": result.sortino_ratio,
+        "calmar_ratio": result.calmar_ratio,
+        "exposure_percent": result.exposure_percent,
+        "turnover": result.turnover,
+        "equity_curve": encode_series(dates, values, series_format=series_format, indices=keep),
+        "benchmark": benchmark,
+        "trades": [
+            {
+                "entry_date": t.entry_date.isoformat(),
+                "entry_price": t.entry_price,
+                "exit_date": t.exit_date.isoformat() if t.exit_date else None,
+                "exit_price": t.exit_price,
+                "shares": t.shares,
+                "pnl": t.pnl,
+                "pnl_percent": t.pnl_percent,
+                "exit_reason": t.exit_reason,
+            }
+            for t in result.trades
+        ],
+    }
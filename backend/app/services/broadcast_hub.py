@@ -0,0 +1,213 @@
+"""
+WebSocket fan-out with coalescing and backpressure.
+
+Educational Note:
+Sending every tick to every client, one client after another, lets one
+slow connection hold up everyone else. Instead, publishing a message only
+appends it to the hub's shared state and wakes the senders; each client
+has its own sender task that catches up at its own pace:
+
+    publish("AAPL" tick)  ->  latest["AAPL"] = tick (seq 41)   O(1), any number of clients
+                              log: [.. seq 39 portfolio diff ..]
+
+    client A (cursor 40)  ->  sends AAPL seq 41
+    client B (cursor 12)  ->  sends only the LATEST tick of each symbol
+                              that changed since seq 12, plus the log
+
+Price ticks are keyed by symbol, so a client that falls behind skips
+straight to the newest price (latest value wins) - its backlog can never
+grow beyond one message per symbol. Unkeyed messages (portfolio diffs,
+which can't be skipped) go through a bounded log; a client that falls out
+of the end of the log, stalls on a send, or lags too far behind is
+disconnected, and gets a fresh snapshot when it reconnects.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+from fastapi import WebSocket
+
+from ..config import BROADCAST_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Close code for clients dropped for being too slow ("try again later")
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+
+class SlowClient(Exception):
+    """A client fell too far behind to be caught up."""
+
+
+class HubClient:
+    """One connection's position in the hub, and its lag statistics."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, websocket: WebSocket, cursor: int):
+        self.id = next(self._ids)
+        self.websocket = websocket
+        self.cursor = cursor              # Seq of the last message handled
+        self.task: Optional[asyncio.Task] = None
+        self.connected_at = time.monotonic()
+
+        self.sent = 0
+        self.skipped = 0                  # Superseded ticks never sent (coalesced)
+        self.lag_ms = 0.0                 # Age of the oldest unsent message when the last batch started
+        self.max_lag_ms = 0.0
+
+    def get_status(self, head: int) -> dict:
+        return {
+            "id": self.id,
+            "connected_seconds": round(time.monotonic() - self.connected_at, 1),
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "behind": head - self.cursor,
+            "lag_ms": round(self.lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+        }
+
+
+class BroadcastHub:
+    """
+    Fan-out of JSON messages to many WebSocket clients.
+
+    publish() must be called on the event loop (use
+    loop.call_soon_threadsafe from other threads). It never awaits and
+    never creates tasks; each client has one long-lived sender task.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._seq = 0
+        self._latest: OrderedDict[str, tuple[int, float, dict]] = OrderedDict()  # key -> (seq, time, message), by seq
+        self._log: deque[tuple[int, float, dict]] = deque()                      # Unkeyed messages, by seq
+        self._log_evicted = 0                  # Seq of the newest message dropped from the log
+        self._changed = asyncio.Event()
+        self.clients: dict[int, HubClient] = {}
+
+        self._max_backlog = BROADCAST_CONFIG["max_backlog"]
+        self._send_timeout = BROADCAST_CONFIG["send_timeout_seconds"]
+        self._max_lag = BROADCAST_CONFIG["max_lag_seconds"]
+
+        self.published = 0
+        self.slow_disconnects = 0
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    # --- Publishing ----------------------------------------------------
+
+    def publish(self, message: dict, key: Optional[str] = None) -> None:
+        """
+        Queue a message for every client.
+
+        Args:
+            message: JSON-serializable message
+            key: Coalescing key (e.g. the symbol of a price tick); a newer
+                message with the same key replaces one not yet sent
+        """
+        self._seq += 1
+        self.published += 1
+        entry = (self._seq, time.monotonic(), message)
+        if key is not None:
+            self._latest[key] = entry
+            self._latest.move_to_end(key)
+        else:
+            self._log.append(entry)
+            if len(self._log) > self._max_backlog:
+                self._log_evicted = self._log.popleft()[0]
+
+        # Wake every sender waiting on the current event; later waits use a new one
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _pending(self, client: HubClient) -> list[tuple[int, float, dict]]:
+        """Messages a client hasn't handled yet, oldest first."""
+        if self._log_evicted > client.cursor:
+            raise SlowClient(f"missed {self._log_evicted - client.cursor} message(s)")
+
+        pending = []
+        for entry in reversed(self._latest.values()):
+            if entry[0] <= client.cursor:
+                break
+            pending.append(entry)
+        for entry in reversed(self._log):
+            if entry[0] <= client.cursor:
+                break
+            pending.append(entry)
+        pending.sort(key=lambda entry: entry[0])
+        return pending
+
+    # --- Clients -------------------------------------------------------
+
+    def register(self, websocket: WebSocket) -> HubClient:
+        """
+        Add a client; it receives messages published from now on.
+
+        Send any initial snapshot yourself, then call start() - so the
+        snapshot always arrives before the updates that follow it.
+        """
+        client = HubClient(websocket, cursor=self._seq)
+        self.clients[client.id] = client
+        return client
+
+    def start(self, client: HubClient) -> None:
+        """Start the client's sender task."""
+        client.task = asyncio.create_task(self._pump(client))
+
+    def unregister(self, client: HubClient) -> None:
+        """Remove a client and stop its sender."""
+        self.clients.pop(client.id, None)
+        if client.task is not None and client.task is not asyncio.current_task():
+            client.task.cancel()
+
+    async def _pump(self, client: HubClient) -> None:
+        """Send a client everything it hasn't seen, as fast as it accepts it."""
+        try:
+            while True:
+                pending = self._pending(client)
+                if not pending:
+                    await self._changed.wait()
+                    continue
+
+                client.lag_ms = (time.monotonic() - pending[0][1]) * 1000
+                client.max_lag_ms = max(client.max_lag_ms, client.lag_ms)
+                if client.lag_ms > self._max_lag * 1000:
+                    raise SlowClient(f"{client.lag_ms:.0f} ms behind")
+
+                first = client.cursor
+                for seq, _, message in pending:
+                    await asyncio.wait_for(client.websocket.send_json(message), self._send_timeout)
+                    client.cursor = seq
+                    client.sent += 1
+                client.skipped += (client.cursor - first) - len(pending)
+        except asyncio.CancelledError:
+            raise
+        except (SlowClient, asyncio.TimeoutError) as e:
+            self.slow_disconnects += 1
+            logger.warning(f"Disconnecting slow {self.name} client {client.id}: {str(e) or 'send timed out'}")
+            await self._close(client, SLOW_CLIENT_CLOSE_CODE)
+        except Exception as e:
+            logger.debug(f"{self.name} client {client.id} send failed: {e}")
+            await self._close(client)
+
+    async def _close(self, client: HubClient, code: int = 1000) -> None:
+        self.unregister(client)
+        try:
+            await client.websocket.close(code=code)
+        except Exception:
+            pass  # Already closed
+
+    def get_status(self) -> dict:
+        """Clients and their lag, for monitoring."""
+        return {
+            "clients": len(self.clients),
+            "published": self.published,
+            "slow_disconnects": self.slow_disconnects,
+            "keys": len(self._latest),
+            "per_client": [client.get_status(self._seq) for client in self.clients.values()],
+        }
@@ -16,9 +16,29 @@ class DataService:
     """Service for fetching and caching stock data."""
 
     def __init__(self):
-        self._cache: dict[str, tuple[pd.DataFrame, datetime]] = {}
+        # symbol -> (data, cached_at, days of history covered)
+        self._cache: dict[str, tuple[pd.DataFrame, datetime, int]] = {}
         self._cache_duration = timedelta(minutes=5)  # Cache for 5 minutes
 
+    def _get_cached(self, symbol: str, days: int) -> Optional[pd.DataFrame]:
+        """
+        Get cached data if it is fresh and covers the requested history.
+
+        A cached longer history is trimmed to the requested window, so a
+        short request never poisons the cache for a longer one.
+        """
+        if symbol not in self._cache:
+            return None
+
+        df, cached_at, cached_days = self._cache[symbol]
+        if datetime.now() - cached_at >= self._cache_duration or cached_days < days:
+            return None
+
+        if cached_days == days:
+            return df
+        start = pd.Timestamp.now(tz=df.index.tz) - pd.Timedelta(days=days)
+        return df[df.index >= start]
+
     def get_stock_data(
         self,
         symbol: str,
@@ -31,10 +51,9 @@ class DataService:
         Index is datetime.
         """
         # Check cache
-        if symbol in self._cache:
-            df, cached_at = self._cache[symbol]
-            if datetime.now() - cached_at < self._cache_duration:
-                return df
+        cached = self._get_cached(symbol, days)
+        if cached is not None:
+            return cached
 
         # Fetch fresh data
         end_date = datetime.now()
@@ -50,14 +69,104 @@ class DataService:
         df = df[["Open", "High", "Low", "Close", "Volume"]]
 
         # Cache the data
-        self._cache[symbol] = (df, datetime.now())
+        self._cache[symbol] = (df, datetime.now(), days)
 
         return df
 
+    def get_bulk_stock_data(
+        self,
+        symbols: list[str],
+        days: int = DATA_CONFIG["lookback_days"],
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Fetch historical daily data for many stocks in one download.
+
+        Symbols already in the cache are served from it; the rest are
+        fetched together with a single yfinance request and cached.
+        Symbols with no data are left out of the result.
+
+        Returns:
+            Dict of symbol -> DataFrame (same format as get_stock_data)
+        """
+        data = {}
+        missing = []
+        for symbol in symbols:
+            cached = self._get_cached(symbol, days)
+            if cached is not None:
+                data[symbol] = cached
+            else:
+                missing.append(symbol)
+
+        if not missing:
+            return data
+
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+
+        raw = yf.download(
+            missing,
+            start=start_date,
+            end=end_date,
+            interval="1d",
+            group_by="ticker",
+            auto_adjust=True,
+            ignore_tz=False,
+            progress=False,
+            threads=True,
+        )
+
+        cached_at = datetime.now()
+        for symbol in missing:
+            try:
+                if isinstance(raw.columns, pd.MultiIndex):
+                    if symbol not in raw.columns.get_level_values(0):
+                        continue
+                    df = raw[symbol]
+                else:
+                    df = raw
+
+                # Symbols trade on different calendars; drop padded rows
+                df = df[["Open", "High", "Low", "Close", "Volume"]].dropna(subset=["Close"])
+                if df.empty:
+                    continue
+
+                self._cache[symbol] = (df, cached_at, days)
+                data[symbol] = df
+            except Exception as e:
+                logger.error(f"Error reading bulk data for {symbol}: {e}")
+
+        return data
+
     def get_latest_price(self, symbol: str) -> dict:
         """Get the latest price info for a stock."""
         df = self.get_stock_data(symbol, days=5)
+        return self._latest_from_data(symbol, df)
+
+    def get_latest_prices(self, symbols: list[str]) -> dict[str, dict]:
+        """
+        Get the latest price info for many stocks at once.
+
+        Cached symbols are served from the cache and the rest are fetched
+        together in one bulk download (see get_bulk_stock_data).
 
+        Returns:
+            Dict of symbol -> price info (same format as get_latest_price).
+            Symbols with no usable data are left out.
+        """
+        if not symbols:
+            return {}
+
+        prices = {}
+        for symbol, df in self.get_bulk_stock_data(list(symbols), days=5).items():
+            try:
+                prices[symbol] = self._latest_from_data(symbol, df)
+            except ValueError as e:
+                logger.warning(f"No latest price for {symbol}: {e}")
+        return prices
+
+    @staticmethod
+    def _latest_from_data(symbol: str, df: pd.DataFrame) -> dict:
+        """Build price info from the last two daily bars."""
         if len(df) < 2:
             raise ValueError(f"Insufficient data for symbol: {symbol}")
 
@@ -118,15 +118,22 @@ class FinnhubService:
 
         return True
 
-    async def unsubscribe(self, symbol: str):
-        """Unsubscribe from a symbol."""
+    async def unsubscribe(self, symbol: str, keep_price: bool = False):
+        """
+        Unsubscribe from a symbol.
+
+        Args:
+            keep_price: Keep serving the last price (e.g. a symbol rotated
+                out for now); its timestamp shows its age
+        """
         symbol = symbol.upper()
 
         if symbol not in self._subscribed_symbols:
             return
 
         self._subscribed_symbols.discard(symbol)
-        self._latest_prices.pop(symbol, None)
+        if not keep_price:
+            self._latest_prices.pop(symbol, None)
 
         if self._websocket:
             await self._send_unsubscribe(symbol)
@@ -0,0 +1,403 @@
+"""
+Background job service for long-running backtests.
+
+Multi-symbol runs and research sweeps can take many seconds. Running them
+inside a request handler would block the event loop and stall every other
+request, so jobs are executed in a bounded pool of worker processes instead.
+
+Each job:
+- Gets an id immediately when submitted
+- Waits in a bounded queue (submissions beyond it are rejected)
+- Reports progress and partial equity curves while it runs
+- Can be cancelled while queued or running
+- Keeps its result in memory so it can be fetched by id
+
+Batch backtests (one summary per symbol, returned in the response) share
+the same pool and the same admission limit: a batch takes one job slot and
+keeps at most max_workers of its symbols in the pool at a time, so jobs
+submitted meanwhile are not stuck behind the whole batch.
+"""
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Optional
+
+from ..config import JOB_CONFIG
+from ..core.strategy import get_strategy
+from .backtest_service import run_backtest, result_to_dict
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    """Lifecycle state of a background job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobCancelledError(Exception):
+    """Raised inside a worker to abort a job that was cancelled."""
+
+
+@dataclass
+class BacktestJob:
+    """A submitted backtest job and everything reported about it so far."""
+    id: str
+    params: dict
+    status: JobStatus = JobStatus.QUEUED
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: float = 0.0
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    events: list[dict] = field(default_factory=list)
+    future: Optional[Future] = None
+
+
+def _run_job(job_id: str, params: dict, events, cancel_flags) -> dict:
+    """
+    Execute a backtest job inside a worker process.
+
+    Progress events are pushed onto the shared `events` queue and the shared
+    `cancel_flags` dict is checked at every progress tick.
+
+    Returns:
+        Dict mapping each symbol to its serialized result (or an error)
+    """
+    symbols = params["symbols"]
+    strategy = get_strategy(params.get("strategy"))
+    results = {}
+    events.put((job_id, {"type": "started", "symbols": symbols}))
+
+    for index, symbol in enumerate(symbols):
+        def on_progress(done: int, total: int, points: list, index=index, symbol=symbol):
+            if cancel_flags.get(job_id):
+                raise JobCancelledError(job_id)
+            fraction = (index + (done / total if total else 1.0)) / len(symbols)
+            events.put((job_id, {
+                "type": "progress",
+                "symbol": symbol,
+                "progress": round(fraction, 4),
+                "equity": [
+                    {"date": dt.isoformat(), "value": value}
+                    for dt, value in points
+                ],
+            }))
+
+        try:
+            result = run_backtest(
+                symbol=symbol,
+                start_date=params.get("start_date"),
+                end_date=params.get("end_date"),
+                initial_capital=params.get("initial_capital"),
+                progress_callback=on_progress,
+                strategy=strategy,
+                benchmark=params.get("benchmark"),
+            )
+            results[symbol] = result_to_dict(result)
+            events.put((job_id, {
+                "type": "symbol_completed",
+                "symbol": symbol,
+                "final_value": result.final_value,
+                "total_return_percent": result.total_return_percent,
+            }))
+        except JobCancelledError:
+            raise
+        except Exception as e:
+            results[symbol] = {"symbol": symbol, "error": str(e)}
+            events.put((job_id, {"type": "symbol_failed", "symbol": symbol, "error": str(e)}))
+
+    return results
+
+
+class BacktestJobService:
+    """
+    Service for submitting, tracking and cancelling backtest jobs.
+
+    Worker processes and the inter-process queue are created by start()
+    (called off the event loop at app startup) or on first use, so
+    importing the service costs nothing.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._jobs: OrderedDict[str, BacktestJob] = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._events = None
+        self._cancel_flags = None
+        self._pump_thread: Optional[threading.Thread] = None
+        self._running = False
+        self._active_batches = 0
+
+    def start(self) -> None:
+        """
+        Start the worker pool, shared queue and event pump if needed.
+
+        Starting the manager process takes seconds, so call this from a
+        thread (e.g. asyncio.to_thread), never on the event loop.
+        """
+        with self._lock:
+            if self._executor is not None:
+                return
+
+            # Spawn (rather than fork) so workers never inherit the
+            # server's threads or open sockets
+            context = multiprocessing.get_context("spawn")
+            self._manager = context.Manager()
+            self._events = self._manager.Queue()
+            self._cancel_flags = self._manager.dict()
+            self._executor = ProcessPoolExecutor(
+                max_workers=JOB_CONFIG["max_workers"],
+                mp_context=context,
+            )
+
+            self._running = True
+            self._pump_thread = threading.Thread(
+                target=self._pump_events, name="backtest-job-events", daemon=True
+            )
+            self._pump_thread.start()
+
+    def _active_count(self) -> int:
+        """Number of jobs (and batches) that are queued or running."""
+        jobs = sum(1 for job in self._jobs.values() if job.status not in FINISHED_STATUSES)
+        return jobs + self._active_batches
+
+    def _check_capacity(self) -> None:
+        """Raise JobQueueFullError if no job slot is free (caller holds the lock)."""
+        capacity = JOB_CONFIG["max_workers"] + JOB_CONFIG["max_queued_jobs"]
+        if self._active_count() >= capacity:
+            raise JobQueueFullError(
+                f"Job queue is full ({capacity} active jobs). Try again later."
+            )
+
+    def submit(self, params: dict) -> BacktestJob:
+        """
+        Submit a backtest job.
+
+        Args:
+            params: Dict with "symbols" and optional "start_date",
+                "end_date", "initial_capital", "strategy" and "benchmark"
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobQueueFullError: If too many jobs are already queued or running
+        """
+        self.start()
+
+        with self._lock:
+            self._check_capacity()
+
+            job = BacktestJob(id=str(uuid.uuid4()), params=params)
+            self._jobs[job.id] = job
+            self._evict_finished()
+
+            job.future = self._executor.submit(
+                _run_job, job.id, params, self._events, self._cancel_flags
+            )
+            job.future.add_done_callback(lambda future, job_id=job.id: self._on_done(job_id, future))
+
+            logger.info(f"Queued backtest job {job.id} for {len(params['symbols'])} symbol(s)")
+            return job
+
+    async def run_batch(self, fn: Callable, calls: list[tuple]) -> list:
+        """
+        Run fn(*args) in the worker pool for every args tuple in calls.
+
+        The batch is admitted like a submitted job, and at most max_workers
+        of its calls are in the pool at once.
+
+        Returns:
+            The results, in the order of calls
+
+        Raises:
+            JobQueueFullError: If too many jobs are already queued or running
+        """
+        await asyncio.to_thread(self.start)
+
+        with self._lock:
+            self._check_capacity()
+            self._active_batches += 1
+            executor = self._executor
+
+        try:
+            loop = asyncio.get_running_loop()
+            slots = asyncio.Semaphore(JOB_CONFIG["max_workers"])
+
+            async def run(args: tuple):
+                async with slots:
+                    return await loop.run_in_executor(executor, fn, *args)
+
+            return await asyncio.gather(*(run(args) for args in calls))
+        finally:
+            with self._lock:
+                self._active_batches -= 1
+
+    def get_job(self, job_id: str) -> Optional[BacktestJob]:
+        """Get a job by id (None if unknown or evicted)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list[BacktestJob]:
+        """Get all retained jobs, oldest first."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def get_events(self, job_id: str, since: int = 0) -> tuple[list[dict], Optional[JobStatus]]:
+        """
+        Get events reported by a job after the first `since` events.
+
+        Returns:
+            (events, status) - status is None if the job is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return [], None
+            return job.events[since:], job.status
+
+    def cancel(self, job_id: str) -> Optional[BacktestJob]:
+        """
+        Cancel a job.
+
+        Queued jobs are dropped immediately. Running jobs are flagged and
+        stop at their next progress report.
+
+        Returns:
+            The job, or None if it is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATUSES:
+                return job
+
+            if job.future is not None and job.future.cancel():
+                # The done callback normally finishes the job synchronously
+                if job.status not in FINISHED_STATUSES:
+                    self._finish(job, JobStatus.CANCELLED)
+            else:
+                self._cancel_flags[job_id] = True
+            return job
+
+    def _pump_events(self) -> None:
+        """Move progress events from worker processes onto their jobs."""
+        while self._running:
+            try:
+                job_id, event = self._events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break  # Manager shut down
+
+            with self._lock:
+                self._dispatch(job_id, event)
+
+    def _drain_events(self) -> None:
+        """Dispatch every event already waiting in the shared queue."""
+        while True:
+            try:
+                job_id, event = self._events.get_nowait()
+            except queue.Empty:
+                return
+            except (EOFError, OSError):
+                return
+            self._dispatch(job_id, event)
+
+    def _dispatch(self, job_id: str, event: dict) -> None:
+        """Apply one worker event to its job (caller holds the lock)."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+
+        if job.status in FINISHED_STATUSES:
+            # Raced with completion: keep the terminal event last
+            job.events.insert(len(job.events) - 1, event)
+            return
+
+        if event["type"] == "started":
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.now()
+        elif event["type"] == "progress":
+            job.progress = event["progress"]
+
+        job.events.append(event)
+
+    def _on_done(self, job_id: str, future: Future) -> None:
+        """Record the outcome of a job when its worker finishes."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATUSES:
+                return
+
+            # Workers report events before returning, so pick up any the
+            # pump thread has not delivered yet
+            self._drain_events()
+
+            try:
+                job.result = future.result()
+                job.progress = 1.0
+                self._finish(job, JobStatus.COMPLETED)
+            except (CancelledError, JobCancelledError):
+                self._finish(job, JobStatus.CANCELLED)
+            except Exception as e:
+                logger.error(f"Backtest job {job_id} failed: {e}")
+                job.error = str(e)
+                self._finish(job, JobStatus.FAILED)
+
+            try:
+                self._cancel_flags.pop(job_id, None)
+            except Exception:
+                pass  # Manager already shut down
+
+    def _finish(self, job: BacktestJob, status: JobStatus) -> None:
+        """Mark a job finished and append its final event."""
+        job.status = status
+        job.finished_at = datetime.now()
+        job.future = None
+        event = {"type": status.value}
+        if job.error:
+            event["error"] = job.error
+        job.events.append(event)
+
+    def _evict_finished(self) -> None:
+        """Drop the oldest finished jobs beyond the retention limit."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATUSES]
+        excess = len(finished) - JOB_CONFIG["max_retained_jobs"]
+        for job_id in finished[:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, cancelling anything still queued."""
+        with self._lock:
+            self._running = False
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+
+
+# Singleton instance
+backtest_job_service = BacktestJobService()
@@ -0,0 +1,402 @@
+"""
+Performance metrics for equity curves.
+
+Shared by backtests and the paper trading portfolio so both report the
+same numbers the same way. Every metric is computed with NumPy array
+operations over the whole curve, so cost stays linear (and fast) even
+for tens of thousands of points.
+
+Educational Note:
+- Max drawdown: the largest drop from a peak - how much pain you sat through
+- Sharpe ratio: return per unit of volatility (higher is better, >1 is good)
+- Sortino ratio: like Sharpe, but only counts downside volatility
+- Calmar ratio: annual return divided by max drawdown
+- CAGR: the constant yearly growth rate that gives the same final result
+"""
+import numpy as np
+from datetime import datetime
+from typing import Optional, Sequence
+
+# Trading days per year, used when timestamps are not available
+TRADING_DAYS_PER_YEAR = 252
+
+# Shortest span CAGR (and Calmar) is reported for; annualizing a few
+# minutes or days of returns gives huge, meaningless rates
+MIN_CAGR_DAYS = 30
+
+_SECONDS_PER_YEAR = 365.25 * 24 * 3600
+
+
+def drawdown_series(
+    values: np.ndarray,
+    initial_capital: Optional[float] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate the running peak and drawdown at every point of a curve.
+
+    Args:
+        values: Equity values in time order
+        initial_capital: Optional starting value that counts as the first peak
+
+    Returns:
+        (peak, drawdown, drawdown_percent) arrays, same length as values
+    """
+    values = np.asarray(values, dtype=float)
+    peak = np.maximum.accumulate(values)
+    if initial_capital is not None:
+        peak = np.maximum(peak, initial_capital)
+
+    drawdown = peak - values
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown_pct = np.where(peak > 0, drawdown / peak * 100, 0.0)
+    return peak, drawdown, drawdown_pct
+
+
+def _ratio(numerator: float, denominator: float) -> Optional[float]:
+    """Divide, returning None when the result would be meaningless."""
+    if denominator == 0 or not np.isfinite(denominator) or not np.isfinite(numerator):
+        return None
+    return round(float(numerator / denominator), 3)
+
+
+def _cagr(start_value: float, end_value: float, years: Optional[float]) -> Optional[float]:
+    """Compound annual growth rate, or None for short spans or overflow."""
+    if not years or years * 365.25 < MIN_CAGR_DAYS or start_value <= 0 or end_value <= 0:
+        return None
+    # exp/log rather than ** so an extreme ratio gives inf instead of OverflowError
+    with np.errstate(over="ignore"):
+        growth = np.exp(np.log(end_value / start_value) / years)
+    return float(growth - 1) if np.isfinite(growth) else None
+
+
+def compute_metrics(
+    values: Sequence[float],
+    timestamps: Optional[Sequence] = None,
+    initial_capital: Optional[float] = None,
+    in_market: Optional[Sequence[bool]] = None,
+    traded_value: float = 0.0,
+    periods_per_year: Optional[float] = None,
+) -> dict:
+    """
+    Compute drawdown, return and risk metrics for an equity curve.
+
+    Args:
+        values: Equity values in time order
+        timestamps: Optional timestamps for each value. Used for CAGR, the
+            drawdown duration in days, and to infer periods_per_year for
+            irregularly sampled curves.
+        initial_capital: Starting capital (default: first value)
+        in_market: Optional flags marking points where a position was held
+        traded_value: Total dollar value bought and sold, for turnover
+        periods_per_year: Points per year (default: inferred, else 252)
+
+    Returns:
+        dict of metrics (ratios are None when they can't be computed; CAGR and
+        Calmar are None for spans shorter than MIN_CAGR_DAYS)
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+
+    metrics = {
+        "max_drawdown": 0.0,
+        "max_drawdown_percent": 0.0,
+        "max_drawdown_duration": 0,
+        "max_drawdown_duration_days": None,
+        "cagr_percent": None,
+        "annual_volatility_percent": None,
+        "sharpe_ratio": None,
+        "sortino_ratio": None,
+        "calmar_ratio": None,
+        "exposure_percent": None,
+        "turnover": None,
+    }
+    if n == 0:
+        return metrics
+
+    start_value = initial_capital if initial_capital is not None else values[0]
+    times = np.asarray(timestamps, dtype="datetime64[s]") if timestamps is not None else None
+
+    # Drawdown: depth (first occurrence of the largest dollar drop, as
+    # before) and duration (longest stretch spent below a prior peak)
+    peak, drawdown, drawdown_pct = drawdown_series(values, initial_capital)
+    worst = int(drawdown.argmax())
+    metrics["max_drawdown"] = round(float(drawdown[worst]), 2)
+    metrics["max_drawdown_percent"] = round(float(drawdown_pct[worst]), 2)
+
+    index = np.arange(n)
+    last_peak = np.maximum.accumulate(np.where(values >= peak, index, -1))
+    duration = np.where(values < peak, index - last_peak, 0)
+    longest = int(duration.argmax())
+    metrics["max_drawdown_duration"] = int(duration[longest])
+
+    years = None
+    if times is not None:
+        if duration[longest] > 0:
+            since = times[last_peak[longest]] if last_peak[longest] >= 0 else times[0]
+            metrics["max_drawdown_duration_days"] = int((times[longest] - since) // np.timedelta64(1, "D"))
+        else:
+            metrics["max_drawdown_duration_days"] = 0
+        elapsed_seconds = float((times[-1] - times[0]) / np.timedelta64(1, "s"))
+        if elapsed_seconds > 0:
+            years = elapsed_seconds / _SECONDS_PER_YEAR
+
+    if periods_per_year is None:
+        periods_per_year = (n - 1) / years if years else TRADING_DAYS_PER_YEAR
+    if years is None and n > 1:
+        years = (n - 1) / periods_per_year
+
+    # Growth
+    cagr = _cagr(start_value, values[-1], years)
+    if cagr is not None:
+        metrics["cagr_percent"] = round(cagr * 100, 2)
+        max_dd_fraction = drawdown_pct[worst] / 100
+        metrics["calmar_ratio"] = _ratio(cagr, max_dd_fraction)
+
+    # Risk-adjusted returns (risk-free rate assumed 0)
+    if n > 2:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = values[1:] / values[:-1] - 1
+        returns = returns[np.isfinite(returns)]
+        if len(returns) > 1:
+            mean = returns.mean()
+            std = returns.std(ddof=1)
+            downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+            annualize = np.sqrt(periods_per_year)
+            metrics["annual_volatility_percent"] = round(float(std * annualize * 100), 2)
+            sharpe = _ratio(mean, std)
+            sortino = _ratio(mean, downside)
+            metrics["sharpe_ratio"] = round(sharpe * annualize, 3) if sharpe is not None else None
+            metrics["sortino_ratio"] = round(sortino * annualize, 3) if sortino is not None else None
+
+    # Activity
+    if in_market is not None:
+        flags = np.asarray(in_market, dtype=bool)
+        if len(flags):
+            metrics["exposure_percent"] = round(float(flags.mean() * 100), 2)
+
+    average_equity = values.mean()
+    if average_equity > 0:
+        metrics["turnover"] = round(float(traded_value / average_equity), 3)
+
+    return metrics
+
+
+def relative_metrics(
+    values: Sequence[float],
+    benchmark_values: Sequence[float],
+    periods_per_year: float = TRADING_DAYS_PER_YEAR,
+) -> dict:
+    """
+    Compare an equity curve against a benchmark on the same dates.
+
+    Args:
+        values: Strategy equity values
+        benchmark_values: Benchmark values (e.g. buy-and-hold), same length
+        periods_per_year: Points per year for annualizing
+
+    Returns:
+        dict with alpha (annualized, %), beta, tracking error (annualized, %),
+        correlation and information ratio (None when not computable)
+    """
+    values = np.asarray(values, dtype=float)
+    benchmark_values = np.asarray(benchmark_values, dtype=float)
+
+    metrics = {
+        "alpha_percent": None,
+        "beta": None,
+        "tracking_error_percent": None,
+        "correlation": None,
+        "information_ratio": None,
+    }
+    if len(values) < 3 or len(values) != len(benchmark_values):
+        return metrics
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = values[1:] / values[:-1] - 1
+        benchmark_returns = benchmark_values[1:] / benchmark_values[:-1] - 1
+    valid = np.isfinite(returns) & np.isfinite(benchmark_returns)
+    returns, benchmark_returns = returns[valid], benchmark_returns[valid]
+    if len(returns) < 2:
+        return metrics
+
+    covariance = np.cov(returns, benchmark_returns)
+    benchmark_variance = covariance[1, 1]
+    active = returns - benchmark_returns
+    tracking = active.std(ddof=1)
+
+    if benchmark_variance > 0:
+        beta = covariance[0, 1] / benchmark_variance
+        alpha = (returns.mean() - beta * benchmark_returns.mean()) * periods_per_year
+        metrics["beta"] = round(float(beta), 3)
+        metrics["alpha_percent"] = round(float(alpha * 100), 2)
+        if covariance[0, 0] > 0:
+            correlation = covariance[0, 1] / np.sqrt(covariance[0, 0] * benchmark_variance)
+            metrics["correlation"] = round(float(correlation), 3)
+
+    metrics["tracking_error_percent"] = round(float(tracking * np.sqrt(periods_per_year) * 100), 2)
+    ratio = _ratio(active.mean(), tracking)
+    if ratio is not None:
+        metrics["information_ratio"] = round(ratio * np.sqrt(periods_per_year), 3)
+
+    return metrics
+
+
+class RunningMetrics:
+    """
+    The metrics of compute_metrics(), maintained point by point.
+
+    Each append() updates a handful of running aggregates - the peak, the
+    deepest drawdown, the current and longest time under water, and the
+    mean/variance of returns (Welford's method) - so reading the metrics
+    costs O(1) however long the curve gets. The results match
+    compute_metrics() on the same values (without in_market/exposure).
+    """
+
+    def __init__(self, initial_capital: Optional[float] = None):
+        self.initial_capital = initial_capital
+        self.traded_value = 0.0
+
+        self.count = 0
+        self._sum = 0.0
+        self._first_value = None
+        self._first_time = None
+        self._last_value = None
+        self._last_time = None
+
+        # Drawdown
+        self._peak = None
+        self._max_drawdown = 0.0
+        self._max_drawdown_pct = 0.0
+        self._last_peak_index = -1         # -1: still below initial_capital
+        self._last_peak_time = None
+        self._longest_duration = 0
+        self._longest_duration_days = 0
+
+        # Returns (Welford running mean / variance)
+        self._returns = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._downside_sq = 0.0
+
+    def append(self, timestamp: Optional[datetime], value: float) -> None:
+        """Add the next point of the curve."""
+        index = self.count
+        time = timestamp.replace(microsecond=0) if timestamp is not None else None
+
+        if index == 0:
+            self._first_value = value
+            self._first_time = time
+        elif self._last_value:
+            ret = value / self._last_value - 1
+            if np.isfinite(ret):
+                self._returns += 1
+                delta = ret - self._mean
+                self._mean += delta / self._returns
+                self._m2 += delta * (ret - self._mean)
+                self._downside_sq += min(ret, 0.0) ** 2
+
+        self.count += 1
+        self._sum += value
+        self._last_value = value
+        self._last_time = time
+
+        # Drawdown
+        peak = value if self._peak is None else max(self._peak, value)
+        if self.initial_capital is not None:
+            peak = max(peak, self.initial_capital)
+        self._peak = peak
+
+        drawdown = peak - value
+        if drawdown > self._max_drawdown:
+            self._max_drawdown = drawdown
+            self._max_drawdown_pct = drawdown / peak * 100 if peak > 0 else 0.0
+
+        if value >= peak:
+            self._last_peak_index = index
+            self._last_peak_time = time
+        else:
+            duration = index - self._last_peak_index
+            if duration > self._longest_duration:
+                self._longest_duration = duration
+                if time is not None:
+                    since = self._last_peak_time if self._last_peak_index >= 0 else self._first_time
+                    self._longest_duration_days = (time - since).days
+
+    _TIME_FIELDS = ("_first_time", "_last_time", "_last_peak_time")
+
+    def to_state(self) -> dict:
+        """The running aggregates as a JSON-serializable dict."""
+        state = dict(vars(self))
+        for field in self._TIME_FIELDS:
+            if state[field] is not None:
+                state[field] = state[field].isoformat()
+        return state
+
+    @classmethod
+    def from_state(cls, state: dict) -> "RunningMetrics":
+        """Rebuild from to_state(), without replaying the curve."""
+        running = cls()
+        vars(running).update(state)
+        for field in cls._TIME_FIELDS:
+            if state.get(field) is not None:
+                setattr(running, field, datetime.fromisoformat(state[field]))
+        return running
+
+    def metrics(self) -> dict:
+        """Current metrics, in the same format as compute_metrics()."""
+        metrics = {
+            "max_drawdown": 0.0,
+            "max_drawdown_percent": 0.0,
+            "max_drawdown_duration": 0,
+            "max_drawdown_duration_days": None,
+            "cagr_percent": None,
+            "annual_volatility_percent": None,
+            "sharpe_ratio": None,
+            "sortino_ratio": None,
+            "calmar_ratio": None,
+            "exposure_percent": None,
+            "turnover": None,
+        }
+        n = self.count
+        if n == 0:
+            return metrics
+
+        start_value = self.initial_capital if self.initial_capital is not None else self._first_value
+        metrics["max_drawdown"] = round(float(self._max_drawdown), 2)
+        metrics["max_drawdown_percent"] = round(float(self._max_drawdown_pct), 2)
+        metrics["max_drawdown_duration"] = self._longest_duration
+
+        years = None
+        if self._first_time is not None:
+            metrics["max_drawdown_duration_days"] = self._longest_duration_days
+            elapsed_seconds = (self._last_time - self._first_time).total_seconds()
+            if elapsed_seconds > 0:
+                years = elapsed_seconds / _SECONDS_PER_YEAR
+
+        periods_per_year = (n - 1) / years if years else TRADING_DAYS_PER_YEAR
+        if years is None and n > 1:
+            years = (n - 1) / periods_per_year
+
+        # Growth
+        cagr = _cagr(start_value, self._last_value, years)
+        if cagr is not None:
+            metrics["cagr_percent"] = round(cagr * 100, 2)
+            metrics["calmar_ratio"] = _ratio(cagr, self._max_drawdown_pct / 100)
+
+        # Risk-adjusted returns (risk-free rate assumed 0)
+        if n > 2 and self._returns > 1:
+            std = np.sqrt(self._m2 / (self._returns - 1))
+            downside = np.sqrt(self._downside_sq / self._returns)
+            annualize = np.sqrt(periods_per_year)
+            metrics["annual_volatility_percent"] = round(float(std * annualize * 100), 2)
+            sharpe = _ratio(self._mean, std)
+            sortino = _ratio(self._mean, downside)
+            metrics["sharpe_ratio"] = round(sharpe * annualize, 3) if sharpe is not None else None
+            metrics["sortino_ratio"] = round(sortino * annualize, 3) if sortino is not None else None
+
+        # Activity
+        average_equity = self._sum / n
+        if average_equity > 0:
+            metrics["turnover"] = round(float(self.traded_value / average_equity), 3)
+
+        return metrics
@@ -0,0 +1,168 @@
+"""
+Monte Carlo robustness analysis of backtest trades.
+
+Educational Note:
+A single backtest shows ONE ordering of trades. Luck in that ordering can
+hide how bad things could have been. By reshuffling (or resampling) the
+same trade returns thousands of times we see the range of outcomes the
+strategy could plausibly produce - especially how deep and how long its
+drawdowns might be.
+
+Paths are simulated in blocks, each one 2-D NumPy array (paths x
+trades), so even 100,000 paths take about a second while memory stays
+bounded by the block size rather than the number of paths.
+"""
+import numpy as np
+from typing import Optional
+
+from .backtest_service import BacktestResult
+
+# Percentiles reported for every distribution
+PERCENTILES = [5, 25, 50, 75, 95]
+
+MONTE_CARLO_METHODS = ("bootstrap", "permute")
+
+# Matrix cells (paths x steps) simulated per block; each float array of a
+# block takes 8 bytes per cell (4 MB)
+MAX_BLOCK_CELLS = 500_000
+
+
+def trade_returns(result: BacktestResult) -> np.ndarray:
+    """
+    Convert backtest trades into per-trade returns on account equity.
+
+    The backtest holds one position at a time, so the equity before each
+    trade is the initial capital plus all previously realized P&L.
+
+    Returns:
+        Array of fractional returns (0.05 = +5% of equity)
+    """
+    pnl = np.array([t.pnl for t in result.trades], dtype=float)
+    if len(pnl) == 0:
+        return pnl
+
+    equity_before = result.initial_capital + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    return pnl / equity_before
+
+
+def _distribution(values: np.ndarray) -> dict:
+    """Summarize a 1-D array as mean plus percentiles."""
+    if len(values) == 0:
+        return {"mean": None, **{f"p{p}": None for p in PERCENTILES}}
+
+    pct = np.percentile(values, PERCENTILES)
+    return {
+        "mean": round(float(values.mean()), 4),
+        **{f"p{p}": round(float(v), 4) for p, v in zip(PERCENTILES, pct)},
+    }
+
+
+def _simulate_block(
+    returns: np.ndarray,
+    initial_capital: float,
+    n_paths: int,
+    method: str,
+    rng: np.random.Generator,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Simulate one block of paths.
+
+    Returns:
+        (final value, max drawdown fraction, recovery time in trades,
+        recovered flag) arrays, one entry per path
+    """
+    n_trades = len(returns)
+
+    # Build the (paths x trades) return matrix in one shot
+    if method == "bootstrap":
+        sampled = returns[rng.integers(0, n_trades, size=(n_paths, n_trades))]
+    else:
+        sampled = rng.permuted(np.broadcast_to(returns, (n_paths, n_trades)), axis=1)
+
+    # Equity after each trade, with the starting point as column 0
+    equity = np.empty((n_paths, n_trades + 1))
+    equity[:, 0] = initial_capital
+    np.cumprod(1.0 + sampled, axis=1, out=equity[:, 1:])
+    equity[:, 1:] *= initial_capital
+
+    peak = np.maximum.accumulate(equity, axis=1)
+    drawdown = 1.0 - equity / peak
+    trough = drawdown.argmax(axis=1)
+    max_drawdown = drawdown[np.arange(n_paths), trough]
+
+    # Trades from the deepest trough until equity regains the prior peak
+    steps = np.arange(n_trades + 1)
+    peak_at_trough = peak[np.arange(n_paths), trough]
+    recovered_mask = (steps > trough[:, None]) & (equity >= peak_at_trough[:, None])
+    recovered = recovered_mask.any(axis=1) | (max_drawdown == 0)
+    recovery_time = recovered_mask.argmax(axis=1) - trough
+    recovery_time = np.where(max_drawdown == 0, 0, recovery_time)
+
+    # Copy the last column so the block's matrices can be freed
+    return equity[:, -1].copy(), max_drawdown, recovery_time, recovered
+
+
+def run_monte_carlo(
+    returns: np.ndarray,
+    initial_capital: float,
+    n_paths: int = 10000,
+    method: str = "bootstrap",
+    seed: Optional[int] = None,
+) -> dict:
+    """
+    Simulate many alternative orderings of a trade return sequence.
+
+    Args:
+        returns: Per-trade fractional returns (see trade_returns)
+        initial_capital: Starting equity for every path
+        n_paths: Number of simulated paths
+        method: "bootstrap" (sample trades with replacement) or
+            "permute" (shuffle the original trades)
+        seed: Optional random seed for reproducible results
+
+    Returns:
+        dict with distributions of final value, max drawdown percent and
+        time-to-recovery (in trades), plus probability of loss
+
+    Raises:
+        ValueError: If method is unknown
+    """
+    if method not in MONTE_CARLO_METHODS:
+        raise ValueError(f"method must be one of {', '.join(MONTE_CARLO_METHODS)}")
+
+    returns = np.asarray(returns, dtype=float)
+    n_trades = len(returns)
+    rng = np.random.default_rng(seed)
+
+    if n_trades == 0:
+        return {
+            "method": method,
+            "n_paths": n_paths,
+            "n_trades": 0,
+            "final_value": _distribution(np.full(n_paths, initial_capital)),
+            "max_drawdown_percent": _distribution(np.zeros(n_paths)),
+            "time_to_recovery_trades": _distribution(np.zeros(0)),
+            "recovered_fraction": 1.0,
+            "probability_of_loss": 0.0,
+        }
+
+    block = max(1, MAX_BLOCK_CELLS // (n_trades + 1))
+    blocks = [
+        _simulate_block(returns, initial_capital, min(block, n_paths - start), method, rng)
+        for start in range(0, n_paths, block)
+    ]
+    final_value, max_drawdown, recovery_time, recovered = (
+        np.concatenate(parts) for parts in zip(*blocks)
+    )
+
+    return {
+        "method": method,
+        "n_paths": n_paths,
+        "n_trades": n_trades,
+        "final_value": _distribution(final_value),
+        "max_drawdown_percent": _distribution(max_drawdown * 100),
+        # Only paths that actually recovered have a recovery time
+        "time_to_recovery_trades": _distribution(recovery_time[recovered]),
+        "recovered_fraction": round(float(recovered.mean()), 4),
+        "probability_of_loss": round(float((final_value < initial_capital).mean()), 4),
+    }
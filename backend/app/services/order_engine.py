@@ -0,0 +1,202 @@
+"""
+Tick-driven matching engine for resting orders.
+
+Educational Note:
+Every resting order waits for the price to cross one level, either from
+below or from above:
+
+    fills when the price RISES to its level    fills when the price FALLS to its level
+    - sell limit (take profit)                 - buy limit (buy the dip)
+    - buy stop (breakout entry)                - sell stop (stop loss)
+
+So each symbol's book is just two heaps: one ordered so the LOWEST
+"rising" level is on top, one so the HIGHEST "falling" level is on top.
+A tick only has to look at the two tops; every order it crosses is popped
+in O(log n), and thousands of orders that are not crossed cost nothing.
+Orders at the same level are filled first come, first served.
+
+A stop-limit order sits in one book until its stop is reached and is then
+re-queued as a limit order at its limit price.
+"""
+import heapq
+import itertools
+import logging
+import threading
+from typing import Protocol
+
+from ..models.order import Order, OrderType
+from ..models.trade import TradeAction
+
+logger = logging.getLogger(__name__)
+
+
+class OrderOwner(Protocol):
+    """Anything holding resting orders the engine can fill (a portfolio)."""
+
+    def fill_order(self, order_id: str, price: float): ...
+
+
+def trigger_level(order: Order) -> tuple[bool, float]:
+    """
+    The level an order is waiting for.
+
+    Returns:
+        (fills when the price rises to the level, level)
+    """
+    resting_as_limit = order.order_type == OrderType.LIMIT or (
+        order.order_type == OrderType.STOP_LIMIT and order.triggered_at is not None
+    )
+    if resting_as_limit:
+        # Sell limits wait for the price to rise, buy limits for it to fall
+        return order.action == TradeAction.SELL, order.limit_price
+    # Buy stops wait for the price to rise, sell stops for it to fall
+    return order.action == TradeAction.BUY, order.stop_price
+
+
+def is_triggered(order: Order, price: float) -> bool:
+    """True if `price` reaches the level the order is waiting for."""
+    rises, level = trigger_level(order)
+    return price >= level if rises else price <= level
+
+
+class _OrderBook:
+    """The two heaps of one symbol, plus a count of lazily deleted entries."""
+
+    def __init__(self):
+        self.rising: list[tuple[float, int, str]] = []    # (level, seq, order id), lowest first
+        self.falling: list[tuple[float, int, str]] = []   # (-level, seq, order id), highest first
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.rising) + len(self.falling) - self.dead
+
+
+class OrderEngine:
+    """
+    Per-symbol order books of resting orders, matched on price ticks.
+
+    Portfolios add an order when it is placed (or re-queued) and remove it
+    when it is cancelled or expires. Cancelled entries are dropped lazily
+    when they reach the top of a heap, and a book is compacted once most
+    of it is dead. Triggered orders are filled through the owning
+    portfolio, which re-checks the order under its own lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._books: dict[str, _OrderBook] = {}
+        self._entries: dict[str, tuple[OrderOwner, str, int]] = {}   # order id -> (owner, symbol, seq)
+        self._seq = itertools.count()
+        self.filled_count = 0
+
+    def add(self, owner: OrderOwner, order: Order) -> None:
+        """Queue an open order at the level it is waiting for."""
+        rises, level = trigger_level(order)
+        with self._lock:
+            self._discard(order.id)
+            seq = next(self._seq)
+            book = self._books.setdefault(order.symbol, _OrderBook())
+            if rises:
+                heapq.heappush(book.rising, (level, seq, order.id))
+            else:
+                heapq.heappush(book.falling, (-level, seq, order.id))
+            self._entries[order.id] = (owner, order.symbol, seq)
+
+    def remove(self, order_id: str) -> None:
+        """Stop matching an order (cancelled, expired or reset)."""
+        with self._lock:
+            self._discard(order_id)
+
+    def _discard(self, order_id: str) -> None:
+        """Forget an order's entry; its heap slot is dropped later (caller holds the lock)."""
+        entry = self._entries.pop(order_id, None)
+        if entry is None:
+            return
+        symbol = entry[1]
+        book = self._books[symbol]
+        book.dead += 1
+        if not len(book):
+            del self._books[symbol]
+        elif book.dead > 64 and book.dead > len(book):
+            self._compact(book)
+
+    def _is_live(self, seq: int, order_id: str) -> bool:
+        entry = self._entries.get(order_id)
+        return entry is not None and entry[2] == seq
+
+    def _compact(self, book: _OrderBook) -> None:
+        """Rebuild a book's heaps without dead entries (caller holds the lock)."""
+        book.rising = [item for item in book.rising if self._is_live(item[1], item[2])]
+        book.falling = [item for item in book.falling if self._is_live(item[1], item[2])]
+        heapq.heapify(book.rising)
+        heapq.heapify(book.falling)
+        book.dead = 0
+
+    def triggered(self, symbol: str, price: float) -> list[tuple[OrderOwner, str]]:
+        """
+        Pop every order on `symbol` that `price` reaches.
+
+        Returns:
+            (owner, order id) pairs, in fill priority order
+        """
+        with self._lock:
+            book = self._books.get(symbol)
+            if book is None:
+                return []
+
+            popped = []
+            while book.rising and book.rising[0][0] <= price:
+                _, seq, order_id = heapq.heappop(book.rising)
+                popped.append((seq, order_id))
+            while book.falling and -book.falling[0][0] >= price:
+                _, seq, order_id = heapq.heappop(book.falling)
+                popped.append((seq, order_id))
+
+            matched = []
+            for seq, order_id in popped:
+                if self._is_live(seq, order_id):
+                    owner = self._entries.pop(order_id)[0]
+                    matched.append((owner, order_id))
+                else:
+                    book.dead -= 1
+            if not len(book):
+                del self._books[symbol]
+            return matched
+
+    def on_tick(self, symbol: str, price: float) -> list:
+        """
+        Evaluate a price tick and fill every order it reaches.
+
+        Returns:
+            The executed trades
+        """
+        trades = []
+        for owner, order_id in self.triggered(symbol, price):
+            try:
+                trade = owner.fill_order(order_id, price)
+            except Exception as e:
+                logger.error(f"Error filling order {order_id} for {symbol}: {e}")
+                continue
+            if trade is not None:
+                trades.append(trade)
+                self.filled_count += 1
+                logger.info(f"Order {order_id} filled: {trade.action.value} {symbol} at {price}")
+        return trades
+
+    def symbols(self) -> set[str]:
+        """Symbols with resting orders."""
+        with self._lock:
+            return set(self._books)
+
+    def get_status(self) -> dict:
+        """Book sizes and fill count, for monitoring."""
+        with self._lock:
+            return {
+                "symbols": len(self._books),
+                "orders": len(self._entries),
+                "filled": self.filled_count,
+            }
+
+
+# Singleton instance
+order_engine = OrderEngine()
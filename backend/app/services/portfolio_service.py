@@ -3,22 +3,89 @@ Paper trading portfolio service.
 
 This service manages the virtual portfolio for paper trading,
 including positions, trades, and P&L calculations.
+
+Valuation is incremental: each position's mark (price, value, P&L and
+stops) is updated only when a price tick arrives for it, running totals are
+adjusted by the difference, and a ready-made Portfolio snapshot is kept.
+Listeners (e.g. the /ws/portfolio stream) are told only what changed.
+
+State survives restarts: every change is appended to a journal (written
+and fsync'd in batches off the request path) and the journal is compacted
+into a snapshot every few hundred records. On startup the snapshot is
+loaded and the records after it are replayed.
 """
 import logging
+import re
+import shutil
 import threading
+import time
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from pathlib import Path
+from typing import Callable, Optional
 
-from ..config import PAPER_TRADING_CONFIG, STRATEGY_CONFIG
+from ..config import PAPER_TRADING_CONFIG, STRATEGY_CONFIG, STORAGE_CONFIG, ACCOUNT_CONFIG, ORDER_CONFIG
+from ..models.order import Order, OrderList, OrderStatus, OrderType, TimeInForce
 from ..models.portfolio import Portfolio, Position, PortfolioStats
-from ..models.trade import Trade, TradeAction, TradeHistory
+from ..models.trade import Trade, TradeAction, TradeHistory, TradeRequest
+from ..core.market_hours import next_session_close
 from ..core.stop_loss import StopLossManager
 from ..core.position_sizer import calculate_position_size, calculate_stop_loss_price
 from .data_service import data_service
+from .metrics_service import compute_metrics, RunningMetrics
+from .order_engine import order_engine, is_triggered
+from .stop_engine import stop_engine
+from .storage import DATA_DIR, Journal
+from .timeseries_service import ValueSeries
+from .trade_index import TradeIndex
 
 logger = logging.getLogger(__name__)
 
+PORTFOLIO_DIR = DATA_DIR / "portfolio"
+
+# Account ids are used as directory names
+ACCOUNT_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+# Portfolio fields reported in "totals" of a portfolio update
+_TOTAL_FIELDS = (
+    "cash",
+    "total_value",
+    "invested_value",
+    "daily_pnl",
+    "daily_pnl_percent",
+    "total_return",
+    "total_return_percent",
+)
+
+
+@dataclass
+class TradeStats:
+    """Running win/loss aggregates, updated as each trade is recorded."""
+    total_trades: int = 0
+    sell_trades: int = 0
+    winning_trades: int = 0
+    losing_trades: int = 0
+    total_wins: float = 0.0
+    total_losses: float = 0.0
+    largest_win: float = 0.0
+    largest_loss: float = 0.0
+
+    def add(self, trade: Trade) -> None:
+        self.total_trades += 1
+        if trade.action != TradeAction.SELL:
+            return
+
+        self.sell_trades += 1
+        if trade.pnl and trade.pnl > 0:
+            self.winning_trades += 1
+            self.total_wins += trade.pnl
+            self.largest_win = max(self.largest_win, trade.pnl)
+        elif trade.pnl and trade.pnl < 0:
+            self.losing_trades += 1
+            self.total_losses += trade.pnl
+            self.largest_loss = min(self.largest_loss, trade.pnl)
+
 
 class PortfolioService:
     """
@@ -28,90 +95,515 @@ class PortfolioService:
     - Cash balance
     - Open positions with stop losses
     - Trade history
+    - Resting (limit/stop) orders
     - Portfolio value history
     """
 
-    def __init__(self):
-        self._lock = threading.RLock()  # Reentrant lock for thread safety
-        self.reset()
+    def __init__(
+        self,
+        storage_dir: Optional[Path] = None,
+        account_id: str = ACCOUNT_CONFIG["default_account"],
+    ):
+        """
+        Args:
+            storage_dir: Directory for the journal and snapshots
+                (None keeps the portfolio in memory only)
+            account_id: Account this portfolio belongs to
+        """
+        self.account_id = account_id
+        self.last_used = time.monotonic()
+        self._lock = threading.RLock()  # Reentrant lock for thread safety (per account)
+        self._journal = Journal(storage_dir) if storage_dir is not None else None
+        self._seq = 0                    # Seq of the last journaled record
+        self._records_since_snapshot = 0
+        self._batch: Optional[list[dict]] = None   # Records held back while a batch executes
+        self._listeners: list[Callable[[dict], None]] = []
+        opened_at = datetime.now()
+        self._clear(opened_at)
+
+        if self._journal is not None and not self._recover():
+            # A new account: journal its opening balance, so a restart
+            # rebuilds the same history instead of stamping it anew
+            self._clear(opened_at)
+            self._record("open", timestamp=opened_at.isoformat(), cash=self.cash)
+        self._refresh_snapshot()
+
+        # Watch the stops of recovered positions and queue their open orders
+        for symbol, pos_data in self.positions.items():
+            stop_engine.update(self, symbol, pos_data["stop_manager"].get_active_stop())
+        for order in self.open_orders.values():
+            order_engine.add(self, order)
+
+    def _clear(self, timestamp: Optional[datetime] = None, cash: Optional[float] = None) -> None:
+        """Set every field to the initial (empty account) state."""
+        self.cash = cash if cash is not None else PAPER_TRADING_CONFIG["initial_balance"]
+        self.positions: dict[str, dict] = {}  # symbol -> position data
+        self._trade_index = TradeIndex()  # Trades, indexed by id, symbol, action and time
+        self.orders: dict[str, Order] = {}       # Open and retained closed orders by id, oldest first
+        self.open_orders: dict[str, Order] = {}  # The ones still resting
+        self._closed_orders: dict[str, Order] = {}  # The retained closed ones, in the order they closed
+        self.value_history = ValueSeries()  # Older points are rolled up (see ValueSeries)
+
+        # Running stats, so get_stats() never rescans the history
+        self._trade_stats = TradeStats()
+        self._value_metrics = RunningMetrics(initial_capital=self.cash)
+        self._append_value(timestamp or datetime.now(), self.cash)
+
+        # Valuation state, kept up to date by price ticks
+        self._marks: dict[str, Position] = {}       # symbol -> valued position
+        self._marked_at: dict[str, datetime] = {}
+        self._invested_value = 0.0
+        self._snapshot: Optional[Portfolio] = None
+
+    @property
+    def trades(self) -> list[Trade]:
+        """Every recorded trade, oldest first."""
+        return self._trade_index.trades
 
     def reset(self) -> None:
         """Reset portfolio to initial state."""
         with self._lock:
-            self.cash = PAPER_TRADING_CONFIG["initial_balance"]
-            self.positions: dict[str, dict] = {}  # symbol -> position data
-            self.trades: list[Trade] = []
-            self.value_history: list[tuple[datetime, float]] = [
-                (datetime.now(), self.cash)
-            ]
+            removed = list(self.positions)
+            for symbol in removed:
+                stop_engine.remove(self, symbol)
+            for order_id in self.open_orders:
+                order_engine.remove(order_id)
+            timestamp = datetime.now()
+            self._clear(timestamp)
+            self._record("reset", timestamp=timestamp.isoformat())
+            # Nothing before a reset is needed to recover, so compact now
+            self._checkpoint()
+            update = self._refresh_snapshot(removed=removed)
+        self._notify(update)
+
+    def _append_trade(self, trade: Trade) -> None:
+        """Record a trade and update the running trade stats (caller holds the lock)."""
+        self._trade_index.add(trade)
+        self._trade_stats.add(trade)
+        self._value_metrics.traded_value += trade.total_value
+
+    def _append_value(self, timestamp: datetime, value: float, live: bool = False) -> None:
+        """
+        Record a value point and update the running metrics (caller holds the lock).
+
+        Live points that are out of order (e.g. the clock stepped back) are
+        clamped to the last point's time; anything else out of order raises
+        ValueError, so a corrupt history is noticed rather than rewritten.
+        """
+        self.value_history.append(timestamp, value, clamp=live)
+        self._value_metrics.append(timestamp, value)
+
+    # --- Persistence -------------------------------------------------------
+
+    def _record(self, record_type: str, **data) -> None:
+        """Journal a state change (caller holds the lock)."""
+        if self._journal is None:
+            return
+        if self._batch is not None:
+            self._batch.append({"type": record_type, **data})
+            return
+
+        self._seq += 1
+        self._journal.append({"seq": self._seq, "type": record_type, **data})
+
+        self._records_since_snapshot += 1
+        if self._records_since_snapshot >= STORAGE_CONFIG["snapshot_every_records"]:
+            self._checkpoint()
+
+    def _checkpoint(self) -> None:
+        """
+        Queue a snapshot of the current state (caller holds the lock).
+
+        Only cheap shallow copies are taken here; trades and closed orders
+        are immutable once recorded, so serializing them can safely happen
+        on the flusher thread. Open orders change state, so they are
+        serialized right away.
+        """
+        if self._journal is None:
+            return
+
+        cash = self.cash
+        positions = {symbol: self._position_state(pos) for symbol, pos in self.positions.items()}
+        trades = list(self.trades)
+        orders = [
+            order.model_dump(mode="json") if order.status == OrderStatus.OPEN else order
+            for order in self.orders.values()
+        ]
+        value_dates, values = self.value_history.query()
+        value_metrics = self._value_metrics.to_state()
+
+        def build_state() -> dict:
+            return {
+                "cash": cash,
+                "positions": positions,
+                "trades": [trade.model_dump(mode="json") for trade in trades],
+                "orders": [
+                    order if isinstance(order, dict) else order.model_dump(mode="json")
+                    for order in orders
+                ],
+                "value_history": [[ts.isoformat(), value] for ts, value in zip(value_dates, values)],
+                # The retained history may be rolled up, so the running
+                # metrics are saved rather than rebuilt from it
+                "value_metrics": value_metrics,
+            }
+
+        self._journal.checkpoint(self._seq, build_state)
+        self._records_since_snapshot = 0
+
+    @staticmethod
+    def _position_state(pos_data: dict) -> dict:
+        """Serializable form of a position (the stop manager is rebuilt)."""
+        return {
+            "shares": pos_data["shares"],
+            "entry_price": pos_data["entry_price"],
+            "entry_date": pos_data["entry_date"].isoformat(),
+            "highest_price": pos_data["stop_manager"].highest_price,
+        }
+
+    @staticmethod
+    def _position_from_state(state: dict) -> dict:
+        """Rebuild position data (with its stop manager) from _position_state."""
+        stop_manager = StopLossManager(entry_price=state["entry_price"])
+        stop_manager.update(state["highest_price"])
+        return {
+            "shares": state["shares"],
+            "entry_price": state["entry_price"],
+            "entry_date": datetime.fromisoformat(state["entry_date"]),
+            "stop_manager": stop_manager,
+        }
+
+    def _recover(self) -> bool:
+        """
+        Load the latest snapshot and replay the journal written after it.
+
+        Returns:
+            Whether there was any saved state to recover
+        """
+        snapshot = self._journal.load_snapshot()
+        if snapshot is not None:
+            state = snapshot["state"]
+            self._seq = snapshot["seq"]
+            self.cash = state["cash"]
+            self.positions = {
+                symbol: self._position_from_state(pos)
+                for symbol, pos in state["positions"].items()
+            }
+            self.value_history = ValueSeries()
+            self._value_metrics = RunningMetrics(initial_capital=PAPER_TRADING_CONFIG["initial_balance"])
+            for ts, value in state["value_history"]:
+                self._append_value(datetime.fromisoformat(ts), value)
+            for trade in state["trades"]:
+                self._append_trade(Trade(**trade))
+            for order in state.get("orders", []):
+                self._store_order(Order(**order))
+            if "value_metrics" in state:
+                self._value_metrics = RunningMetrics.from_state(state["value_metrics"])
+        else:
+            # The opening value point comes from the journal's "open" (or
+            # "reset") record, not from the time of this restart
+            self.value_history = ValueSeries()
+            self._value_metrics = RunningMetrics(initial_capital=self.cash)
+
+        replayed = 0
+        for record in self._journal.replay(after_seq=self._seq):
+            self._apply(record)
+            self._seq = record["seq"]
+            replayed += 1
+        self._records_since_snapshot = replayed
+
+        if snapshot is not None or replayed:
+            logger.info(
+                f"Recovered portfolio: {len(self.trades)} trades, "
+                f"{len(self.positions)} positions ({replayed} journal records replayed)"
+            )
+        return snapshot is not None or replayed > 0
+
+    def _apply(self, record: dict) -> None:
+        """Apply one journaled change during recovery."""
+        record_type = record["type"]
+
+        if record_type == "buy":
+            trade = Trade(**record["trade"])
+            self.cash = record["cash"]
+            self.positions[trade.symbol] = self._position_from_state(record["position"])
+            self._append_trade(trade)
+        elif record_type == "sell":
+            trade = Trade(**record["trade"])
+            self.cash = record["cash"]
+            self.positions.pop(trade.symbol, None)
+            self._append_trade(trade)
+        elif record_type == "stop":
+            pos_data = self.positions.get(record["symbol"])
+            if pos_data is not None:
+                pos_data["stop_manager"].update(record["highest_price"])
+        elif record_type == "batch":
+            for batched in record["records"]:
+                self._apply(batched)
+        elif record_type == "order":
+            self._store_order(Order(**record["order"]))
+        elif record_type == "value":
+            try:
+                self._append_value(datetime.fromisoformat(record["timestamp"]), record["value"])
+            except ValueError as e:
+                logger.warning(f"Skipping journal record {record.get('seq')}: {e}")
+        elif record_type == "open":
+            self._clear(datetime.fromisoformat(record["timestamp"]), record["cash"])
+        elif record_type == "reset":
+            self._clear(datetime.fromisoformat(record["timestamp"]))
+        else:
+            logger.warning(f"Ignoring unknown journal record type: {record_type}")
+
+    def _update_stop(self, symbol: str, stop_manager: StopLossManager, price: float) -> None:
+        """Move a position's trailing stop, journaling new highs."""
+        previous_high = stop_manager.highest_price
+        stop_manager.update(price)
+        if stop_manager.highest_price > previous_high:
+            self._record("stop", symbol=symbol, highest_price=stop_manager.highest_price)
+            stop_engine.update(self, symbol, stop_manager.get_active_stop())
+
+    def flush(self) -> None:
+        """Block until every journaled change is on disk (e.g. at shutdown)."""
+        if self._journal is not None:
+            self._journal.close()
+
+    # --- Valuation -----------------------------------------------------------
+
+    def add_listener(self, callback: Callable[[dict], None]) -> None:
+        """
+        Call `callback(update)` whenever the portfolio valuation changes.
+
+        Updates only contain what changed:
+        {"type": "portfolio_update", "positions": {symbol: {field: value}},
+         "removed": [symbol, ...], "totals": {field: value}, "last_updated": ...}
+
+        Callbacks run on whichever thread made the change, outside the lock.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[dict], None]) -> None:
+        """Remove a listener."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, update: Optional[dict]) -> None:
+        """Send an update to every listener (caller must NOT hold the lock)."""
+        if not update:
+            return
+        for callback in list(self._listeners):
+            try:
+                callback(update)
+            except Exception as e:
+                logger.error(f"Portfolio listener error: {e}")
+
+    def _mark(self, symbol: str, price: float, fresh: bool = True) -> dict:
+        """
+        Revalue one position at a new price (caller holds the lock).
+
+        Moves its trailing stop, adjusts the running invested total by the
+        change in market value, and returns the changed Position fields.
+        A fallback price (fresh=False) doesn't count as a quote, so the
+        position stays stale and is re-priced on the next read.
+        """
+        pos_data = self.positions[symbol]
+        stop_manager: StopLossManager = pos_data["stop_manager"]
+        self._update_stop(symbol, stop_manager, price)
+
+        # Calculate P&L
+        entry_value = pos_data["shares"] * pos_data["entry_price"]
+        current_value = pos_data["shares"] * price
+        unrealized_pnl = current_value - entry_value
+        unrealized_pnl_percent = (unrealized_pnl / entry_value) * 100 if entry_value > 0 else 0
+
+        position = Position(
+            symbol=symbol,
+            shares=pos_data["shares"],
+            entry_price=pos_data["entry_price"],
+            entry_date=pos_data["entry_date"],
+            current_price=price,
+            highest_price=stop_manager.highest_price,
+            initial_stop=stop_manager.initial_stop,
+            trailing_stop=stop_manager.trailing_stop,
+            active_stop=stop_manager.get_active_stop(),
+            unrealized_pnl=round(unrealized_pnl, 2),
+            unrealized_pnl_percent=round(unrealized_pnl_percent, 2),
+        )
+
+        previous = self._marks.get(symbol)
+        if previous is not None:
+            self._invested_value -= previous.shares * previous.current_price
+        self._invested_value += current_value
+        self._marks[symbol] = position
+        if fresh:
+            self._marked_at[symbol] = datetime.now()
+
+        new_fields = position.model_dump(mode="json")
+        if previous is None:
+            return new_fields
+        old_fields = previous.model_dump(mode="json")
+        return {field: value for field, value in new_fields.items() if old_fields[field] != value}
+
+    def _unmark(self, symbol: str) -> None:
+        """Drop a closed position from the valuation (caller holds the lock)."""
+        self._marks.pop(symbol, None)
+        self._marked_at.pop(symbol, None)
+        # Re-sum instead of subtracting so rounding errors don't accumulate
+        self._invested_value = sum(p.shares * p.current_price for p in self._marks.values())
+
+    def _refresh_snapshot(
+        self,
+        positions: Optional[dict[str, dict]] = None,
+        removed: Optional[list[str]] = None,
+    ) -> Optional[dict]:
+        """
+        Rebuild the Portfolio snapshot from the marks and running totals
+        (caller holds the lock).
+
+        Args:
+            positions: Changed Position fields by symbol
+            removed: Symbols whose positions were closed
+
+        Returns:
+            The update for listeners, or None if nothing changed
+        """
+        total_value = self.cash + self._invested_value
+
+        # Calculate daily P&L (vs last recorded value)
+        last_point = self.value_history.last()
+        if last_point is not None:
+            last_value = last_point[1]
+            daily_pnl = total_value - last_value
+            daily_pnl_percent = (daily_pnl / last_value) * 100 if last_value > 0 else 0
+        else:
+            daily_pnl = 0.0
+            daily_pnl_percent = 0.0
+
+        # Calculate total return
+        initial = PAPER_TRADING_CONFIG["initial_balance"]
+        total_return = total_value - initial
+        total_return_percent = (total_return / initial) * 100 if initial > 0 else 0
+
+        previous = self._snapshot
+        self._snapshot = Portfolio(
+            cash=round(self.cash, 2),
+            positions=list(self._marks.values()),
+            total_value=round(total_value, 2),
+            invested_value=round(self._invested_value, 2),
+            daily_pnl=round(daily_pnl, 2),
+            daily_pnl_percent=round(daily_pnl_percent, 2),
+            total_return=round(total_return, 2),
+            total_return_percent=round(total_return_percent, 2),
+            last_updated=datetime.now(),
+        )
+
+        totals = {
+            field: getattr(self._snapshot, field)
+            for field in _TOTAL_FIELDS
+            if previous is None or getattr(previous, field) != getattr(self._snapshot, field)
+        }
+        positions = {symbol: fields for symbol, fields in (positions or {}).items() if fields}
+        if not (totals or positions or removed):
+            return None
+
+        return {
+            "type": "portfolio_update",
+            "positions": positions,
+            "removed": removed or [],
+            "totals": totals,
+            "last_updated": self._snapshot.last_updated.isoformat(),
+        }
+
+    def on_price(self, symbol: str, price: float) -> None:
+        """
+        Apply a price tick.
+
+        Only the ticked position is revalued; ticks for symbols we don't
+        hold are ignored.
+        """
+        self.on_prices({symbol: price})
+
+    def on_prices(self, prices: dict[str, float]) -> None:
+        """Apply price ticks for several symbols at once."""
+        with self._lock:
+            changed = {
+                symbol: self._mark(symbol, price)
+                for symbol, price in prices.items()
+                if symbol in self.positions
+            }
+            if not changed:
+                return
+            update = self._refresh_snapshot(positions=changed)
+        self._notify(update)
 
     def get_portfolio(self) -> Portfolio:
-        """Get current portfolio state."""
+        """
+        Get current portfolio state.
+
+        Normally this is just the latest snapshot. Positions that have no
+        mark yet, or no tick within mark_max_age_seconds (e.g. when real-time
+        data isn't configured), are first priced in one batch outside the
+        lock - so a slow quote never blocks trades.
+        """
+        stale = self.stale_symbols()
+        if stale:
+            self._mark_stale(stale, self._latest_prices(stale))
+
         with self._lock:
-            positions = []
-            invested_value = 0.0
+            return self._snapshot
 
-            for symbol, pos_data in self.positions.items():
-                try:
-                    latest = data_service.get_latest_price(symbol)
-                    current_price = latest["price"]
-                except Exception:
-                    current_price = pos_data["entry_price"]
+    def stale_symbols(self) -> list[str]:
+        """Held symbols with no mark, or none within mark_max_age_seconds."""
+        max_age = PAPER_TRADING_CONFIG["mark_max_age_seconds"]
+        with self._lock:
+            now = datetime.now()
+            return [
+                symbol for symbol in self.positions
+                if symbol not in self._marked_at
+                or (now - self._marked_at[symbol]).total_seconds() > max_age
+            ]
 
-                # Update stop loss manager with current price
-                stop_manager: StopLossManager = pos_data["stop_manager"]
-                stop_manager.update(current_price)
+    def _mark_stale(self, symbols: list[str], prices: dict[str, float]) -> None:
+        """
+        Mark stale positions at fetched prices.
 
-                # Calculate P&L
-                entry_value = pos_data["shares"] * pos_data["entry_price"]
-                current_value = pos_data["shares"] * current_price
-                unrealized_pnl = current_value - entry_value
-                unrealized_pnl_percent = (unrealized_pnl / entry_value) * 100 if entry_value > 0 else 0
+        If a quote is missing, the last mark is kept (or, for a position
+        never marked, it is valued at its entry price); either way it stays
+        stale, so the next read retries the quote.
+        """
+        with self._lock:
+            changed = {}
+            for symbol in symbols:
+                if symbol not in self.positions:
+                    continue
+                if symbol in prices:
+                    changed[symbol] = self._mark(symbol, prices[symbol])
+                elif symbol not in self._marks:
+                    changed[symbol] = self._mark(symbol, self.positions[symbol]["entry_price"], fresh=False)
+            if not changed:
+                return
+            update = self._refresh_snapshot(positions=changed)
+        self._notify(update)
+
+    @staticmethod
+    def _latest_prices(symbols: list[str]) -> dict[str, float]:
+        """Latest prices for many symbols in one batch (missing on failure)."""
+        try:
+            return {
+                symbol: latest["price"]
+                for symbol, latest in data_service.get_latest_prices(symbols).items()
+            }
+        except Exception as e:
+            logger.error(f"Error fetching latest prices: {e}")
+            return {}
 
-                invested_value += current_value
+    def _check_can_buy(self, symbol: str) -> None:
+        """Raise ValueError if a new position can't be opened (caller holds the lock)."""
+        # Check if already have position
+        if symbol in self.positions:
+            raise ValueError(f"Already have a position in {symbol}")
 
-                position = Position(
-                    symbol=symbol,
-                    shares=pos_data["shares"],
-                    entry_price=pos_data["entry_price"],
-                    entry_date=pos_data["entry_date"],
-                    current_price=current_price,
-                    highest_price=stop_manager.highest_price,
-                    initial_stop=stop_manager.initial_stop,
-                    trailing_stop=stop_manager.trailing_stop,
-                    active_stop=stop_manager.get_active_stop(),
-                    unrealized_pnl=round(unrealized_pnl, 2),
-                    unrealized_pnl_percent=round(unrealized_pnl_percent, 2),
-                )
-                positions.append(position)
-
-            total_value = self.cash + invested_value
-
-            # Calculate daily P&L (vs last recorded value)
-            if self.value_history:
-                last_value = self.value_history[-1][1]
-                daily_pnl = total_value - last_value
-                daily_pnl_percent = (daily_pnl / last_value) * 100 if last_value > 0 else 0
-            else:
-                daily_pnl = 0.0
-                daily_pnl_percent = 0.0
-
-            # Calculate total return
-            initial = PAPER_TRADING_CONFIG["initial_balance"]
-            total_return = total_value - initial
-            total_return_percent = (total_return / initial) * 100 if initial > 0 else 0
-
-            return Portfolio(
-                cash=round(self.cash, 2),
-                positions=positions,
-                total_value=round(total_value, 2),
-                invested_value=round(invested_value, 2),
-                daily_pnl=round(daily_pnl, 2),
-                daily_pnl_percent=round(daily_pnl_percent, 2),
-                total_return=round(total_return, 2),
-                total_return_percent=round(total_return_percent, 2),
-                last_updated=datetime.now(),
-            )
+        # Check max positions
+        if len(self.positions) >= STRATEGY_CONFIG["max_positions"]:
+            raise ValueError(f"Maximum positions ({STRATEGY_CONFIG['max_positions']}) reached")
 
     def buy(
         self,
@@ -122,6 +614,9 @@ class PortfolioService:
         """
         Execute a buy order.
 
+        The quote and the account value for sizing are fetched before taking
+        the lock; the checks are repeated under it before executing.
+
         Args:
             symbol: Stock symbol to buy
             shares: Number of shares (if None, auto-calculate based on risk)
@@ -130,68 +625,85 @@ class PortfolioService:
         Returns:
             Trade object with execution details
         """
+        # Fail fast before any network calls
         with self._lock:
-            # Check if already have position
-            if symbol in self.positions:
-                raise ValueError(f"Already have a position in {symbol}")
-
-            # Check max positions
-            if len(self.positions) >= STRATEGY_CONFIG["max_positions"]:
-                raise ValueError(f"Maximum positions ({STRATEGY_CONFIG['max_positions']}) reached")
-
-            # Get price
-            if price is None:
-                latest = data_service.get_latest_price(symbol)
-                price = latest["price"]
-
-            # Calculate stop loss price
-            stop_loss_price = calculate_stop_loss_price(price)
-
-            # Calculate position size if not specified
-            if shares is None:
-                portfolio = self.get_portfolio()
-                sizing = calculate_position_size(
-                    account_value=portfolio.total_value,
-                    entry_price=price,
-                    stop_loss_price=stop_loss_price,
-                )
-                shares = sizing["shares"]
+            self._check_can_buy(symbol)
 
-            if shares <= 0:
-                raise ValueError("Cannot buy zero shares")
+        # Get price
+        if price is None:
+            latest = data_service.get_latest_price(symbol)
+            price = latest["price"]
 
-            # Check if we have enough cash
-            total_cost = shares * price
-            if total_cost > self.cash:
-                raise ValueError(f"Insufficient cash. Need ${total_cost:.2f}, have ${self.cash:.2f}")
+        # Calculate stop loss price
+        stop_loss_price = calculate_stop_loss_price(price)
 
-            # Execute trade
-            self.cash -= total_cost
+        # Calculate position size if not specified
+        if shares is None:
+            portfolio = self.get_portfolio()
+            sizing = calculate_position_size(
+                account_value=portfolio.total_value,
+                entry_price=price,
+                stop_loss_price=stop_loss_price,
+            )
+            shares = sizing["shares"]
 
-            # Create stop loss manager
-            stop_manager = StopLossManager(entry_price=price)
+        if shares <= 0:
+            raise ValueError("Cannot buy zero shares")
 
-            # Record position
-            self.positions[symbol] = {
-                "shares": shares,
-                "entry_price": price,
-                "entry_date": datetime.now(),
-                "stop_manager": stop_manager,
-            }
+        with self._lock:
+            trade, update = self._execute_buy(symbol, shares, price)
 
-            # Create trade record
-            trade = Trade(
-                id=str(uuid.uuid4()),
-                symbol=symbol,
-                action=TradeAction.BUY,
-                shares=shares,
-                price=price,
-                total_value=round(total_cost, 2),
-                timestamp=datetime.now(),
-            )
+        self._notify(update)
+        return trade
+
+    def _execute_buy(self, symbol: str, shares: int, price: float) -> tuple[Trade, Optional[dict]]:
+        """
+        Open a position at a known price (caller holds the lock).
 
-            self.trades.append(trade)
-            return trade
+        Returns:
+            (trade, update for listeners)
+        """
+        self._check_can_buy(symbol)
+
+        # Check if we have enough cash
+        total_cost = shares * price
+        if total_cost > self.cash:
+            raise ValueError(f"Insufficient cash. Need ${total_cost:.2f}, have ${self.cash:.2f}")
+
+        # Execute trade
+        self.cash -= total_cost
+
+        # Create stop loss manager
+        stop_manager = StopLossManager(entry_price=price)
+
+        # Record position
+        self.positions[symbol] = {
+            "shares": shares,
+            "entry_price": price,
+            "entry_date": datetime.now(),
+            "stop_manager": stop_manager,
+        }
+        stop_engine.update(self, symbol, stop_manager.get_active_stop())
+
+        # Create trade record
+        trade = Trade(
+            id=str(uuid.uuid4()),
+            symbol=symbol,
+            action=TradeAction.BUY,
+            shares=shares,
+            price=price,
+            total_value=round(total_cost, 2),
+            timestamp=datetime.now(),
+        )
+
+        self._append_trade(trade)
+        self._record(
+            "buy",
+            trade=trade.model_dump(mode="json"),
+            cash=self.cash,
+            position=self._position_state(self.positions[symbol]),
+        )
+        return trade, self._refresh_snapshot(positions={symbol: self._mark(symbol, price)})
 
     def sell(
         self,
@@ -210,48 +722,194 @@ class PortfolioService:
         Returns:
             Trade object with execution details
         """
+        # Get price (outside the lock - it may be a network fetch)
+        if price is None:
+            with self._lock:
+                if symbol not in self.positions:
+                    raise ValueError(f"No position in {symbol}")
+            latest = data_service.get_latest_price(symbol)
+            price = latest["price"]
+
         with self._lock:
-            if symbol not in self.positions:
-                raise ValueError(f"No position in {symbol}")
+            trade, update = self._execute_sell(symbol, price, exit_reason)
 
-            pos_data = self.positions[symbol]
-            shares = pos_data["shares"]
-            entry_price = pos_data["entry_price"]
+        self._notify(update)
+        return trade
 
-            # Get price
-            if price is None:
-                latest = data_service.get_latest_price(symbol)
-                price = latest["price"]
+    def _execute_sell(self, symbol: str, price: float, exit_reason: str) -> tuple[Trade, Optional[dict]]:
+        """
+        Close a position at a known price (caller holds the lock).
 
-            # Calculate P&L
-            total_value = shares * price
-            entry_value = shares * entry_price
-            pnl = total_value - entry_value
-            pnl_percent = (pnl / entry_value) * 100 if entry_value > 0 else 0
+        Returns:
+            (trade, update for listeners)
+        """
+        if symbol not in self.positions:
+            raise ValueError(f"No position in {symbol}")
+
+        pos_data = self.positions[symbol]
+        shares = pos_data["shares"]
+        entry_price = pos_data["entry_price"]
+
+        # Calculate P&L
+        total_value = shares * price
+        entry_value = shares * entry_price
+        pnl = total_value - entry_value
+        pnl_percent = (pnl / entry_value) * 100 if entry_value > 0 else 0
+
+        # Execute trade
+        self.cash += total_value
+
+        # Remove position
+        del self.positions[symbol]
+        stop_engine.remove(self, symbol)
+
+        # Create trade record
+        trade = Trade(
+            id=str(uuid.uuid4()),
+            symbol=symbol,
+            action=TradeAction.SELL,
+            shares=shares,
+            price=price,
+            total_value=round(total_value, 2),
+            timestamp=datetime.now(),
+            entry_price=entry_price,
+            pnl=round(pnl, 2),
+            pnl_percent=round(pnl_percent, 2),
+            exit_reason=exit_reason,
+        )
+
+        self._append_trade(trade)
+        self._record("sell", trade=trade.model_dump(mode="json"), cash=self.cash)
+        self._unmark(symbol)
+        return trade, self._refresh_snapshot(removed=[symbol])
+
+    def sell_if_stopped(self, symbol: str, price: float) -> Optional[Trade]:
+        """
+        Sell a position if `price` is through its active stop.
 
-            # Execute trade
-            self.cash += total_value
+        Called by the stop engine on ticks; the stop is re-checked under
+        the lock so a position is never sold on a stale stop level.
 
-            # Remove position
-            del self.positions[symbol]
+        Returns:
+            The sell trade, or None if not stopped out (or no position)
+        """
+        with self._lock:
+            pos_data = self.positions.get(symbol)
+            if pos_data is None:
+                return None
 
-            # Create trade record
-            trade = Trade(
-                id=str(uuid.uuid4()),
-                symbol=symbol,
-                action=TradeAction.SELL,
-                shares=shares,
-                price=price,
-                total_value=round(total_value, 2),
-                timestamp=datetime.now(),
-                entry_price=entry_price,
-                pnl=round(pnl, 2),
-                pnl_percent=round(pnl_percent, 2),
-                exit_reason=exit_reason,
-            )
+            stop_manager: StopLossManager = pos_data["stop_manager"]
+            is_stopped, reason = stop_manager.is_stopped_out(price)
+            if not is_stopped:
+                return None
+
+            trade, update = self._execute_sell(symbol, price, reason)
+
+        self._notify(update)
+        return trade
+
+    def execute_batch(
+        self,
+        legs: list[TradeRequest],
+        prices: Optional[dict[str, float]] = None,
+    ) -> list[Trade]:
+        """
+        Execute several trades all-or-nothing.
+
+        Sells are applied before buys, so their proceeds (and freed
+        position slots) can fund the buys. Every leg is checked against the
+        account as the earlier legs will leave it, all under one lock
+        acquisition, before anything executes - so either every leg fills
+        or none does. The legs are journaled as one record.
+
+        Args:
+            legs: Trades to execute (at most one per symbol); sells close
+                the whole position, buys without shares use the 2% risk rule
+            prices: Execution prices by symbol, e.g. fetched in one batch
+                (by default they are fetched here)
+
+        Returns:
+            The executed trades, sells first
 
-            self.trades.append(trade)
-            return trade
+        Raises:
+            ValueError: If any leg can't be executed (nothing is executed)
+        """
+        if not legs:
+            raise ValueError("A batch needs at least one trade")
+
+        symbols = [leg.symbol.upper() for leg in legs]
+        duplicates = sorted({symbol for symbol in symbols if symbols.count(symbol) > 1})
+        if duplicates:
+            raise ValueError(f"Each symbol may appear only once per batch: {', '.join(duplicates)}")
+
+        if prices is None:
+            prices = self._latest_prices(symbols)
+        missing = [symbol for symbol in symbols if symbol not in prices]
+        if missing:
+            raise ValueError(f"No price available for {', '.join(missing)}")
+
+        # Size auto-sized buys at the current account value (outside the lock)
+        account_value = None
+        if any(leg.action == TradeAction.BUY and leg.shares is None for leg in legs):
+            account_value = self.get_portfolio().total_value
+
+        plan = []
+        for symbol, leg in sorted(zip(symbols, legs), key=lambda item: item[1].action != TradeAction.SELL):
+            shares = leg.shares
+            if leg.action == TradeAction.BUY:
+                if shares is None:
+                    shares = calculate_position_size(
+                        account_value=account_value,
+                        entry_price=prices[symbol],
+                        stop_loss_price=calculate_stop_loss_price(prices[symbol]),
+                    )["shares"]
+                if shares <= 0:
+                    raise ValueError(f"Cannot buy zero shares of {symbol}")
+            plan.append((symbol, leg.action, shares, prices[symbol]))
+
+        updates = []
+        with self._lock:
+            # Dry run: the same checks the trades make, leg by leg
+            cash = self.cash
+            held = set(self.positions)
+            for symbol, action, shares, price in plan:
+                if action == TradeAction.SELL:
+                    if symbol not in held:
+                        raise ValueError(f"No position in {symbol}")
+                    cash += self.positions[symbol]["shares"] * price
+                    held.remove(symbol)
+                    continue
+
+                if symbol in held:
+                    raise ValueError(f"Already have a position in {symbol}")
+                if len(held) >= STRATEGY_CONFIG["max_positions"]:
+                    raise ValueError(f"Maximum positions ({STRATEGY_CONFIG['max_positions']}) reached at {symbol}")
+                total_cost = shares * price
+                if total_cost > cash:
+                    raise ValueError(
+                        f"Insufficient cash for {symbol}. Need ${total_cost:.2f}, have ${cash:.2f}"
+                    )
+                cash -= total_cost
+                held.add(symbol)
+
+            trades = []
+            self._batch = []
+            try:
+                for symbol, action, shares, price in plan:
+                    if action == TradeAction.SELL:
+                        trade, update = self._execute_sell(symbol, price, exit_reason="manual")
+                    else:
+                        trade, update = self._execute_buy(symbol, shares, price)
+                    trades.append(trade)
+                    updates.append(update)
+            finally:
+                records, self._batch = self._batch, None
+                if records:
+                    self._record("batch", records=records)
+
+        for update in updates:
+            self._notify(update)
+        return trades
 
     def check_stops(self) -> list[Trade]:
         """
@@ -260,102 +918,588 @@ class PortfolioService:
         Returns list of executed sell trades for positions that hit their stops.
         """
         with self._lock:
-            triggered_trades = []
+            held = list(self.positions)
+
+        prices = self._latest_prices(held)
+        for symbol in held:
+            if symbol not in prices:
+                logger.error(f"Error checking stop for {symbol}: no latest price")
 
-            for symbol in list(self.positions.keys()):
-                pos_data = self.positions[symbol]
-                stop_manager: StopLossManager = pos_data["stop_manager"]
+        # Revalue (and move trailing stops) first, then sell what's stopped out
+        self.on_prices(prices)
 
-                try:
-                    latest = data_service.get_latest_price(symbol)
-                    current_price = latest["price"]
+        triggered_trades = []
+        for symbol, current_price in prices.items():
+            try:
+                trade = self.sell_if_stopped(symbol, current_price)
+                if trade is not None:
+                    triggered_trades.append(trade)
+            except Exception as e:
+                logger.error(f"Error checking stop for {symbol}: {e}")
 
-                    # Update stop with current price
-                    stop_manager.update(current_price)
+        return triggered_trades
+
+    # --- Resting orders ------------------------------------------------------
+
+    def place_order(
+        self,
+        symbol: str,
+        action: TradeAction,
+        order_type: OrderType,
+        shares: Optional[int] = None,
+        limit_price: Optional[float] = None,
+        stop_price: Optional[float] = None,
+        time_in_force: TimeInForce = TimeInForce.GTC,
+    ) -> Order:
+        """
+        Place a limit, stop or stop-limit order that rests until a price
+        tick reaches it (see OrderEngine).
 
-                    # Check if stopped out
-                    is_stopped, reason = stop_manager.is_stopped_out(current_price)
+        Args:
+            symbol: Stock symbol
+            action: Buy (open a position) or sell (close the position)
+            order_type: limit, stop or stop_limit
+            shares: Shares to buy (if None, sized with the 2% risk rule at
+                the order's limit or stop price); sells close the position
+            limit_price: Required for limit and stop-limit orders
+            stop_price: Required for stop and stop-limit orders
+            time_in_force: "day" orders expire at the session close
 
-                    if is_stopped:
-                        trade = self.sell(symbol, price=current_price, exit_reason=reason)
-                        triggered_trades.append(trade)
+        Returns:
+            The open order
 
-                except Exception as e:
-                    logger.error(f"Error checking stop for {symbol}: {e}")
+        Raises:
+            ValueError: If the order is invalid or can't be accepted
+        """
+        if order_type in (OrderType.LIMIT, OrderType.STOP_LIMIT) and not (limit_price and limit_price > 0):
+            raise ValueError(f"A {order_type.value} order needs a positive limit_price")
+        if order_type in (OrderType.STOP, OrderType.STOP_LIMIT) and not (stop_price and stop_price > 0):
+            raise ValueError(f"A {order_type.value} order needs a positive stop_price")
+        if order_type == OrderType.LIMIT:
+            stop_price = None
+        elif order_type == OrderType.STOP:
+            limit_price = None
+
+        if action == TradeAction.SELL:
+            with self._lock:
+                if symbol not in self.positions:
+                    raise ValueError(f"No position in {symbol}")
+            shares = None
+        elif shares is None:
+            # Size at the price the order is expected to fill at
+            price = limit_price or stop_price
+            sizing = calculate_position_size(
+                account_value=self.get_portfolio().total_value,
+                entry_price=price,
+                stop_loss_price=calculate_stop_loss_price(price),
+            )
+            shares = sizing["shares"]
+        if shares is not None and shares <= 0:
+            raise ValueError("Cannot buy zero shares")
 
-            return triggered_trades
+        now = datetime.now()
+        expires_at = None
+        if time_in_force == TimeInForce.DAY:
+            expires_at = next_session_close().astimezone().replace(tzinfo=None)
 
-    def get_trades(self) -> TradeHistory:
-        """Get trade history."""
         with self._lock:
-            return TradeHistory(
-                trades=self.trades,
-                total_trades=len(self.trades),
+            if len(self.open_orders) >= ORDER_CONFIG["max_open_orders"]:
+                raise ValueError(f"Maximum open orders ({ORDER_CONFIG['max_open_orders']}) reached")
+
+            order = Order(
+                id=str(uuid.uuid4()),
+                symbol=symbol,
+                action=action,
+                order_type=order_type,
+                shares=shares,
+                limit_price=limit_price,
+                stop_price=stop_price,
+                time_in_force=time_in_force,
+                created_at=now,
+                expires_at=expires_at,
+            )
+            self._store_order(order)
+            self._record("order", order=order.model_dump(mode="json"))
+            order_engine.add(self, order)
+            return order
+
+    def _store_order(self, order: Order) -> None:
+        """
+        Keep an order (new or updated) and track whether it is open (caller
+        holds the lock). Only the most recently closed max_retained_orders
+        closed orders are kept.
+        """
+        self.orders[order.id] = order
+        if order.status == OrderStatus.OPEN:
+            self.open_orders[order.id] = order
+            return
+
+        self.open_orders.pop(order.id, None)
+        self._closed_orders.pop(order.id, None)
+        self._closed_orders[order.id] = order
+        while len(self._closed_orders) > ORDER_CONFIG["max_retained_orders"]:
+            oldest = next(iter(self._closed_orders))
+            del self._closed_orders[oldest]
+            del self.orders[oldest]
+
+    def _close_order(self, order: Order, status: OrderStatus, **outcome) -> None:
+        """Finish an open order and journal its outcome (caller holds the lock)."""
+        order.status = status
+        order.closed_at = datetime.now()
+        for field, value in outcome.items():
+            setattr(order, field, value)
+        self._store_order(order)
+        self._record("order", order=order.model_dump(mode="json"))
+
+    def _expire_orders(self) -> None:
+        """Expire open day orders past their session close (caller holds the lock)."""
+        now = datetime.now()
+        for order in list(self.open_orders.values()):
+            if order.expires_at is not None and order.expires_at <= now:
+                order_engine.remove(order.id)
+                self._close_order(order, OrderStatus.EXPIRED)
+
+    def cancel_order(self, order_id: str) -> Optional[Order]:
+        """
+        Cancel an open order.
+
+        Returns:
+            The cancelled order, or None if it is unknown
+
+        Raises:
+            ValueError: If the order is no longer open
+        """
+        with self._lock:
+            self._expire_orders()
+            order = self.orders.get(order_id)
+            if order is None:
+                return None
+            if order.status != OrderStatus.OPEN:
+                raise ValueError(f"Order is already {order.status.value}")
+
+            order_engine.remove(order_id)
+            self._close_order(order, OrderStatus.CANCELLED, reason="Cancelled by user")
+            return order
+
+    def fill_order(self, order_id: str, price: float) -> Optional[Trade]:
+        """
+        Fill an open order at a tick price that reached it.
+
+        Called by the order engine; the order is re-checked under the lock.
+        A stop-limit order whose stop is reached is re-queued as a limit
+        order unless the same tick already satisfies its limit. Orders that
+        can no longer execute (e.g. not enough cash) are rejected.
+
+        Returns:
+            The executed trade, or None if nothing was filled
+        """
+        with self._lock:
+            order = self.open_orders.get(order_id)
+            if order is None:
+                return None
+
+            if order.expires_at is not None and order.expires_at <= datetime.now():
+                self._close_order(order, OrderStatus.EXPIRED)
+                return None
+
+            if order.order_type == OrderType.STOP_LIMIT and order.triggered_at is None:
+                order.triggered_at = datetime.now()
+                self._record("order", order=order.model_dump(mode="json"))
+
+            if not is_triggered(order, price):
+                order_engine.add(self, order)
+                return None
+
+            try:
+                if order.action == TradeAction.BUY:
+                    trade, update = self._execute_buy(order.symbol, order.shares, price)
+                else:
+                    trade, update = self._execute_sell(
+                        order.symbol, price, exit_reason=f"{order.order_type.value}_order"
+                    )
+            except ValueError as e:
+                self._close_order(order, OrderStatus.REJECTED, reason=str(e))
+                logger.warning(f"Order {order_id} rejected: {e}")
+                return None
+
+            self._close_order(order, OrderStatus.FILLED, fill_price=price, trade_id=trade.id)
+
+        self._notify(update)
+        return trade
+
+    def get_orders(
+        self,
+        status: Optional[OrderStatus] = None,
+        symbol: Optional[str] = None,
+    ) -> OrderList:
+        """Get orders, oldest first, optionally filtered by status and symbol."""
+        with self._lock:
+            self._expire_orders()
+            orders = self.open_orders if status == OrderStatus.OPEN else self.orders
+            return OrderList(
+                orders=[
+                    order for order in orders.values()
+                    if (status is None or order.status == status)
+                    and (symbol is None or order.symbol == symbol)
+                ],
+                open_orders=len(self.open_orders),
             )
 
-    def get_stats(self) -> PortfolioStats:
-        """Calculate portfolio performance statistics."""
+    def get_order(self, order_id: str) -> Optional[Order]:
+        """Get a single order by id (None if unknown)."""
+        with self._lock:
+            self._expire_orders()
+            return self.orders.get(order_id)
+
+    def get_value_history(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        resolution: str = "raw",
+    ) -> tuple[list[datetime], list[float]]:
+        """
+        Recorded portfolio values in [start, end) at a given resolution.
+
+        Raises:
+            ValueError: If the resolution is unknown
+        """
+        with self._lock:
+            return self.value_history.query(start, end, resolution)
+
+    def get_trades(
+        self,
+        symbol: Optional[str] = None,
+        action: Optional[TradeAction] = None,
+        exit_reason: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = False,
+    ) -> TradeHistory:
+        """
+        Get trade history, optionally filtered and one page at a time.
+
+        See TradeIndex.query for the arguments. Pass the returned
+        next_cursor back as `cursor` to get the following page.
+
+        Raises:
+            ValueError: If the cursor does not refer to a recorded trade
+        """
         with self._lock:
-            sell_trades = [t for t in self.trades if t.action == TradeAction.SELL]
-
-            if not sell_trades:
-                return PortfolioStats(
-                    total_trades=len(self.trades),
-                    winning_trades=0,
-                    losing_trades=0,
-                    win_rate=0.0,
-                    average_win=0.0,
-                    average_loss=0.0,
-                    largest_win=0.0,
-                    largest_loss=0.0,
-                    max_drawdown=0.0,
-                    max_drawdown_percent=0.0,
+            try:
+                trades, next_cursor = self._trade_index.query(
+                    symbol=symbol,
+                    action=action,
+                    exit_reason=exit_reason,
+                    start=start,
+                    end=end,
+                    after=cursor,
+                    limit=limit,
+                    newest_first=newest_first,
                 )
+            except KeyError:
+                raise ValueError(f"Invalid cursor: {cursor}") from None
+            return TradeHistory(
+                trades=trades,
+                total_trades=len(self._trade_index),
+                next_cursor=next_cursor,
+            )
 
-            winners = [t for t in sell_trades if t.pnl and t.pnl > 0]
-            losers = [t for t in sell_trades if t.pnl and t.pnl < 0]
+    def get_trade(self, trade_id: str) -> Optional[Trade]:
+        """Get a single trade by id (None if unknown)."""
+        with self._lock:
+            return self._trade_index.get(trade_id)
 
-            win_rate = len(winners) / len(sell_trades) * 100 if sell_trades else 0
+    def get_stats(self, verify: bool = False) -> PortfolioStats:
+        """
+        Get portfolio performance statistics.
 
-            avg_win = sum(t.pnl for t in winners) / len(winners) if winners else 0
-            avg_loss = sum(t.pnl for t in losers) / len(losers) if losers else 0
+        Read from running aggregates in O(1). With verify=True the stats
+        are also recomputed from the full trade and value history; any
+        difference is logged and the recomputed stats are returned.
+        """
+        with self._lock:
+            stats = self._running_stats()
+            if not verify:
+                return stats
+
+            recomputed = self._recompute_stats()
+
+        mismatched = [
+            field for field, value in recomputed.model_dump().items()
+            if value != getattr(stats, field)
+        ]
+        if mismatched:
+            logger.warning(
+                f"Running stats for account {self.account_id} differ from a full recompute: "
+                + ", ".join(f"{f}={getattr(stats, f)!r} vs {getattr(recomputed, f)!r}" for f in mismatched)
+            )
+        return recomputed
 
-            largest_win = max((t.pnl for t in winners), default=0)
-            largest_loss = min((t.pnl for t in losers), default=0)
+    def _running_stats(self) -> PortfolioStats:
+        """Stats from the running aggregates (caller holds the lock)."""
+        metrics = self._value_metrics.metrics()
+        metrics.pop("exposure_percent")
 
-            # Calculate max drawdown from value history
-            max_drawdown = 0.0
-            max_drawdown_pct = 0.0
-            peak = PAPER_TRADING_CONFIG["initial_balance"]
+        trade_stats = self._trade_stats
+        if not trade_stats.sell_trades:
+            return PortfolioStats(
+                total_trades=trade_stats.total_trades,
+                winning_trades=0,
+                losing_trades=0,
+                win_rate=0.0,
+                average_win=0.0,
+                average_loss=0.0,
+                largest_win=0.0,
+                largest_loss=0.0,
+                **metrics,
+            )
 
-            for _, value in self.value_history:
-                if value > peak:
-                    peak = value
-                drawdown = peak - value
-                drawdown_pct = (drawdown / peak) * 100 if peak > 0 else 0
-                if drawdown > max_drawdown:
-                    max_drawdown = drawdown
-                    max_drawdown_pct = drawdown_pct
+        win_rate = trade_stats.winning_trades / trade_stats.sell_trades * 100
+        avg_win = trade_stats.total_wins / trade_stats.winning_trades if trade_stats.winning_trades else 0
+        avg_loss = trade_stats.total_losses / trade_stats.losing_trades if trade_stats.losing_trades else 0
+
+        return PortfolioStats(
+            total_trades=trade_stats.total_trades,
+            winning_trades=trade_stats.winning_trades,
+            losing_trades=trade_stats.losing_trades,
+            win_rate=round(win_rate, 1),
+            average_win=round(avg_win, 2),
+            average_loss=round(avg_loss, 2),
+            largest_win=round(trade_stats.largest_win, 2),
+            largest_loss=round(trade_stats.largest_loss, 2),
+            **metrics,
+        )
+
+    def _recompute_stats(self) -> PortfolioStats:
+        """
+        Stats from a full pass over trades and value history (caller holds the lock).
 
+        Once older value points have been rolled up, the risk metrics are
+        recomputed from the retained (thinner) history and can differ
+        slightly from the running ones.
+        """
+        # Drawdown and risk metrics from value history (one vectorized pass)
+        timestamps, values = self.value_history.query()
+        metrics = compute_metrics(
+            values,
+            timestamps=timestamps,
+            initial_capital=PAPER_TRADING_CONFIG["initial_balance"],
+            traded_value=sum(t.total_value for t in self.trades),
+        )
+        metrics.pop("exposure_percent")
+
+        sell_trades = [t for t in self.trades if t.action == TradeAction.SELL]
+
+        if not sell_trades:
             return PortfolioStats(
                 total_trades=len(self.trades),
-                winning_trades=len(winners),
-                losing_trades=len(losers),
-                win_rate=round(win_rate, 1),
-                average_win=round(avg_win, 2),
-                average_loss=round(avg_loss, 2),
-                largest_win=round(largest_win, 2),
-                largest_loss=round(largest_loss, 2),
-                max_drawdown=round(max_drawdown, 2),
-                max_drawdown_percent=round(max_drawdown_pct, 2),
+                winning_trades=0,
+                losing_trades=0,
+                win_rate=0.0,
+                average_win=0.0,
+                average_loss=0.0,
+                largest_win=0.0,
+                largest_loss=0.0,
+                **metrics,
             )
 
-    def record_daily_value(self) -> None:
-        """Record current portfolio value for history tracking."""
+        winners = [t for t in sell_trades if t.pnl and t.pnl > 0]
+        losers = [t for t in sell_trades if t.pnl and t.pnl < 0]
+
+        win_rate = len(winners) / len(sell_trades) * 100 if sell_trades else 0
+
+        avg_win = sum(t.pnl for t in winners) / len(winners) if winners else 0
+        avg_loss = sum(t.pnl for t in losers) / len(losers) if losers else 0
+
+        largest_win = max((t.pnl for t in winners), default=0)
+        largest_loss = min((t.pnl for t in losers), default=0)
+
+        return PortfolioStats(
+            total_trades=len(self.trades),
+            winning_trades=len(winners),
+            losing_trades=len(losers),
+            win_rate=round(win_rate, 1),
+            average_win=round(avg_win, 2),
+            average_loss=round(avg_loss, 2),
+            largest_win=round(largest_win, 2),
+            largest_loss=round(largest_loss, 2),
+            **metrics,
+        )
+
+    def record_daily_value(self, prices: Optional[dict[str, float]] = None) -> None:
+        """
+        Record current portfolio value for history tracking.
+
+        Args:
+            prices: Latest prices to value stale positions with, e.g. one
+                batch fetched for many accounts (see SnapshotScheduler).
+                By default stale positions are re-priced with a lookup.
+        """
+        if prices is None:
+            self.get_portfolio()
+        else:
+            stale = self.stale_symbols()
+            if stale:
+                self._mark_stale(stale, prices)
+
         with self._lock:
-            portfolio = self.get_portfolio()
-            self.value_history.append((datetime.now(), portfolio.total_value))
+            timestamp = datetime.now()
+            total_value = self._snapshot.total_value
+            self._append_value(timestamp, total_value, live=True)
+            # Journal the time actually stored, so replay sees the same order
+            timestamp = self.value_history.last()[0]
+            self._record("value", timestamp=timestamp.isoformat(), value=total_value)
+            update = self._refresh_snapshot()
+        self._notify(update)
+
+
+class PortfolioAccounts:
+    """
+    Registry of paper trading accounts, each with its own PortfolioService.
+
+    State is sharded by account: every portfolio has its own lock, journal
+    and snapshot (under data/portfolio/<account_id>/), so accounts never
+    contend with each other. Looking up a loaded account takes no lock.
+
+    Accounts are loaded on first use. When more than max_loaded_accounts
+    are in memory, accounts that have been idle for idle_unload_seconds
+    and hold no positions or open orders are unloaded - their state stays
+    on disk and is reloaded on the next request.
+    """
+
+    def __init__(self, storage_root: Optional[Path] = None):
+        """
+        Args:
+            storage_root: Directory holding one subdirectory per account
+                (None keeps every account in memory only)
+        """
+        self._storage_root = storage_root
+        self._accounts: dict[str, PortfolioService] = {}
+        self._lock = threading.Lock()   # Only taken to load or unload accounts
+        self._listeners: list[Callable[[str, dict], None]] = []
+
+        if storage_root is not None:
+            self._migrate_single_account()
+
+    def _migrate_single_account(self) -> None:
+        """Move a pre-accounts portfolio (files directly in the root) to the default account."""
+        legacy = [path for path in self._storage_root.glob("*") if path.is_file()]
+        if not legacy:
+            return
+        target = self._storage_root / ACCOUNT_CONFIG["default_account"]
+        target.mkdir(parents=True, exist_ok=True)
+        for path in legacy:
+            shutil.move(str(path), target / path.name)
+        logger.info(f"Moved existing portfolio into account '{target.name}'")
+
+    @staticmethod
+    def validate_account_id(account_id: str) -> str:
+        """
+        Check an account id.
+
+        Raises:
+            ValueError: If it isn't 1-64 letters, digits, '_' or '-'
+        """
+        if not ACCOUNT_ID_PATTERN.fullmatch(account_id or ""):
+            raise ValueError("Account id must be 1-64 letters, digits, '_' or '-'")
+        return account_id
+
+    def get(self, account_id: str = ACCOUNT_CONFIG["default_account"]) -> PortfolioService:
+        """
+        Get an account's portfolio, loading (or creating) it if needed.
+
+        Raises:
+            ValueError: If the account id is invalid
+        """
+        account = self._accounts.get(account_id)
+        if account is None:
+            account = self._load(self.validate_account_id(account_id))
+        account.last_used = time.monotonic()
+        return account
+
+    def _load(self, account_id: str) -> PortfolioService:
+        with self._lock:
+            account = self._accounts.get(account_id)
+            if account is not None:
+                return account
+
+            storage_dir = self._storage_root / account_id if self._storage_root is not None else None
+            account = PortfolioService(storage_dir=storage_dir, account_id=account_id)
+            account.add_listener(lambda update, account_id=account_id: self._forward(account_id, update))
+            self._accounts[account_id] = account
+
+            if len(self._accounts) > ACCOUNT_CONFIG["max_loaded_accounts"]:
+                self._unload_idle()
+            return account
+
+    def _unload_idle(self) -> None:
+        """Unload idle accounts without positions or open orders (caller holds the lock)."""
+        cutoff = time.monotonic() - ACCOUNT_CONFIG["idle_unload_seconds"]
+        idle = sorted(
+            (account for account in self._accounts.values()
+             if account.last_used < cutoff and not account.positions and not account.open_orders),
+            key=lambda account: account.last_used,
+        )
+        excess = len(self._accounts) - ACCOUNT_CONFIG["max_loaded_accounts"]
+        for account in idle[:excess]:
+            account.flush()
+            del self._accounts[account.account_id]
+
+    def load_persisted(self) -> int:
+        """
+        Load every account saved on disk, so open positions are revalued
+        and stop-protected right after startup.
+
+        Returns:
+            Number of accounts loaded
+        """
+        if self._storage_root is None or not self._storage_root.exists():
+            return 0
+
+        loaded = 0
+        for path in sorted(self._storage_root.iterdir()):
+            if path.is_dir() and ACCOUNT_ID_PATTERN.fullmatch(path.name):
+                self.get(path.name)
+                loaded += 1
+        return loaded
+
+    def loaded(self) -> list[PortfolioService]:
+        """Accounts currently in memory."""
+        return list(self._accounts.values())
+
+    def open_symbols(self) -> set[str]:
+        """Symbols held, or with open orders, in any loaded account."""
+        symbols = set()
+        for account in self.loaded():
+            symbols.update(list(account.positions))
+            symbols.update(order.symbol for order in list(account.open_orders.values()))
+        return symbols
+
+    def on_price(self, symbol: str, price: float) -> None:
+        """Revalue every account holding `symbol` at a new tick."""
+        for account in stop_engine.holders(symbol):
+            account.on_price(symbol, price)
+
+    def add_listener(self, callback: Callable[[str, dict], None]) -> None:
+        """Call `callback(account_id, update)` on any account's valuation change."""
+        self._listeners.append(callback)
+
+    def _forward(self, account_id: str, update: dict) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(account_id, update)
+            except Exception as e:
+                logger.error(f"Portfolio listener error: {e}")
+
+    def flush(self) -> None:
+        """Flush every loaded account's journal (e.g. at shutdown)."""
+        for account in self.loaded():
+            account.flush()
 
 
 # Singleton instance
-portfolio_service = PortfolioService()
+portfolio_accounts = PortfolioAccounts(
+    storage_root=PORTFOLIO_DIR if STORAGE_CONFIG["persist_portfolio"] else None
+)
@@ -0,0 +1,251 @@
+"""
+Cumulative return indexes for benchmark lookups.
+
+Educational Note:
+Log returns add up over time: log(P2/P0) = log(P1/P0) + log(P2/P1).
+So if we store the running sum of daily log returns once, the return over
+ANY window is just the difference of two entries:
+
+    return(i, j) = exp(index[j] - index[i]) - 1
+
+That turns "how did SPY do over the last 3 months / since January / over
+5 years?" into a lookup instead of a download and a recalculation.
+
+Each symbol's index is built once from a long history and then extended
+with only the new bars as they arrive.
+"""
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional, Union
+
+from ..config import BENCHMARK_CONFIG
+from .data_service import data_service
+
+logger = logging.getLogger(__name__)
+
+# Standard horizons in calendar days ("YTD" starts on January 1st)
+HORIZONS = {
+    "1M": 30,
+    "3M": 91,
+    "6M": 182,
+    "YTD": None,
+    "1Y": 365,
+    "3Y": 1095,
+    "5Y": 1825,
+}
+
+DateLike = Union[date, datetime, str]
+
+
+@dataclass
+class WindowReturn:
+    """Buy-and-hold return between two bars of an index."""
+    start_date: datetime
+    end_date: datetime
+    start_price: float
+    end_price: float
+    return_percent: float
+    bars: int
+
+
+def _to_datetime64(value: DateLike) -> np.datetime64:
+    """Convert a date, datetime or ISO string to a naive datetime64."""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_localize(None)
+    return np.datetime64(timestamp.normalize().to_datetime64(), "ns")
+
+
+def _bar_dates(df: pd.DataFrame) -> np.ndarray:
+    """Daily bar dates as naive datetime64 values (exchange local date)."""
+    index = df.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize().to_numpy(dtype="datetime64[ns]")
+
+
+class ReturnIndex:
+    """
+    Closing prices and the cumulative log-return index of one symbol.
+
+    log_index[i] is the sum of daily log returns up to bar i (0 on the
+    first bar), so any window return costs two array reads.
+    """
+
+    def __init__(self, symbol: str, df: pd.DataFrame):
+        self.symbol = symbol
+        self._lock = threading.Lock()
+        self._load(df)
+
+        if len(self.closes) == 0:
+            raise ValueError(f"No data found for symbol: {symbol}")
+
+    def _load(self, df: pd.DataFrame) -> None:
+        """Build the index from a full price history."""
+        closes = df["Close"].to_numpy(dtype=float)
+        valid = np.isfinite(closes) & (closes > 0)
+
+        self.dates = _bar_dates(df)[valid]
+        self.closes = closes[valid]
+        self.log_index = np.concatenate(([0.0], np.cumsum(np.diff(np.log(self.closes)))))
+        self.updated_at = datetime.now()
+
+    @property
+    def last_date(self) -> datetime:
+        return pd.Timestamp(self.dates[-1]).to_pydatetime()
+
+    def extend(self, df: pd.DataFrame) -> int:
+        """
+        Append bars newer than the index's history.
+
+        The last stored bar is replaced if it appears again (today's bar
+        keeps changing until the close). Only the new tail is recomputed.
+
+        Returns:
+            Number of bars appended or replaced
+        """
+        dates = _bar_dates(df)
+        closes = df["Close"].to_numpy(dtype=float)
+
+        with self._lock:
+            self.updated_at = datetime.now()
+            fresh = (dates >= self.dates[-1]) & np.isfinite(closes) & (closes > 0)
+            if not fresh.any():
+                return 0
+
+            dates, closes = dates[fresh], closes[fresh]
+            keep = int(np.searchsorted(self.dates, dates[0], side="left"))
+            if keep == 0:
+                # Nothing to anchor the new bars to; rebuild from scratch
+                self._load(df)
+                return len(self.closes)
+
+            base_close = self.closes[keep - 1]
+            base_log = self.log_index[keep - 1]
+            tail = base_log + np.cumsum(np.diff(np.log(np.concatenate(([base_close], closes)))))
+
+            self.dates = np.concatenate((self.dates[:keep], dates))
+            self.closes = np.concatenate((self.closes[:keep], closes))
+            self.log_index = np.concatenate((self.log_index[:keep], tail))
+            return len(closes)
+
+    def window_return(
+        self,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> WindowReturn:
+        """
+        Buy-and-hold return from the first bar on or after `start` to the
+        last bar on or before `end`.
+
+        Args:
+            start: Window start (default: first bar)
+            end: Window end (default: latest bar)
+
+        Raises:
+            ValueError: If the window contains fewer than two bars
+        """
+        with self._lock:
+            dates, closes, log_index = self.dates, self.closes, self.log_index
+
+        i = 0 if start is None else int(np.searchsorted(dates, _to_datetime64(start), side="left"))
+        j = len(dates) - 1 if end is None else int(np.searchsorted(dates, _to_datetime64(end), side="right")) - 1
+
+        if i >= len(dates) or j <= i:
+            raise ValueError(f"Not enough {self.symbol} data in the requested window")
+
+        return WindowReturn(
+            start_date=pd.Timestamp(dates[i]).to_pydatetime(),
+            end_date=pd.Timestamp(dates[j]).to_pydatetime(),
+            start_price=float(closes[i]),
+            end_price=float(closes[j]),
+            return_percent=float(np.expm1(log_index[j] - log_index[i]) * 100),
+            bars=j - i + 1,
+        )
+
+    def trailing_return(self, days: int) -> WindowReturn:
+        """Return over the last `days` calendar days up to the latest bar."""
+        return self.window_return(start=self.dates[-1] - np.timedelta64(days, "D"))
+
+    def horizon_return(self, horizon: str) -> Optional[WindowReturn]:
+        """
+        Return over a standard horizon (see HORIZONS).
+
+        Returns:
+            The window return, or None if the index doesn't reach back far
+            enough to cover the horizon
+
+        Raises:
+            ValueError: If the horizon is unknown
+        """
+        if horizon not in HORIZONS:
+            raise ValueError(f"Unknown horizon '{horizon}'. Available: {', '.join(HORIZONS)}")
+
+        last = pd.Timestamp(self.dates[-1])
+        if HORIZONS[horizon] is None:
+            start = np.datetime64(pd.Timestamp(year=last.year, month=1, day=1).to_datetime64(), "ns")
+        else:
+            start = self.dates[-1] - np.timedelta64(HORIZONS[horizon], "D")
+
+        # The first bar must be within a few days of the requested start
+        # (weekends/holidays), otherwise the history is too short
+        if self.dates[0] > start + np.timedelta64(7, "D"):
+            return None
+        try:
+            return self.window_return(start=start)
+        except ValueError:
+            return None
+
+
+class ReturnIndexService:
+    """
+    Keeps one ReturnIndex per symbol, built on first use.
+
+    Indexes are refreshed at most every `refresh_minutes`, fetching only
+    the days since their last bar. The least recently used indexes are
+    dropped beyond `max_indexed_symbols`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: OrderedDict[str, ReturnIndex] = OrderedDict()
+        self._refresh_interval = timedelta(minutes=BENCHMARK_CONFIG["refresh_minutes"])
+
+    def get_index(self, symbol: str) -> ReturnIndex:
+        """
+        Get the (fresh) return index for a symbol.
+
+        Raises:
+            ValueError: If no data is found for the symbol
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            index = self._indexes.get(symbol)
+            if index is not None:
+                self._indexes.move_to_end(symbol)
+
+        if index is None:
+            df = data_service.get_stock_data(symbol, days=BENCHMARK_CONFIG["history_days"])
+            index = ReturnIndex(symbol, df)
+            with self._lock:
+                self._indexes[symbol] = index
+                while len(self._indexes) > BENCHMARK_CONFIG["max_indexed_symbols"]:
+                    self._indexes.popitem(last=False)
+        elif datetime.now() - index.updated_at >= self._refresh_interval:
+            days = (datetime.now() - index.last_date).days + 5
+            try:
+                index.extend(data_service.get_stock_data(symbol, days=days))
+            except Exception as e:
+                # Serve the existing index rather than failing the lookup
+                logger.warning(f"Could not extend return index for {symbol}: {e}")
+
+        return index
+
+
+# Singleton instance
+return_index_service = ReturnIndexService()
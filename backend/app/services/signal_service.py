@@ -8,75 +8,62 @@ Educational Note:
 These signals work best in trending markets and struggle in sideways markets.
 """
 import logging
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from typing import Optional
 
-from ..config import STRATEGY_CONFIG
+from ..core.strategy import Strategy, strategy as default_strategy
 from ..models.signal import Signal, SignalType, SignalSummary
 from .data_service import data_service
-from .indicator_service import add_indicators
 from .watchlist_service import watchlist_service
 
 logger = logging.getLogger(__name__)
 
+# A crossover older than this many bars no longer triggers a trade
+MAX_SIGNAL_AGE_BARS = 3
 
-def detect_crossover(df: pd.DataFrame) -> tuple[SignalType, Optional[int]]:
+
+def detect_crossover(
+    df: pd.DataFrame,
+    strategy: Optional[Strategy] = None,
+) -> tuple[SignalType, Optional[int]]:
     """
     Detect the current signal state and days since last signal.
 
+    Uses the strategy's entry/exit events (golden/death cross for the
+    default MA crossover strategy), evaluated over all bars at once.
+
     Returns:
         (signal_type, days_since_signal)
         - signal_type: GOLDEN_CROSS, DEATH_CROSS, or NONE
         - days_since_signal: Days since the crossover occurred (None if no recent signal)
     """
-    short_period = STRATEGY_CONFIG["short_ma_period"]
-    long_period = STRATEGY_CONFIG["long_ma_period"]
-
-    # Ensure indicators are present
-    if f"SMA_{short_period}" not in df.columns:
-        df = add_indicators(df)
+    if strategy is None:
+        strategy = default_strategy
 
-    sma_short = df[f"SMA_{short_period}"]
-    sma_long = df[f"SMA_{long_period}"]
-
-    # Need at least long_period + 1 data points
-    if len(df) < long_period + 1:
+    # Need enough data for the indicators to warm up
+    if len(df) < strategy.warmup_bars + 1:
         return SignalType.NONE, None
 
+    df = strategy.with_indicators(df)
+    ready = strategy.ready(df).to_numpy(dtype=bool)
+    bullish = strategy.entry_events(df).to_numpy(dtype=bool) & ready
+    bearish = strategy.exit_events(df).to_numpy(dtype=bool) & ready
+
     # Find most recent crossover
-    for i in range(len(df) - 1, 0, -1):
-        curr_short = sma_short.iloc[i]
-        curr_long = sma_long.iloc[i]
-        prev_short = sma_short.iloc[i - 1]
-        prev_long = sma_long.iloc[i - 1]
-
-        # Skip if any values are NaN
-        if pd.isna(curr_short) or pd.isna(curr_long) or pd.isna(prev_short) or pd.isna(prev_long):
-            continue
-
-        # Golden Cross: short crosses above long
-        if prev_short <= prev_long and curr_short > curr_long:
-            days_since = len(df) - 1 - i
-            return SignalType.GOLDEN_CROSS, days_since
-
-        # Death Cross: short crosses below long
-        if prev_short >= prev_long and curr_short < curr_long:
-            days_since = len(df) - 1 - i
-            return SignalType.DEATH_CROSS, days_since
-
-    # No crossover found, determine current state
-    curr_short = sma_short.iloc[-1]
-    curr_long = sma_long.iloc[-1]
-
-    if pd.isna(curr_short) or pd.isna(curr_long):
+    events = np.flatnonzero(bullish | bearish)
+    if len(events) == 0:
         return SignalType.NONE, None
 
-    # Return the current trend state (but not as a new signal)
-    return SignalType.NONE, None
+    last = events[-1]
+    days_since = len(df) - 1 - last
+    if bullish[last]:
+        return SignalType.GOLDEN_CROSS, days_since
+    return SignalType.DEATH_CROSS, days_since
 
 
-def is_buy_signal(df: pd.DataFrame) -> bool:
+def is_buy_signal(df: pd.DataFrame, strategy: Optional[Strategy] = None) -> bool:
     """
     Check if current conditions warrant a buy signal.
 
@@ -84,47 +71,39 @@ def is_buy_signal(df: pd.DataFrame) -> bool:
     1. Golden cross occurred (10-day crossed above 50-day)
     2. Current price is above the 50-day MA
     """
-    short_period = STRATEGY_CONFIG["short_ma_period"]
-    long_period = STRATEGY_CONFIG["long_ma_period"]
-
-    if f"SMA_{short_period}" not in df.columns:
-        df = add_indicators(df)
+    if strategy is None:
+        strategy = default_strategy
 
-    signal_type, days_since = detect_crossover(df)
+    df = strategy.with_indicators(df)
+    signal_type, days_since = detect_crossover(df, strategy)
 
     # Must be a golden cross
     if signal_type != SignalType.GOLDEN_CROSS:
         return False
 
     # Signal should be recent (within last 3 days)
-    if days_since is not None and days_since > 3:
-        return False
-
-    # Price must be above 50-day MA
-    current_price = df["Close"].iloc[-1]
-    sma_long = df[f"SMA_{long_period}"].iloc[-1]
-
-    if pd.isna(sma_long):
+    if days_since is not None and days_since > MAX_SIGNAL_AGE_BARS:
         return False
 
-    return current_price > sma_long
+    # Entry filter must still hold (price above 50-day MA)
+    return bool(strategy.entry_filter(df).iloc[-1])
 
 
-def is_sell_signal(df: pd.DataFrame) -> bool:
+def is_sell_signal(df: pd.DataFrame, strategy: Optional[Strategy] = None) -> bool:
     """
     Check if current conditions warrant a sell signal.
 
     Sell condition:
     - Death cross occurred (10-day crossed below 50-day)
     """
-    signal_type, days_since = detect_crossover(df)
+    signal_type, days_since = detect_crossover(df, strategy)
 
     # Must be a death cross
     if signal_type != SignalType.DEATH_CROSS:
         return False
 
     # Signal should be recent (within last 3 days)
-    if days_since is not None and days_since > 3:
+    if days_since is not None and days_since > MAX_SIGNAL_AGE_BARS:
         return False
 
     return True
@@ -133,16 +112,13 @@ def is_sell_signal(df: pd.DataFrame) -> bool:
 def get_signal_for_stock(symbol: str) -> Signal:
     """Get the current signal status for a stock."""
     df = data_service.get_stock_data(symbol)
-    df = add_indicators(df)
-
-    short_period = STRATEGY_CONFIG["short_ma_period"]
-    long_period = STRATEGY_CONFIG["long_ma_period"]
+    df = default_strategy.add_indicators(df)
 
     signal_type, days_since = detect_crossover(df)
 
     current_price = float(df["Close"].iloc[-1])
-    sma_short = df[f"SMA_{short_period}"].iloc[-1]
-    sma_long = df[f"SMA_{long_period}"].iloc[-1]
+    sma_short = df[default_strategy.short_column].iloc[-1]
+    sma_long = df[default_strategy.long_column].iloc[-1]
 
     return Signal(
         symbol=symbol,
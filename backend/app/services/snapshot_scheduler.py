@@ -0,0 +1,179 @@
+"""
+Scheduled portfolio value snapshots.
+
+Value history (and with it drawdown, Sharpe and the other stats) only
+grows when someone records the portfolio's value. The scheduler does that
+for every loaded account on a fixed cadence during market hours:
+
+    09:30  09:45  10:00  ...  15:45  16:00        (every 15 minutes)
+    ^ session open                   ^ session close
+
+Prices come from the ticks already applied to each portfolio; positions
+without a recent tick are priced in ONE batched lookup for all accounts
+(served from the data cache when possible), never one request per account.
+The work runs in a worker thread so the event loop keeps serving requests,
+and each run reports how long it took and how late it started.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from ..config import SNAPSHOT_CONFIG
+from ..core.market_hours import MARKET_TIMEZONE, market_now, session_bounds
+from .data_service import data_service
+from .portfolio_service import portfolio_accounts
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotScheduler:
+    """
+    Records portfolio value snapshots on a cadence aligned to market sessions.
+
+    Sessions are the regular market sessions (see core.market_hours;
+    exchange holidays are not skipped, so a holiday snapshot just repeats
+    the previous close). With session_only disabled snapshots are taken
+    around the clock, aligned to the interval.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._interval = timedelta(minutes=SNAPSHOT_CONFIG["interval_minutes"])
+
+        # Timing of recent runs, for get_status()
+        self.runs = 0
+        self.errors = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_accounts = 0
+        self.last_fetched_symbols = 0
+        self.last_duration_ms: Optional[float] = None
+        self.max_duration_ms = 0.0
+        self.last_start_delay_ms: Optional[float] = None
+        self.next_run_at: Optional[datetime] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def next_run(self, now: Optional[datetime] = None) -> datetime:
+        """The first snapshot time strictly after `now` (timezone-aware)."""
+        now = (now or market_now()).astimezone(MARKET_TIMEZONE)
+
+        if not SNAPSHOT_CONFIG["session_only"]:
+            midnight = datetime.combine(now.date(), datetime.min.time(), tzinfo=MARKET_TIMEZONE)
+            steps = (now - midnight) // self._interval + 1
+            return midnight + steps * self._interval
+
+        for days_ahead in range(8):
+            bounds = session_bounds(now.date() + timedelta(days=days_ahead))
+            if bounds is None:
+                continue
+            session_open, session_close = bounds
+            if now < session_open:
+                return session_open
+            if now < session_close:
+                steps = (now - session_open) // self._interval + 1
+                return min(session_open + steps * self._interval, session_close)
+
+        raise RuntimeError("No market session within a week")  # Unreachable with weekdays
+
+    def start(self) -> None:
+        """Start the scheduling loop on the running event loop."""
+        if not SNAPSHOT_CONFIG["enabled"] or self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the scheduling loop."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            scheduled = self.next_run()
+            self.next_run_at = scheduled
+            await asyncio.sleep(max((scheduled - market_now()).total_seconds(), 0))
+
+            # How late the loop woke us up - a busy event loop shows here first
+            delay = market_now() - scheduled
+            self.last_start_delay_ms = round(delay.total_seconds() * 1000, 1)
+            await self.snapshot_now()
+
+    async def snapshot_now(self) -> int:
+        """
+        Record a value snapshot for every loaded account.
+
+        Returns:
+            Number of accounts recorded
+        """
+        started = time.perf_counter()
+        try:
+            recorded = await asyncio.to_thread(self._record_all)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Portfolio snapshot failed: {e}")
+            return 0
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        self.runs += 1
+        self.last_run_at = datetime.now()
+        self.last_accounts = recorded
+        self.last_duration_ms = round(duration_ms, 1)
+        self.max_duration_ms = max(self.max_duration_ms, self.last_duration_ms)
+        if duration_ms > SNAPSHOT_CONFIG["slow_snapshot_ms"]:
+            logger.warning(f"Portfolio snapshot of {recorded} account(s) took {duration_ms:.0f} ms")
+        return recorded
+
+    def _record_all(self) -> int:
+        """Price stale positions in one batch, then record every account (worker thread)."""
+        accounts = portfolio_accounts.loaded()
+
+        stale = sorted({symbol for account in accounts for symbol in account.stale_symbols()})
+        prices = {}
+        if stale:
+            try:
+                prices = {
+                    symbol: latest["price"]
+                    for symbol, latest in data_service.get_latest_prices(stale).items()
+                }
+            except Exception as e:
+                # Value at the last marks rather than skipping the snapshot
+                logger.warning(f"Could not price {len(stale)} symbol(s) for the snapshot: {e}")
+        self.last_fetched_symbols = len(stale)
+
+        for account in accounts:
+            try:
+                account.record_daily_value(prices=prices)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error recording value for account {account.account_id}: {e}")
+        return len(accounts)
+
+    def get_status(self) -> dict:
+        """Schedule and timing of recent runs, for monitoring."""
+        return {
+            "running": self.running,
+            "interval_minutes": SNAPSHOT_CONFIG["interval_minutes"],
+            "session_only": SNAPSHOT_CONFIG["session_only"],
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "runs": self.runs,
+            "errors": self.errors,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_accounts": self.last_accounts,
+            "last_fetched_symbols": self.last_fetched_symbols,
+            "last_duration_ms": self.last_duration_ms,
+            "max_duration_ms": self.max_duration_ms,
+            "last_start_delay_ms": self.last_start_delay_ms,
+        }
+
+
+# Singleton instance
+snapshot_scheduler = SnapshotScheduler()
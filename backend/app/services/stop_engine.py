@@ -0,0 +1,138 @@
+"""
+Tick-driven stop-loss engine.
+
+Educational Note:
+A stop only helps if it is checked when the price actually crosses it.
+Instead of polling every position for a fresh quote, the engine keeps,
+for every symbol, the active stop levels of all open positions in sorted
+order. When a tick arrives it only looks at that symbol, and a binary
+search finds exactly the positions whose stop is above the new price:
+
+    levels:  [88.2, 91.0, 93.0, 97.5]     tick: 92.4
+                          ^ everything from here on is triggered
+
+So a tick costs O(log n) plus the positions it actually triggers, no
+matter how many accounts and positions are being watched.
+"""
+import bisect
+import logging
+import threading
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class StopOwner(Protocol):
+    """Anything holding positions the engine can stop out (a portfolio)."""
+
+    def sell_if_stopped(self, symbol: str, price: float): ...
+
+
+class StopEngine:
+    """
+    Per-symbol index of active stop levels, evaluated on price ticks.
+
+    Portfolios keep the index current by calling update() whenever a
+    position's active stop changes and remove() when it closes. Triggered
+    positions are sold through the owning portfolio, which re-checks the
+    stop under its own lock before selling.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index: dict[str, list[tuple[float, int]]] = {}    # symbol -> sorted (level, owner id)
+        self._levels: dict[tuple[int, str], float] = {}          # (owner id, symbol) -> level
+        self._owners: dict[int, StopOwner] = {}
+        self._positions_per_owner: dict[int, int] = {}
+        self.triggered_count = 0
+
+    def update(self, owner: StopOwner, symbol: str, level: float) -> None:
+        """Set (or move) the active stop of an owner's position."""
+        owner_id = id(owner)
+        with self._lock:
+            previous = self._levels.get((owner_id, symbol))
+            if previous == level:
+                return
+
+            levels = self._index.setdefault(symbol, [])
+            if previous is not None:
+                self._discard(levels, (previous, owner_id))
+            else:
+                self._owners[owner_id] = owner
+                self._positions_per_owner[owner_id] = self._positions_per_owner.get(owner_id, 0) + 1
+
+            bisect.insort(levels, (level, owner_id))
+            self._levels[(owner_id, symbol)] = level
+
+    def remove(self, owner: StopOwner, symbol: str) -> None:
+        """Stop watching an owner's position (closed or reset)."""
+        owner_id = id(owner)
+        with self._lock:
+            level = self._levels.pop((owner_id, symbol), None)
+            if level is None:
+                return
+
+            levels = self._index[symbol]
+            self._discard(levels, (level, owner_id))
+            if not levels:
+                del self._index[symbol]
+
+            self._positions_per_owner[owner_id] -= 1
+            if self._positions_per_owner[owner_id] == 0:
+                del self._positions_per_owner[owner_id]
+                del self._owners[owner_id]
+
+    @staticmethod
+    def _discard(levels: list[tuple[float, int]], entry: tuple[float, int]) -> None:
+        """Remove an entry from a sorted level list."""
+        i = bisect.bisect_left(levels, entry)
+        if i < len(levels) and levels[i] == entry:
+            del levels[i]
+
+    def holders(self, symbol: str) -> list[StopOwner]:
+        """Owners with an open (stop-protected) position in `symbol`."""
+        with self._lock:
+            return [self._owners[owner_id] for _, owner_id in self._index.get(symbol, ())]
+
+    def triggered(self, symbol: str, price: float) -> list[StopOwner]:
+        """Owners whose stop on `symbol` is above `price`."""
+        with self._lock:
+            levels = self._index.get(symbol)
+            if not levels or price >= levels[-1][0]:
+                return []
+            # A stop fires when price < level (see StopLossManager.is_stopped_out)
+            start = bisect.bisect_right(levels, (price, float("inf")))
+            return [self._owners[owner_id] for _, owner_id in levels[start:]]
+
+    def on_tick(self, symbol: str, price: float) -> list:
+        """
+        Evaluate a price tick and sell every position it stops out.
+
+        Returns:
+            The executed sell trades
+        """
+        trades = []
+        for owner in self.triggered(symbol, price):
+            try:
+                trade = owner.sell_if_stopped(symbol, price)
+            except Exception as e:
+                logger.error(f"Error executing stop for {symbol}: {e}")
+                continue
+            if trade is not None:
+                trades.append(trade)
+                self.triggered_count += 1
+                logger.info(f"Stop triggered: sold {symbol} at {price} ({trade.exit_reason})")
+        return trades
+
+    def get_status(self) -> dict:
+        """Index size and trigger count, for monitoring."""
+        with self._lock:
+            return {
+                "symbols": len(self._index),
+                "positions": len(self._levels),
+                "triggered": self.triggered_count,
+            }
+
+
+# Singleton instance
+stop_engine = StopEngine()
@@ -0,0 +1,338 @@
+"""
+Durable local storage helpers.
+
+Building blocks for keeping state across restarts:
+- atomic_write_json: replace a JSON file so readers only ever see the old
+  or the new version, never a half-written one
+- DebouncedWriter: keep a small JSON file in sync with in-memory state,
+  writing a burst of changes once, in the background
+- Journal: an append-only log of JSON records, written and fsync'd in
+  batches by a background thread so callers never wait on the disk
+
+A service that journals every change and periodically writes a compact
+snapshot can rebuild its state on startup by loading the snapshot and
+replaying only the records written after it.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from ..config import STORAGE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Local data directory (shared with the watchlist file)
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Make a rename or new file in `directory` durable (POSIX only)."""
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_json(path: Path, data) -> None:
+    """
+    Write JSON to `path` atomically.
+
+    The data is written to a temporary file in the same directory,
+    fsync'd, then renamed over the target.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(path.parent)
+
+
+def read_json(path: Path) -> Optional[dict]:
+    """Read a JSON file, returning None if it does not exist."""
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+class DebouncedWriter:
+    """
+    Saves a JSON file in the background, coalescing bursts of changes.
+
+    schedule() only records how to build the current data; the file is
+    written atomically `delay_seconds` after the first change of a burst,
+    with whatever the data is by then. Callers never wait on the disk.
+    """
+
+    def __init__(self, path: Path, delay_seconds: float):
+        self.path = Path(path)
+        self._delay = delay_seconds
+        self._lock = threading.Lock()       # Guards the pending write
+        self._io_lock = threading.Lock()    # Serializes writes to disk
+        self._build_data: Optional[Callable[[], object]] = None
+        self._timer: Optional[threading.Timer] = None
+        self.writes = 0
+
+    def schedule(self, build_data: Callable[[], object]) -> None:
+        """
+        Queue a write of `build_data()`.
+
+        build_data runs on the writer thread, so it must take its own
+        consistent copy of the state.
+        """
+        with self._lock:
+            self._build_data = build_data
+            if self._timer is None:
+                self._timer = threading.Timer(self._delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Write the pending change now, if any (blocks until done)."""
+        with self._io_lock:
+            with self._lock:
+                build_data, self._build_data = self._build_data, None
+                timer, self._timer = self._timer, None
+            if timer is not None:
+                timer.cancel()   # No-op when called by the timer itself
+            if build_data is None:
+                return
+            try:
+                atomic_write_json(self.path, build_data())
+                self.writes += 1
+            except Exception as e:
+                logger.error(f"Error saving {self.path.name}: {e}")
+
+
+class _Rotate:
+    """Queue marker: start a new journal segment."""
+
+    def __init__(self, first_seq: int):
+        self.first_seq = first_seq
+
+
+class _Checkpoint:
+    """Queue marker: write a snapshot, then drop the segments it covers."""
+
+    def __init__(self, seq: int, build_state: Callable[[], dict]):
+        self.seq = seq
+        self.build_state = build_state
+
+
+class Journal:
+    """
+    Append-only journal of JSON records, stored as numbered segment files.
+
+    Every record must carry an increasing integer "seq". Segments are named
+    after the first seq they hold (journal-000000000001.jsonl, ...).
+    checkpoint() starts a new segment and, once the snapshot is on disk,
+    deletes the segments before it - so replay cost stays bounded no matter
+    how long the history grows.
+
+    append() and checkpoint() only queue work; the shared flusher thread
+    writes, fsyncs and snapshots in order shortly afterwards.
+    """
+
+    SNAPSHOT_NAME = "snapshot.json"
+
+    def __init__(self, directory: Path, name: str = "journal"):
+        self.directory = Path(directory)
+        self.name = name
+        self.snapshot_path = self.directory / self.SNAPSHOT_NAME
+        self._lock = threading.Lock()      # Guards the pending queue
+        self._io_lock = threading.Lock()   # Serializes writes to disk
+        self._pending: list = []
+        self._file = None
+
+    # --- Reading -------------------------------------------------------
+
+    def _segment_path(self, first_seq: int) -> Path:
+        return self.directory / f"{self.name}-{first_seq:012d}.jsonl"
+
+    def _segments(self) -> list[tuple[int, Path]]:
+        """Existing segments as (first_seq, path), oldest first."""
+        segments = []
+        if not self.directory.exists():
+            return segments
+        for path in self.directory.glob(f"{self.name}-*.jsonl"):
+            try:
+                segments.append((int(path.stem.rsplit("-", 1)[1]), path))
+            except ValueError:
+                continue
+        return sorted(segments)
+
+    def load_snapshot(self) -> Optional[dict]:
+        """The last snapshot written ({"seq": ..., "state": ...}), if any."""
+        return read_json(self.snapshot_path)
+
+    def replay(self, after_seq: int = 0) -> Iterator[dict]:
+        """
+        Yield journaled records with seq greater than `after_seq`, in order.
+
+        A torn final line (from a crash mid-write) is skipped.
+        """
+        for _, path in self._segments():
+            with open(path, "r") as f:
+                for line_number, line in enumerate(f, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping unreadable record {path.name}:{line_number}")
+                        continue
+                    if record.get("seq", 0) > after_seq:
+                        yield record
+
+    # --- Writing -------------------------------------------------------
+
+    def append(self, record: dict) -> None:
+        """Queue a record for the next batched write."""
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._pending.append((record["seq"], line))
+        _flusher.schedule(self)
+
+    def checkpoint(self, seq: int, build_state: Callable[[], dict]) -> None:
+        """
+        Queue a snapshot of the state as of record `seq`.
+
+        Records appended after this call go to a new segment. build_state
+        runs on the flusher thread, so it should only read data the caller
+        has already copied.
+        """
+        with self._lock:
+            self._pending.append(_Rotate(seq + 1))
+            self._pending.append(_Checkpoint(seq, build_state))
+        _flusher.schedule(self)
+
+    def flush(self) -> None:
+        """Write and fsync everything queued so far (blocks until done)."""
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+
+            for item in pending:
+                if isinstance(item, tuple):
+                    seq, line = item
+                    self._open_current(seq).write(line + "\n")
+                elif isinstance(item, _Rotate):
+                    self._sync()
+                    self._close_file()
+                    self._open_segment(item.first_seq)
+                else:
+                    self._sync()
+                    self._write_snapshot(item)
+            self._sync()
+
+    def _open_segment(self, first_seq: int) -> None:
+        # The directory is only created on the first write
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._segment_path(first_seq), "a")
+        _fsync_directory(self.directory)
+
+    def _open_current(self, seq: int):
+        """The segment new records go to (the newest, or one starting at seq)."""
+        if self._file is None:
+            segments = self._segments()
+            if segments:
+                self._file = open(segments[-1][1], "a")
+            else:
+                self._open_segment(seq)
+        return self._file
+
+    def _sync(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_snapshot(self, checkpoint: _Checkpoint) -> None:
+        """Write a snapshot and delete the segments it makes redundant."""
+        try:
+            atomic_write_json(self.snapshot_path, {
+                "seq": checkpoint.seq,
+                "state": checkpoint.build_state(),
+            })
+        except Exception as e:
+            # Keep the old segments; replay still works from the older snapshot
+            logger.error(f"Error writing snapshot in {self.directory}: {e}")
+            return
+
+        for first_seq, path in self._segments():
+            if first_seq <= checkpoint.seq:
+                path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Flush queued work and close the current segment."""
+        self.flush()
+        with self._io_lock:
+            self._close_file()
+
+
+class _JournalFlusher:
+    """
+    One background thread that flushes every journal with queued work.
+
+    It waits `journal_flush_ms` after the first queued record so that a
+    burst of appends is written (and fsync'd) together.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._dirty: set[Journal] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._interval = STORAGE_CONFIG["journal_flush_ms"] / 1000
+
+    def schedule(self, journal: Journal) -> None:
+        with self._condition:
+            self._dirty.add(journal)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="journal-flusher", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._dirty:
+                    self._condition.wait()
+            # Let a burst of appends accumulate into one write
+            time.sleep(self._interval)
+            with self._condition:
+                journals, self._dirty = self._dirty, set()
+            for journal in journals:
+                try:
+                    journal.flush()
+                except Exception as e:
+                    logger.error(f"Error flushing journal in {journal.directory}: {e}")
+
+
+_flusher = _JournalFlusher()
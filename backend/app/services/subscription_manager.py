@@ -0,0 +1,277 @@
+"""
+Finnhub subscription multiplexer.
+
+Finnhub's free WebSocket streams at most 50 symbols at a time, but the app
+cares about more: open positions and orders in every account, symbols
+open in a browser, and the whole watchlist. The manager tracks who wants
+which symbol and decides which 50 actually stream.
+
+Educational Note:
+Interest is reference-counted per owner, so two browser tabs watching
+AAPL keep it streaming until both are gone, and a tab closing never drops
+a symbol a position still needs. Each symbol takes the priority of its
+most important owner:
+
+    positions   - held or with open orders; stops and orders fill on ticks
+    viewers     - open in a client over /ws/prices
+    watchlist   - everything else
+
+Positions and viewers hold their slots. The slots left over are shared by
+the remaining symbols in turns: every rotation_seconds the next group
+streams, so with n symbols and r free slots each one gets a fresh quote
+at least every ceil(n / r) * rotation_seconds.
+"""
+import asyncio
+import logging
+import math
+import time
+from enum import IntEnum
+from typing import Iterable, Optional
+
+from ..config import SUBSCRIPTION_CONFIG
+from .finnhub_service import MAX_WEBSOCKET_SYMBOLS, finnhub_service
+from .portfolio_service import portfolio_accounts
+from .watchlist_service import watchlist_service
+
+logger = logging.getLogger(__name__)
+
+# Owners maintained by the manager itself
+POSITIONS_OWNER = "positions"
+WATCHLIST_OWNER = "watchlist"
+CLIENT_OWNER_PREFIX = "client:"
+
+
+def client_owner(client_id) -> str:
+    """Owner name for one /ws/prices connection."""
+    return f"{CLIENT_OWNER_PREFIX}{client_id}"
+
+
+class Priority(IntEnum):
+    """Why a symbol is wanted (lower is more important)."""
+    POSITION = 0
+    VIEWER = 1
+    WATCHLIST = 2
+
+
+class SubscriptionManager:
+    """
+    Reference-counted symbol interest, multiplexed onto the Finnhub stream.
+
+    acquire()/release() only update the bookkeeping and wake the manager's
+    loop, which applies the changes (and rotates symbols) on the event loop.
+    """
+
+    def __init__(self, max_symbols: int = MAX_WEBSOCKET_SYMBOLS):
+        self.max_symbols = max_symbols
+        self._rotation_seconds = SUBSCRIPTION_CONFIG["rotation_seconds"]
+        self._owners: dict[str, dict[str, Priority]] = {}   # owner -> {symbol: priority}
+        self._interest: dict[str, dict[str, Priority]] = {}  # symbol -> {owner: priority}
+        self._cursor = 0                                       # Position of the rotation
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+        # For get_status()
+        self.rotations = 0
+        self.pinned: list[str] = []
+        self.rotating: list[str] = []
+        self._waiting = 0
+        self._last_tick: dict[str, float] = {}                # symbol -> monotonic time of last tick
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # --- Interest ------------------------------------------------------
+
+    def acquire(self, owner: str, symbol: str, priority: Priority = Priority.VIEWER) -> None:
+        """Register `owner`'s interest in a symbol."""
+        symbol = symbol.upper()
+        self._owners.setdefault(owner, {})[symbol] = priority
+        self._interest.setdefault(symbol, {})[owner] = priority
+        self._changed()
+
+    def release(self, owner: str, symbol: str) -> None:
+        """Drop `owner`'s interest in a symbol (the symbol stays if others want it)."""
+        symbol = symbol.upper()
+        symbols = self._owners.get(owner)
+        if symbols is None or symbols.pop(symbol, None) is None:
+            return
+        if not symbols:
+            del self._owners[owner]
+        self._forget(owner, symbol)
+        self._changed()
+
+    def release_owner(self, owner: str) -> None:
+        """Drop everything `owner` wanted (e.g. a client disconnecting)."""
+        for symbol in self._owners.pop(owner, {}):
+            self._forget(owner, symbol)
+        self._changed()
+
+    def set_interest(self, owner: str, symbols: Iterable[str], priority: Priority) -> None:
+        """Replace `owner`'s interest with exactly `symbols`."""
+        wanted = {symbol.upper() for symbol in symbols}
+        current = self._owners.get(owner, {})
+        if set(current) == wanted and all(p == priority for p in current.values()):
+            return
+        for symbol in set(current) - wanted:
+            self._forget(owner, symbol)
+        if wanted:
+            self._owners[owner] = dict.fromkeys(wanted, priority)
+            for symbol in wanted:
+                self._interest.setdefault(symbol, {})[owner] = priority
+        else:
+            self._owners.pop(owner, None)
+        self._changed()
+
+    def _forget(self, owner: str, symbol: str) -> None:
+        owners = self._interest.get(symbol)
+        if owners is None:
+            return
+        owners.pop(owner, None)
+        if not owners:
+            del self._interest[symbol]
+
+    def _changed(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    def refresh(self) -> None:
+        """Re-read positions, orders and the watchlist soon (e.g. after a trade)."""
+        self._changed()
+
+    def sync_app_interest(self) -> None:
+        """Track every account's open positions and orders, and the watchlist."""
+        self.set_interest(POSITIONS_OWNER, portfolio_accounts.open_symbols(), Priority.POSITION)
+        self.set_interest(WATCHLIST_OWNER, watchlist_service.get_watchlist(), Priority.WATCHLIST)
+
+    # --- Slot allocation -----------------------------------------------
+
+    def priority_of(self, symbol: str) -> Optional[Priority]:
+        """The priority of a symbol's most important owner (None if unwanted)."""
+        owners = self._interest.get(symbol)
+        return min(owners.values()) if owners else None
+
+    def plan(self, advance: bool = False) -> set[str]:
+        """
+        Choose the symbols to stream.
+
+        Args:
+            advance: Move the rotation on to the next group of symbols
+
+        Returns:
+            At most max_symbols symbols
+        """
+        # Important symbols first; among equals, the most wanted
+        ranked = sorted(
+            self._interest,
+            key=lambda symbol: (self.priority_of(symbol), -len(self._interest[symbol]), symbol),
+        )
+        pinned = [s for s in ranked if self.priority_of(s) < Priority.WATCHLIST][:self.max_symbols]
+        candidates = sorted(s for s in ranked if self.priority_of(s) == Priority.WATCHLIST)
+
+        slots = self.max_symbols - len(pinned)
+        if len(candidates) <= slots:
+            rotating = candidates
+            self._cursor = 0
+        elif slots <= 0:
+            rotating = []
+        else:
+            if advance:
+                self._cursor += slots
+            self._cursor %= len(candidates)
+            rotating = (candidates[self._cursor:] + candidates[:self._cursor])[:slots]
+
+        self.pinned = pinned
+        self.rotating = rotating
+        self._waiting = len(candidates) - len(rotating)
+        return set(pinned) | set(rotating)
+
+    async def reconcile(self, advance: bool = False) -> None:
+        """Subscribe and unsubscribe so Finnhub streams the planned symbols."""
+        wanted = self.plan(advance)
+        current = set(finnhub_service.subscribed_symbols)
+
+        # Free slots before taking new ones
+        for symbol in current - wanted:
+            # Rotated-out symbols keep their last quote; dropped ones don't
+            await finnhub_service.unsubscribe(symbol, keep_price=symbol in self._interest)
+        for symbol in sorted(wanted - current):
+            await finnhub_service.subscribe(symbol)
+
+    def on_tick(self, symbol: str, price_data: dict) -> None:
+        """Note when each symbol last ticked (for freshness in get_status)."""
+        self._last_tick[symbol] = time.monotonic()
+
+    # --- Lifecycle -----------------------------------------------------
+
+    def start(self) -> None:
+        """Start applying interest changes and rotating symbols."""
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the manager's loop (current subscriptions are left as they are)."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        next_rotation = time.monotonic() + self._rotation_seconds
+        while True:
+            advance = time.monotonic() >= next_rotation
+            if advance:
+                next_rotation = time.monotonic() + self._rotation_seconds
+                self.rotations += 1
+            try:
+                self.sync_app_interest()
+                self._wake.clear()
+                await self.reconcile(advance)
+            except Exception as e:
+                logger.error(f"Error updating Finnhub subscriptions: {e}")
+
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), timeout=max(next_rotation - time.monotonic(), 0)
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def get_status(self) -> dict:
+        """Slot usage and rotation freshness, for monitoring."""
+        now = time.monotonic()
+        counts = {priority.name.lower(): 0 for priority in Priority}
+        for symbol in self._interest:
+            counts[self.priority_of(symbol).name.lower()] += 1
+
+        rotating_pool = len(self.rotating) + self._waiting
+        tick_ages = [
+            now - self._last_tick[symbol] for symbol in self._interest if symbol in self._last_tick
+        ]
+        return {
+            "max_symbols": self.max_symbols,
+            "tracked_symbols": len(self._interest),
+            "by_priority": counts,
+            "pinned": len(self.pinned),
+            "rotating": len(self.rotating),
+            "waiting": self._waiting,
+            "rotation_seconds": self._rotation_seconds,
+            # Longest gap between turns for a rotated symbol
+            "rotation_cycle_seconds": (
+                math.ceil(rotating_pool / len(self.rotating)) * self._rotation_seconds
+                if self.rotating else None
+            ),
+            "rotations": self.rotations,
+            "oldest_tick_age_seconds": round(max(tick_ages), 1) if tick_ages else None,
+            "clients": sum(1 for owner in self._owners if owner.startswith(CLIENT_OWNER_PREFIX)),
+        }
+
+
+# Singleton instance
+subscription_manager = SubscriptionManager()
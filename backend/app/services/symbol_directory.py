@@ -0,0 +1,187 @@
+"""
+Offline symbol directory for type-ahead search.
+
+Educational Note:
+Searching by calling Yahoo for the exact ticker is slow and finds nothing
+for a partial ticker or a company name. Instead, a listing of symbols
+(app/resources/symbols.csv: equities, ETFs and crypto pairs) is loaded
+once and indexed in memory:
+
+    tickers, sorted:      ... APD  APP  APPN  ARKK  ...
+                               ^^^^^^^^^^^^ "APP" is one binary search away
+    name tokens, sorted:  ... ("apple", AAPL)  ("applied", AMAT)  ...
+
+A ticker prefix or a name-word prefix is a binary search plus a short
+scan, and a mistyped ticker ("APPL") is matched by looking up the ticker
+with one letter dropped. No query touches the network.
+
+Results are ranked: exact ticker, then ticker prefix (shortest first),
+then names starting with the query, other name matches, and finally
+near-miss tickers.
+"""
+import bisect
+import csv
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+LISTINGS_FILE = Path(__file__).parent.parent / "resources" / "symbols.csv"
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Rank of each kind of match (lower is better)
+EXACT, TICKER_PREFIX, NAME_START, NAME_MATCH, NEAR_MISS = range(5)
+
+
+@dataclass(frozen=True)
+class Listing:
+    """One row of the symbol directory."""
+    symbol: str
+    name: str
+    exchange: str
+    asset_type: str   # equity, etf or crypto
+
+
+def _deletes(symbol: str) -> set[str]:
+    """The symbol with each single character removed."""
+    return {symbol[:i] + symbol[i + 1:] for i in range(len(symbol))}
+
+
+class SymbolDirectory:
+    """In-memory search index over a listing file."""
+
+    def __init__(self, listings_file: Optional[Path] = LISTINGS_FILE):
+        self.listings: list[Listing] = []                 # Sorted by symbol
+        self._symbols: list[str] = []                      # Same order, for bisect
+        self._by_symbol: dict[str, int] = {}
+        self._tokens: list[tuple[str, int]] = []           # (name token, listing), sorted
+        self._first_tokens: list[str] = []                 # First word of each name
+        self._deletes: dict[str, list[int]] = {}           # symbol minus one character -> listings
+        if listings_file is not None:
+            self.load(listings_file)
+
+    def __len__(self) -> int:
+        return len(self.listings)
+
+    def load(self, path: Path) -> int:
+        """
+        (Re)build the index from a CSV with symbol, name, exchange and
+        asset_type columns.
+
+        Returns:
+            Number of listings loaded
+        """
+        try:
+            with open(path, newline="") as f:
+                rows = [
+                    Listing(
+                        symbol=row["symbol"].strip().upper(),
+                        name=row["name"].strip(),
+                        exchange=row.get("exchange", "").strip(),
+                        asset_type=row.get("asset_type", "").strip(),
+                    )
+                    for row in csv.DictReader(f)
+                    if row.get("symbol")
+                ]
+        except Exception as e:
+            logger.error(f"Error loading symbol directory {path}: {e}")
+            return 0
+
+        self.listings = sorted({row.symbol: row for row in rows}.values(), key=lambda row: row.symbol)
+        self._symbols = [row.symbol for row in self.listings]
+        self._by_symbol = {symbol: i for i, symbol in enumerate(self._symbols)}
+
+        tokens = set()
+        first_tokens = []
+        deletes: dict[str, list[int]] = {}
+        for i, row in enumerate(self.listings):
+            words = _TOKEN.findall(row.name.lower())
+            tokens.update((word, i) for word in words)
+            first_tokens.append(words[0] if words else "")
+            for variant in _deletes(row.symbol):
+                deletes.setdefault(variant, []).append(i)
+        self._tokens = sorted(tokens)
+        self._first_tokens = first_tokens
+        self._deletes = deletes
+        return len(self.listings)
+
+    def get(self, symbol: str) -> Optional[Listing]:
+        """Look up a listing by exact symbol."""
+        i = self._by_symbol.get(symbol.upper().strip())
+        return None if i is None else self.listings[i]
+
+    def _ticker_prefix(self, prefix: str) -> range:
+        """Listings whose symbol starts with `prefix`."""
+        lo = bisect.bisect_left(self._symbols, prefix)
+        hi = bisect.bisect_left(self._symbols, prefix + "\uffff")
+        return range(lo, hi)
+
+    def _name_prefix(self, prefix: str) -> set[int]:
+        """Listings with a name word starting with `prefix`."""
+        lo = bisect.bisect_left(self._tokens, (prefix,))
+        hi = bisect.bisect_left(self._tokens, (prefix + "\uffff",))
+        return {i for _, i in self._tokens[lo:hi]}
+
+    def _near_misses(self, ticker: str) -> set[int]:
+        """Listings one added, dropped or changed character away from `ticker`."""
+        matches = set(self._deletes.get(ticker, ()))          # Query missed a character
+        for variant in _deletes(ticker):
+            if variant in self._by_symbol:                       # Query has an extra character
+                matches.add(self._by_symbol[variant])
+            matches.update(self._deletes.get(variant, ()))       # Query changed a character
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[Listing, int]]:
+        """
+        Find listings matching a ticker or name query.
+
+        Args:
+            query: Ticker prefix or words from the name (e.g. "APP", "bank of am")
+            limit: Most results to return
+
+        Returns:
+            (listing, match rank) pairs, best first
+        """
+        ticker = query.upper().strip()
+        words = _TOKEN.findall(query.lower())
+        if not ticker or limit <= 0:
+            return []
+
+        ranks: dict[int, int] = {}
+
+        def offer(i: int, rank: int) -> None:
+            if rank < ranks.get(i, NEAR_MISS + 1):
+                ranks[i] = rank
+
+        for i in self._ticker_prefix(ticker):
+            offer(i, EXACT if self._symbols[i] == ticker else TICKER_PREFIX)
+
+        # Every query word must start some word of the name
+        if words:
+            matched = None
+            for word in sorted(words, key=len, reverse=True):
+                hits = self._name_prefix(word)
+                matched = hits if matched is None else matched & hits
+                if not matched:
+                    break
+            for i in matched or ():
+                offer(i, NAME_START if self._first_tokens[i].startswith(words[0]) else NAME_MATCH)
+
+        if len(ranks) < limit and len(ticker) > 1:
+            for i in self._near_misses(ticker):
+                offer(i, NEAR_MISS)
+
+        def order(item: tuple[int, int]) -> tuple:
+            i, rank = item
+            return rank, len(self._symbols[i]), len(self.listings[i].name), i
+
+        best = sorted(ranks.items(), key=order)
+        return [(self.listings[i], rank) for i, rank in best[:limit]]
+
+
+# Singleton instance
+symbol_directory = SymbolDirectory()
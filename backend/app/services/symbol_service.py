@@ -0,0 +1,173 @@
+"""
+Cached symbol metadata and validation.
+
+Educational Note:
+Checking that a ticker exists means downloading Yahoo's full quote summary
+(yfinance's Ticker.info), which often takes over a second. But the answer
+almost never changes: AAPL will still be Apple next week. So each answer
+is cached, with two lifetimes:
+
+    known symbol    -> kept for a week     (metadata_ttl_hours)
+    unknown symbol  -> kept for an hour    (invalid_ttl_minutes; it may be newly listed)
+
+A known symbol whose entry has expired is still answered from the cache
+immediately while a background thread refreshes it, so a trade never
+waits on Yahoo for a symbol we have seen before. The cache is saved to
+disk, so that holds across restarts too. Lookups that fail (network
+errors, rate limits) are not cached at all.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import yfinance as yf
+
+from ..config import STORAGE_CONFIG, SYMBOL_CONFIG
+from ..models.stock import SymbolInfo
+from .storage import DATA_DIR, DebouncedWriter, read_json
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_CACHE_FILE = DATA_DIR / "symbols.json"
+
+
+class SymbolService:
+    """Symbol metadata from Yahoo, cached in memory and on disk."""
+
+    def __init__(self, cache_file: Optional[Path] = SYMBOL_CACHE_FILE):
+        """
+        Args:
+            cache_file: Where the cache is saved (None keeps it in memory only)
+        """
+        self._cache_file = cache_file
+        self._ttl = timedelta(hours=SYMBOL_CONFIG["metadata_ttl_hours"])
+        self._invalid_ttl = timedelta(minutes=SYMBOL_CONFIG["invalid_ttl_minutes"])
+        self._lock = threading.Lock()            # Guards the two dicts below
+        self._entries: dict[str, SymbolInfo] = {}
+        self._inflight: dict[str, threading.Event] = {}   # symbol -> set when its fetch is done
+        self._writer = (
+            DebouncedWriter(cache_file, STORAGE_CONFIG["settings_flush_ms"] / 1000)
+            if cache_file is not None else None
+        )
+        self._load()
+
+    def _load(self) -> None:
+        """Load the saved cache (a missing or unreadable file starts empty)."""
+        if self._cache_file is None:
+            return
+        try:
+            data = read_json(self._cache_file) or {}
+            for item in data.get("symbols", []):
+                info = SymbolInfo.model_validate(item)
+                self._entries[info.symbol] = info
+        except Exception as e:
+            logger.error(f"Error loading symbol cache: {e}")
+
+    def _state(self) -> dict:
+        """A copy of the cache as saved to disk (runs on the writer thread)."""
+        with self._lock:
+            return {"symbols": [info.model_dump(mode="json") for info in self._entries.values()]}
+
+    def _save(self) -> None:
+        """Queue a background save of the cache."""
+        if self._writer is not None:
+            self._writer.schedule(self._state)
+
+    def flush(self) -> None:
+        """Write any pending cache change now (e.g. at shutdown)."""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def _expired(self, info: SymbolInfo, now: datetime) -> bool:
+        ttl = self._ttl if info.valid else self._invalid_ttl
+        return now - info.fetched_at >= ttl
+
+    @staticmethod
+    def _fetch(symbol: str) -> SymbolInfo:
+        """
+        Look a symbol up on Yahoo.
+
+        Raises:
+            Exception: If the lookup itself fails (not cached)
+        """
+        info = yf.Ticker(symbol).info or {}
+        return SymbolInfo(
+            symbol=symbol,
+            # Check if we got valid data (market cap or price exists)
+            valid=info.get("regularMarketPrice") is not None or info.get("marketCap") is not None,
+            name=info.get("shortName") or info.get("longName"),
+            exchange=info.get("exchange"),
+            asset_type=info.get("quoteType"),
+            currency=info.get("currency"),
+            fetched_at=datetime.now(),
+        )
+
+    def _refresh(self, symbol: str, done: threading.Event) -> Optional[SymbolInfo]:
+        """Fetch and cache a symbol, then wake anyone waiting on it."""
+        try:
+            info = self._fetch(symbol)
+        except Exception as e:
+            logger.warning(f"Could not look up {symbol}: {e}")
+            info = None
+
+        with self._lock:
+            if info is not None:
+                self._entries[symbol] = info
+            del self._inflight[symbol]
+        done.set()
+
+        if info is not None:
+            self._save()
+        return info
+
+    def get_info(self, symbol: str) -> Optional[SymbolInfo]:
+        """
+        Get a symbol's metadata.
+
+        Fresh entries are answered from memory. An expired entry for a known
+        symbol is answered as-is and refreshed in the background; anything
+        else waits for one lookup, shared by concurrent callers.
+
+        Returns:
+            The metadata, or None if the lookup failed and nothing is cached
+        """
+        symbol = symbol.upper().strip()
+        now = datetime.now()
+
+        with self._lock:
+            cached = self._entries.get(symbol)
+            if cached is not None and not self._expired(cached, now):
+                return cached
+
+            done = self._inflight.get(symbol)
+            fetch = done is None
+            if fetch:
+                done = self._inflight[symbol] = threading.Event()
+
+        # Stale while revalidating: known symbols don't wait on Yahoo
+        if cached is not None and cached.valid:
+            if fetch:
+                threading.Thread(
+                    target=self._refresh, args=(symbol, done), name="symbol-refresh", daemon=True
+                ).start()
+            return cached
+
+        if fetch:
+            info = self._refresh(symbol, done)
+        else:
+            done.wait()
+            with self._lock:
+                info = self._entries.get(symbol)
+        # A failed lookup falls back to whatever was cached before
+        return info or cached
+
+    def validate(self, symbol: str) -> bool:
+        """Check if a symbol is valid and tradeable."""
+        info = self.get_info(symbol)
+        return info is not None and info.valid
+
+
+# Singleton instance
+symbol_service = SymbolService()
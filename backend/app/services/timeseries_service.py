@@ -0,0 +1,354 @@
+"""
+Time series helpers for chart responses.
+
+Equity curves grow by one point per bar (or per snapshot), but a chart can
+only show so many points. Downsampling with Largest-Triangle-Three-Buckets
+(LTTB) keeps the visual shape - peaks, troughs and drawdowns - while
+capping the number of points sent to the client.
+
+A live portfolio's value history never stops growing, so ValueSeries also
+bounds what is kept: recent points are stored as recorded, and older ones
+are rolled up to one point per minute, then hour, then day.
+"""
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+from ..config import VALUE_HISTORY_CONFIG
+
+SERIES_FORMATS = ("records", "columnar")
+
+# Value history resolutions, finest first (bucket size in seconds)
+RESOLUTIONS = {"raw": 0, "minute": 60, "hour": 3600, "day": 86400}
+
+# Bounds for client-requested max_points
+MIN_CHART_POINTS = 10
+MAX_CHART_POINTS = 10000
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Pick the indices of the points to keep using LTTB.
+
+    The first and last points are always kept. The rest of the series is
+    split into (max_points - 2) buckets and, from each bucket, the point
+    forming the largest triangle with the previously kept point and the
+    average of the next bucket is selected.
+
+    Args:
+        x: Numeric x values (e.g. epoch seconds), increasing
+        y: Values to plot
+        max_points: Maximum number of points to keep (at least 3)
+
+    Returns:
+        Sorted array of indices into x/y
+    """
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Bucket boundaries for the interior points [1, n - 1)
+    n_buckets = max_points - 2
+    edges = np.floor(np.arange(n_buckets + 1) * (n - 2) / n_buckets).astype(int) + 1
+    starts, ends = edges[:-1], edges[1:]
+
+    # Average point of every bucket, plus the final point as the
+    # "next bucket" of the last one
+    sizes = ends - starts
+    avg_x = np.append(np.add.reduceat(x[:-1], starts) / sizes, x[-1])
+    avg_y = np.append(np.add.reduceat(y[:-1], starts) / sizes, y[-1])
+
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(n_buckets):
+        start, end = starts[bucket], ends[bucket]
+        ax, ay = x[previous], y[previous]
+        cx, cy = avg_x[bucket + 1], avg_y[bucket + 1]
+
+        # Twice the triangle area; the constant factor doesn't change argmax
+        area = np.abs(
+            (ax - cx) * (y[start:end] - ay) - (ax - x[start:end]) * (cy - ay)
+        )
+        previous = start + int(area.argmax())
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def downsample_indices(
+    dates: Sequence[datetime],
+    values: Sequence[float],
+    max_points: Optional[int] = None,
+) -> Optional[np.ndarray]:
+    """
+    Indices LTTB keeps for a dated series (None if nothing is dropped).
+
+    Useful for downsampling several aligned series (e.g. strategy and
+    benchmark) on the same dates.
+    """
+    if max_points is None or len(values) <= max_points:
+        return None
+
+    epoch = np.array([d.timestamp() for d in dates], dtype=float)
+    return lttb_indices(epoch, np.asarray(values, dtype=float), max_points)
+
+
+def downsample(
+    dates: Sequence[datetime],
+    values: Sequence[float],
+    max_points: Optional[int] = None,
+) -> tuple[list[datetime], list[float]]:
+    """
+    Downsample a dated series to at most max_points with LTTB.
+
+    Returns the series unchanged when max_points is None or not smaller
+    than the series.
+    """
+    keep = downsample_indices(dates, values, max_points)
+    if keep is None:
+        return list(dates), list(values)
+    return [dates[i] for i in keep], [values[i] for i in keep]
+
+
+def encode_series(
+    dates: Sequence[datetime],
+    values: Sequence[float],
+    max_points: Optional[int] = None,
+    series_format: str = "records",
+    indices: Optional[Sequence[int]] = None,
+):
+    """
+    Encode a dated series for an API response.
+
+    Args:
+        dates: Point timestamps
+        values: Point values
+        max_points: Optional cap applied with LTTB downsampling
+        series_format: "records" for [{"date", "value"}, ...] or
+            "columnar" for {"dates": [...], "values": [...]}
+        indices: Explicit points to keep (overrides max_points), e.g. from
+            downsample_indices() on an aligned series
+
+    Returns:
+        List of dicts (records) or dict of lists (columnar)
+    """
+    if series_format not in SERIES_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(SERIES_FORMATS)}")
+
+    if indices is not None:
+        dates = [dates[i] for i in indices]
+        values = [values[i] for i in indices]
+    else:
+        dates, values = downsample(dates, values, max_points)
+    iso_dates = [d.isoformat() for d in dates]
+
+    if series_format == "columnar":
+        return {"dates": iso_dates, "values": [float(v) for v in values]}
+
+    return [{"date": d, "value": v} for d, v in zip(iso_dates, values)]
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_US_PER_SECOND = 1_000_000
+
+
+def _to_epoch_us(timestamp: datetime) -> int:
+    """Naive datetime to integer microseconds since 1970-01-01 (wall clock)."""
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+class _ColumnBuffer:
+    """Growable epoch/value arrays; appends and drops from the front are amortized O(1)."""
+
+    def __init__(self, capacity: int = 64):
+        self._epochs = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty(capacity, dtype=np.float64)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def epochs(self) -> np.ndarray:
+        return self._epochs[self._start:self._end]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[self._start:self._end]
+
+    def _reserve(self, count: int) -> None:
+        """Make room for `count` more points at the end."""
+        if self._end + count <= len(self._epochs):
+            return
+        size = len(self)
+        # Reuse the space freed at the front before growing
+        capacity = len(self._epochs)
+        while size + count > capacity // 2:
+            capacity *= 2
+        epochs = np.empty(capacity, dtype=np.int64)
+        values = np.empty(capacity, dtype=np.float64)
+        epochs[:size] = self.epochs
+        values[:size] = self.values
+        self._epochs, self._values = epochs, values
+        self._start, self._end = 0, size
+
+    def append(self, epoch: int, value: float) -> None:
+        self._reserve(1)
+        self._epochs[self._end] = epoch
+        self._values[self._end] = value
+        self._end += 1
+
+    def extend(self, epochs: np.ndarray, values: np.ndarray) -> None:
+        self._reserve(len(epochs))
+        self._epochs[self._end:self._end + len(epochs)] = epochs
+        self._values[self._end:self._end + len(values)] = values
+        self._end += len(epochs)
+
+    def drop_front(self, count: int) -> None:
+        self._start += count
+
+
+def _last_per_bucket(epochs: np.ndarray, bucket_us: int) -> np.ndarray:
+    """Indices of the last point in every bucket of a sorted epoch array."""
+    if len(epochs) == 0:
+        return np.arange(0)
+    buckets = epochs // bucket_us
+    return np.flatnonzero(np.append(buckets[1:] != buckets[:-1], True))
+
+
+class ValueSeries:
+    """
+    Dated value series with bounded memory, stored as epoch/value arrays.
+
+    Points are kept in tiers: raw (as appended), minute, hour and day.
+    Once points are older than their tier's retention they are rolled up
+    into the next tier, keeping only the last point of each bucket - so
+    every stored point is a real recorded value, just fewer of them the
+    further back you look. Rolling up happens once per bucket of the
+    coarser tier, so appends stay amortized O(1).
+
+    Timestamps are naive datetimes; points must be appended in time order.
+    """
+
+    def __init__(
+        self,
+        raw_retention: timedelta = timedelta(hours=VALUE_HISTORY_CONFIG["raw_retention_hours"]),
+        minute_retention: timedelta = timedelta(days=VALUE_HISTORY_CONFIG["minute_retention_days"]),
+        hour_retention: timedelta = timedelta(days=VALUE_HISTORY_CONFIG["hour_retention_days"]),
+    ):
+        retentions = (raw_retention, minute_retention, hour_retention, None)
+        # (bucket size in microseconds, retention in microseconds, points), finest first
+        self._tiers = [
+            (
+                seconds * _US_PER_SECOND,
+                None if retention is None else retention // _MICROSECOND,
+                _ColumnBuffer(),
+            )
+            for seconds, retention in zip(RESOLUTIONS.values(), retentions)
+        ]
+        self._last: Optional[tuple[int, float]] = None
+
+    def __len__(self) -> int:
+        return sum(len(points) for _, _, points in self._tiers)
+
+    def append(self, timestamp: datetime, value: float, clamp: bool = False) -> None:
+        """
+        Add the newest point, rolling up any tier that has aged out.
+
+        Args:
+            timestamp: When the value was recorded
+            value: The value
+            clamp: Record a timestamp earlier than the last point's at the
+                last point's time (for live points, e.g. after the clock
+                steps back) instead of rejecting it
+
+        Raises:
+            ValueError: If the timestamp is earlier than the last point's
+                and clamp is False
+        """
+        epoch = _to_epoch_us(timestamp)
+        if self._last is not None and epoch < self._last[0]:
+            if not clamp:
+                raise ValueError(f"Value point at {timestamp.isoformat()} is older than the last point")
+            epoch = self._last[0]
+        self._last = (epoch, value)
+        self._tiers[0][2].append(epoch, value)
+        self._roll_up(epoch)
+
+    def _roll_up(self, now: int) -> None:
+        """Move points past their tier's retention into the next tier."""
+        for (_, retention, points), (bucket_us, _, coarser) in zip(self._tiers, self._tiers[1:]):
+            if not len(points):
+                continue
+            # Only whole buckets of the coarser tier move, so a bucket is
+            # never split between two roll-ups
+            cutoff = (now - retention) // bucket_us * bucket_us
+            epochs = points.epochs
+            if epochs[0] >= cutoff:
+                continue
+
+            count = int(np.searchsorted(epochs, cutoff, side="left"))
+            keep = _last_per_bucket(epochs[:count], bucket_us)
+            coarser.extend(epochs[keep], points.values[keep])
+            points.drop_front(count)
+
+    def last(self) -> Optional[tuple[datetime, float]]:
+        """The most recent point, if any."""
+        if self._last is None:
+            return None
+        return _EPOCH + self._last[0] * _MICROSECOND, self._last[1]
+
+    def to_arrays(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        resolution: str = "raw",
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Points in [start, end) as (epoch microseconds, values) array copies.
+
+        Args:
+            start: Earliest timestamp (default: the beginning)
+            end: Exclusive upper bound (default: the latest point)
+            resolution: "raw", "minute", "hour" or "day". Points are
+                thinned to the last one per bucket; history already rolled
+                up to a coarser tier is returned at that tier's resolution.
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"resolution must be one of: {', '.join(RESOLUTIONS)}")
+
+        lo = None if start is None else _to_epoch_us(start)
+        hi = None if end is None else _to_epoch_us(end)
+
+        epoch_parts, value_parts = [], []
+        for _, _, points in reversed(self._tiers):
+            epochs = points.epochs
+            i = 0 if lo is None else int(np.searchsorted(epochs, lo, side="left"))
+            j = len(epochs) if hi is None else int(np.searchsorted(epochs, hi, side="left"))
+            epoch_parts.append(epochs[i:j])
+            value_parts.append(points.values[i:j])
+
+        epochs = np.concatenate(epoch_parts)
+        values = np.concatenate(value_parts)
+        if RESOLUTIONS[resolution]:
+            keep = _last_per_bucket(epochs, RESOLUTIONS[resolution] * _US_PER_SECOND)
+            epochs, values = epochs[keep], values[keep]
+        return epochs, values
+
+    def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        resolution: str = "raw",
+    ) -> tuple[list[datetime], list[float]]:
+        """Points in [start, end) as lists of datetimes and values (see to_arrays)."""
+        epochs, values = self.to_arrays(start, end, resolution)
+        return epochs.astype("datetime64[us]").astype(object).tolist(), values.tolist()
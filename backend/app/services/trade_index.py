@@ -0,0 +1,134 @@
+"""
+Indexed trade history.
+
+Educational Note:
+Trades are only ever appended, and always in time order. So a trade's
+position in the history is a stable id of its own, and every secondary
+index can simply be a sorted list of positions:
+
+    trades:       [AAPL buy, MSFT buy, AAPL sell, TSLA buy, AAPL buy]
+    by symbol:    AAPL -> [0, 2, 4]    MSFT -> [1]    TSLA -> [3]
+    by action:    buy  -> [0, 1, 3, 4] sell -> [2]
+
+Because positions and timestamps grow together, a date range is a binary
+search in any of those lists, and a page of results is a short walk from
+where the previous page stopped. A lookup by id is one dict read. Neither
+depends on how many trades have been recorded.
+"""
+import bisect
+from datetime import datetime
+from typing import Optional, Sequence
+
+from ..models.trade import Trade, TradeAction
+
+
+class TradeIndex:
+    """
+    Append-only trade list with indexes by id, symbol, action and exit reason.
+
+    Not thread-safe on its own; the owning portfolio guards it with its lock.
+    """
+
+    def __init__(self):
+        self.trades: list[Trade] = []
+        self._timestamps: list[datetime] = []   # Non-decreasing, one per trade
+        self._by_id: dict[str, int] = {}
+        self._by_symbol: dict[str, list[int]] = {}
+        self._by_action: dict[TradeAction, list[int]] = {}
+        self._by_exit_reason: dict[str, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.trades)
+
+    def add(self, trade: Trade) -> None:
+        """Append a trade and index it."""
+        position = len(self.trades)
+        self.trades.append(trade)
+
+        # Keep the time index sorted even if the clock steps backwards
+        timestamp = trade.timestamp
+        if self._timestamps and timestamp < self._timestamps[-1]:
+            timestamp = self._timestamps[-1]
+        self._timestamps.append(timestamp)
+
+        self._by_id[trade.id] = position
+        self._by_symbol.setdefault(trade.symbol, []).append(position)
+        self._by_action.setdefault(trade.action, []).append(position)
+        if trade.exit_reason:
+            self._by_exit_reason.setdefault(trade.exit_reason, []).append(position)
+
+    def get(self, trade_id: str) -> Optional[Trade]:
+        """Get a trade by id (None if unknown)."""
+        position = self._by_id.get(trade_id)
+        return None if position is None else self.trades[position]
+
+    def query(
+        self,
+        symbol: Optional[str] = None,
+        action: Optional[TradeAction] = None,
+        exit_reason: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = False,
+    ) -> tuple[list[Trade], Optional[str]]:
+        """
+        Get one page of trades matching every given filter.
+
+        Args:
+            symbol: Only trades in this symbol
+            action: Only buys or only sells
+            exit_reason: Only sells closed for this reason
+            start: Only trades at or after this time
+            end: Only trades before this time
+            after: Id of the last trade of the previous page (the cursor)
+            limit: Page size (None for every matching trade)
+            newest_first: Walk the history from the most recent trade
+
+        Returns:
+            (trades, id of the last trade returned if more may follow)
+
+        Raises:
+            KeyError: If `after` is not the id of a recorded trade
+        """
+        # Walk the smallest index that applies; check the other filters per trade
+        filters = [
+            index.get(key, [])
+            for index, key in (
+                (self._by_symbol, symbol),
+                (self._by_action, action),
+                (self._by_exit_reason, exit_reason),
+            )
+            if key is not None
+        ]
+        candidates: Sequence[int] = min(filters, key=len) if filters else range(len(self.trades))
+
+        timestamp_of = self._timestamps.__getitem__
+        lo, hi = 0, len(candidates)
+        if start is not None:
+            lo = bisect.bisect_left(candidates, start, key=timestamp_of)
+        if end is not None:
+            hi = bisect.bisect_left(candidates, end, key=timestamp_of)
+        if after is not None:
+            cursor = self._by_id[after]
+            if newest_first:
+                hi = min(hi, bisect.bisect_left(candidates, cursor))
+            else:
+                lo = max(lo, bisect.bisect_right(candidates, cursor))
+
+        steps = range(hi - 1, lo - 1, -1) if newest_first else range(lo, hi)
+        page: list[Trade] = []
+        for i in steps:
+            trade = self.trades[candidates[i]]
+            if symbol is not None and trade.symbol != symbol:
+                continue
+            if action is not None and trade.action != action:
+                continue
+            if exit_reason is not None and trade.exit_reason != exit_reason:
+                continue
+            if limit is not None and len(page) == limit:
+                return page, page[-1].id
+            page.append(trade)
+
+        return page, None
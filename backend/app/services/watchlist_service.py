@@ -1,19 +1,34 @@
 """
 Watchlist service for managing user's stock watchlist.
 Stores watchlist in memory with JSON file persistence.
+
+Changes are saved in the background: a burst of adds and removes becomes
+one atomic write of data/watchlist.json shortly afterwards, so requests
+never wait on the disk and a crash never leaves a half-written file.
 """
-import json
 import logging
-from pathlib import Path
+import re
+import threading
 from typing import Optional
-import yfinance as yf
+
+from ..config import STORAGE_CONFIG
+from .finnhub_service import finnhub_service
+from .symbol_directory import symbol_directory
+from .storage import DATA_DIR, DebouncedWriter, read_json
+from .symbol_service import symbol_service
 
 logger = logging.getLogger(__name__)
 
 # Default watchlist for new users
 DEFAULT_WATCHLIST = ["AAPL", "MSFT", "GOOGL", "SPY"]
 MAX_WATCHLIST_SIZE = 50
-WATCHLIST_FILE = Path(__file__).parent.parent.parent / "data" / "watchlist.json"
+WATCHLIST_FILE = DATA_DIR / "watchlist.json"
+
+# Queries shaped like a ticker (e.g. BRK-B, ^GSPC, EURUSD=X) get an exact lookup
+TICKER_QUERY_PATTERN = re.compile(r"^[A-Z0-9.^=-]{1,10}$")
+
+# Yahoo quote types, in the symbol directory's asset_type terms
+YAHOO_ASSET_TYPES = {"EQUITY": "equity", "ETF": "etf", "CRYPTOCURRENCY": "crypto"}
 
 
 class WatchlistService:
@@ -21,16 +36,17 @@ class WatchlistService:
 
     def __init__(self):
         self._watchlist: set[str] = set()
+        self._lock = threading.Lock()
+        self._writer = DebouncedWriter(WATCHLIST_FILE, STORAGE_CONFIG["settings_flush_ms"] / 1000)
         self._load_watchlist()
 
     def _load_watchlist(self):
         """Load watchlist from file or use defaults."""
         try:
-            if WATCHLIST_FILE.exists():
-                with open(WATCHLIST_FILE, "r") as f:
-                    data = json.load(f)
-                    self._watchlist = set(data.get("symbols", DEFAULT_WATCHLIST))
-                    logger.info(f"Loaded watchlist with {len(self._watchlist)} symbols")
+            data = read_json(WATCHLIST_FILE)
+            if data is not None:
+                self._watchlist = set(data.get("symbols", DEFAULT_WATCHLIST))
+                logger.info(f"Loaded watchlist with {len(self._watchlist)} symbols")
             else:
                 self._watchlist = set(DEFAULT_WATCHLIST)
                 self._save_watchlist()
@@ -40,17 +56,17 @@ class WatchlistService:
             self._watchlist = set(DEFAULT_WATCHLIST)
 
     def _save_watchlist(self):
-        """Save watchlist to file."""
-        try:
-            WATCHLIST_FILE.parent.mkdir(parents=True, exist_ok=True)
-            with open(WATCHLIST_FILE, "w") as f:
-                json.dump({"symbols": sorted(self._watchlist)}, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving watchlist: {e}")
+        """Queue a background save of the watchlist."""
+        self._writer.schedule(lambda: {"symbols": self.get_watchlist()})
+
+    def flush(self):
+        """Write any pending watchlist change now (e.g. at shutdown)."""
+        self._writer.flush()
 
     def get_watchlist(self) -> list[str]:
         """Get all symbols in the watchlist."""
-        return sorted(self._watchlist)
+        with self._lock:
+            return sorted(self._watchlist)
 
     def add_symbol(self, symbol: str) -> dict:
         """
@@ -78,7 +94,14 @@ class WatchlistService:
                 "message": f"{symbol} is not a valid stock symbol."
             }
 
-        self._watchlist.add(symbol)
+        with self._lock:
+            # Re-check: another request may have changed the list meanwhile
+            if symbol in self._watchlist or len(self._watchlist) >= MAX_WATCHLIST_SIZE:
+                return {
+                    "success": False,
+                    "message": f"Could not add {symbol}: the watchlist changed. Please try again."
+                }
+            self._watchlist.add(symbol)
         self._save_watchlist()
 
         return {
@@ -99,7 +122,8 @@ class WatchlistService:
                 "message": f"{symbol} is not in your watchlist."
             }
 
-        self._watchlist.discard(symbol)
+        with self._lock:
+            self._watchlist.discard(symbol)
         self._save_watchlist()
 
         return {
@@ -108,41 +132,47 @@ class WatchlistService:
         }
 
     def validate_symbol(self, symbol: str) -> bool:
-        """Check if a symbol is valid and tradeable."""
-        try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            # Check if we got valid data (market cap or price exists)
-            return info.get("regularMarketPrice") is not None or info.get("marketCap") is not None
-        except Exception:
-            return False
+        """Check if a symbol is valid and tradeable (cached, see symbol_service)."""
+        return symbol_service.validate(symbol)
 
     def search_symbols(self, query: str, limit: int = 10) -> list[dict]:
         """
-        Search for stock symbols matching a query.
-        Returns list of matching symbols with basic info.
-        """
-        query = query.upper().strip()
-        if len(query) < 1:
-            return []
+        Search for symbols by ticker prefix or company name.
 
-        results = []
-
-        # First, check if exact symbol exists
-        try:
-            ticker = yf.Ticker(query)
-            info = ticker.info
-            if info.get("regularMarketPrice") is not None:
-                results.append({
-                    "symbol": query,
-                    "name": info.get("shortName", info.get("longName", query)),
-                    "price": info.get("regularMarketPrice"),
-                    "in_watchlist": query in self._watchlist
-                })
-        except Exception:
-            pass
-
-        return results[:limit]
+        Served from the offline symbol directory; prices are included only
+        for symbols with a live Finnhub quote. A ticker the directory doesn't
+        list is still found by its exact symbol, through the cached symbol
+        validation (which only calls Yahoo on a cache miss).
+        Returns list of matching symbols with basic info, best match first.
+        """
+        results = [
+            self._search_result(listing.symbol, listing.name, listing.exchange, listing.asset_type)
+            for listing, _ in symbol_directory.search(query, limit=limit)
+        ]
+
+        ticker = query.upper().strip()
+        if limit > 0 and TICKER_QUERY_PATTERN.match(ticker) and symbol_directory.get(ticker) is None:
+            info = symbol_service.get_info(ticker)
+            if info is not None and info.valid:
+                asset_type = info.asset_type and YAHOO_ASSET_TYPES.get(info.asset_type, info.asset_type.lower())
+                results.insert(0, self._search_result(
+                    info.symbol, info.name or info.symbol, info.exchange, asset_type
+                ))
+                results = results[:limit]
+        return results
+
+    def _search_result(
+        self, symbol: str, name: str, exchange: Optional[str], asset_type: Optional[str]
+    ) -> dict:
+        live = finnhub_service.get_latest_price(symbol)
+        return {
+            "symbol": symbol,
+            "name": name,
+            "exchange": exchange,
+            "asset_type": asset_type,
+            "price": live["price"] if live else None,
+            "in_watchlist": symbol in self._watchlist,
+        }
 
     def is_in_watchlist(self, symbol: str) -> bool:
         """Check if a symbol is in the watchlist."""